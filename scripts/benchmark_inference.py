@@ -0,0 +1,85 @@
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.apis.common import (
+    is_invalid_json,
+    run_inference_async,
+    run_inference_parallel_with_retry,
+)
+from src.apis.fireworks import fireworks_infer, fireworks_infer_async
+from src.apis.mock_server import MockBehavior, MockLLMServer
+from src.apis.retry import RetryPolicy, with_retry_async
+from src.apis.telemetry import MemorySink, telemetry
+
+# Offline load test of the inference layer against `src.apis.mock_server`.
+# Example: python scripts/benchmark_inference.py --requests 2000 --workers 16 64 256
+
+
+def run_benchmark(
+    prompts: list[str], workers: int, policy: RetryPolicy, use_async: bool
+) -> dict[str, float | int | str | None]:
+    calls = MemorySink()
+    start = time.monotonic()
+    with telemetry.recording(calls):
+        if use_async:
+            infer = with_retry_async(fireworks_infer_async, policy)
+            results = run_inference_async(prompts, infer, max_concurrency=workers)
+        else:
+            results = run_inference_parallel_with_retry(
+                prompts, fireworks_infer, max_workers=workers, retry_policy=policy
+            )
+    seconds = time.monotonic() - start
+    summary = calls.summary().get("all", {})
+    return {
+        "mode": "async" if use_async else "threads",
+        "workers": workers,
+        "seconds": round(seconds, 2),
+        "items_per_s": round(len(prompts) / seconds, 1),
+        **{q: round(summary[q], 3) if summary.get(q) else None for q in ("p50", "p95", "p99")},
+        "calls": summary.get("requests", 0),
+        # Extra calls per item spent on retries
+        "retry_overhead": round(summary.get("requests", 0) / len(prompts) - 1, 3),
+        "invalid": sum(is_invalid_json(r) for r in results),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the inference layer offline.")
+    parser.add_argument("--requests", type=int, default=500, help="Items per run")
+    parser.add_argument("--workers", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--latency", type=float, default=0.2, help="Median latency (s)")
+    parser.add_argument("--latency-sigma", type=float, default=0.5)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--truncation-rate", type=float, default=0.0)
+    parser.add_argument("--malformed-rate", type=float, default=0.02)
+    parser.add_argument("--async", dest="use_async", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    behavior = MockBehavior(
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        truncation_rate=args.truncation_rate,
+        malformed_rate=args.malformed_rate,
+        seed=args.seed,
+    )
+    policy = RetryPolicy(base_delay=0.05, max_delay=1.0)
+    prompts = [f"Opinion {i}" for i in range(args.requests)]
+
+    rows = []
+    with MockLLMServer(behavior) as server:
+        os.environ.update(server.environ())
+        for workers in args.workers:
+            rows.append(run_benchmark(prompts, workers, policy, args.use_async))
+        print("Mock server:", dict(server.counts))
+    print(pd.DataFrame(rows).to_string(index=False))
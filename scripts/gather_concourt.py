@@ -1,14 +1,16 @@
 import argparse
-import concurrent.futures
 import re
+import sys
 from pathlib import Path
 from typing import Collection, Iterable
 
 import pandas as pd
-import requests
 from bs4 import BeautifulSoup
 from striprtf.striprtf import rtf_to_text
-from tqdm import tqdm
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.fetcher import HttpCache, fetch_all
 
 FILE_PATH = Path(__file__).parent.parent / "data" / "NALUS.csv"
 RTF_DIR_PATH = Path(__file__).parent.parent / "data" / "rtf"
@@ -43,47 +45,36 @@ def ecli_to_url(ecli):
     return None
 
 
-def download_text(url):
-    if not url:
-        return None
-
-    try:
-        response = requests.get(url, timeout=30)
-        response.encoding = "utf-8"  # Set encoding
-
-        # Parse HTML content using BeautifulSoup
-        soup = BeautifulSoup(response.text, "html.parser")
+def html_to_text(html: str) -> str:
+    # Parse HTML content using BeautifulSoup
+    soup = BeautifulSoup(html, "html.parser")
 
-        # Extract and print the text content
-        content = soup.get_text()
-        content = re.sub(r"\n{3,}", "\n\n\n", content)
-        content = re.sub(r" {4,}", "   ", content)
+    # Extract the text content
+    content = soup.get_text()
+    content = re.sub(r"\n{3,}", "\n\n\n", content)
+    content = re.sub(r" {4,}", "   ", content)
 
-        return content
-    except Exception as e:
-        print(f"Error downloading {url}: {e}")
-        return None
+    return content
 
 
 def download_texts_parallel(urls: Collection[str]) -> list[None | str]:
-    results: list[None | str] = [None] * len(urls)
-
-    with concurrent.futures.ThreadPoolExecutor(max_workers=10) as executor:
-        future_to_index = {executor.submit(download_text, url): i for i, url in enumerate(urls)}
-
-        for future in tqdm(
-            concurrent.futures.as_completed(future_to_index),
-            total=len(future_to_index),
-            desc="Downloading",
-        ):
-            index: int = future_to_index[future]
-            try:
-                results[index] = future.result()
-            except Exception as e:
-                print(f"Error processing row {index}: {e}")
-                results[index] = None
-
-    return results
+    """Downloads the texts of `urls` (None for missing URLs and failed downloads).
+
+    Uses the shared polite fetcher; pages cached by a previous run are only revalidated.
+    """
+    urls = list(urls)
+    to_fetch = sorted({url for url in urls if url})
+    pages = fetch_all(to_fetch, encoding="utf-8", cache=HttpCache())
+
+    texts: dict[str, str | None] = {}
+    for page in pages:
+        if not page.ok:
+            print(f"Error downloading {page.url}: {page.error}")
+            texts[page.url] = None
+        else:
+            texts[page.url] = html_to_text(page.text)
+
+    return [texts.get(url) if url else None for url in urls]
 
 
 def read_rtf_file(file_path):
@@ -1,3 +1,4 @@
+import argparse
 import sys
 from pathlib import Path
 
@@ -5,11 +6,18 @@ import dotenv
 
 sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
+from src.apis.cache import InferenceCache
 from src.apis.common import is_invalid_json, run_inference_parallel_with_retry
-from src.apis.google import gemini_infer
+from src.apis.journal import RunJournal
+from src.apis.prompt_cache import prompt_cache_stats
+from src.apis.rate_limit import get_rate_limiter, rate_limited
+from src.apis.registry import get_infer_func, resolve_provider
+from src.apis.telemetry import JsonlSink, MemorySink, telemetry
+from src.continuation import with_continuation
+from src.evaluation import evaluate_sections, length_buckets, quality_summary, request_metrics
 from src.filter_references import process_raw_results
 from src.load_court_data import load_sc_data
-from src.templates import render_template
+from src.templates import render_template_parts
 
 TEMPLATE_NAME = "extract_acts_03.jinja2"
 
@@ -18,9 +26,25 @@ ENV_PATH = MAIN_DIR / ".env"
 SC_PATH = MAIN_DIR / "data" / "sc_opinions.json"
 OUTPUT_PATH = MAIN_DIR / "data" / "sc_opinions_with_sections.json"
 ERR_PATH = MAIN_DIR / "data" / "sc_filtered_errors.txt"
+JOURNAL_PATH = MAIN_DIR / "data" / "sc_opinions_sections_journal.jsonl"
+TELEMETRY_PATH = MAIN_DIR / "data" / "sc_opinions_sections_telemetry.jsonl"
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extract civil code sections from SC opinions.")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Keep results recorded by a previous (interrupted) run and only infer the rest",
+    )
+    parser.add_argument(
+        "--provider", default="gemini", help="Provider name, e.g. gemini, claude or openai"
+    )
+    args = parser.parse_args()
+    # Only the SDK of the chosen provider is imported
+    provider = resolve_provider(args.provider).name
+    complete = get_infer_func(provider, "complete")
+
     dotenv.load_dotenv(ENV_PATH)
 
     sc_df = load_sc_data(SC_PATH)
@@ -29,9 +53,30 @@ if __name__ == "__main__":
     texts = sc_df.text.tolist()
     sections_orig = sc_df.sections_annotated.tolist()
 
-    templatized = [render_template(TEMPLATE_NAME, court_opinion=text) for text in texts]
-
-    results_raw = run_inference_parallel_with_retry(templatized, gemini_infer)
+    templatized = [render_template_parts(TEMPLATE_NAME, court_opinion=text) for text in texts]
+
+    cache = InferenceCache()
+    prompt_cache_stats.reset()
+    # Truncated outputs are continued instead of re-requested from scratch
+    infer = with_continuation(rate_limited(complete, get_rate_limiter(provider)))
+    run_stats = MemorySink()
+    with (
+        RunJournal(JOURNAL_PATH, resume=args.resume) as journal,
+        JsonlSink(TELEMETRY_PATH) as telemetry_log,
+        telemetry.recording(run_stats, telemetry_log),
+    ):
+        results_raw = run_inference_parallel_with_retry(
+            templatized,
+            infer,
+            max_workers=64,
+            cache=cache,
+            journal=journal,
+            ids=sc_df.permanent_link.tolist(),
+            json_mode=True,
+        )
+    print("Inference cache:", cache.stats())
+    print("Prompt cache:", prompt_cache_stats.summary())
+    print("Telemetry:", run_stats.summary().get("all"))
 
     with open(ERR_PATH, "w", encoding="utf-8") as f:
         for i, s_inf in enumerate(results_raw):
@@ -40,13 +85,22 @@ if __name__ == "__main__":
 
     sections_inferred = process_raw_results(results_raw)  # type: ignore
 
+    quality = evaluate_sections(sections_orig, sections_inferred, texts).assign(
+        court=sc_df.soud.values,
+        category=sc_df.kategorie_rozhodnuti.values,
+        length=length_buckets(texts).values,
+    )
+    # Documents served from the cache or the journal have no request metrics; requests
+    # to several models (e.g. through the router) add up per document
+    metrics = request_metrics(run_stats.records, templatized, per_model=False)
+    quality = quality.merge(metrics, on="document", how="left")
+    for by in (None, "court", "category", "length"):
+        print(quality_summary(quality, by=by).round(3).to_string())
+
     with open(ERR_PATH, "a", encoding="utf-8") as f:
-        for i, (s_orig, s_inf) in enumerate(zip(sections_orig, sections_inferred, strict=True)):
-            if set(s_orig) <= set(s_inf):
-                continue
+        for i in quality.document[~quality.complete]:
+            s_orig, s_inf = sections_orig[i], sections_inferred[i]
             missing = set(s_orig) - set(s_inf)
-            if all(str(m) not in sc_df.iloc[i].text for m in missing):
-                continue
 
             f.write(f"\n{i} {s_orig} {s_inf} {missing}\n{sc_df.iloc[i].permanent_link}\n")
 
@@ -0,0 +1,63 @@
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.citations import extract_civil_code_sections
+from src.filter_references import missing_sections
+from src.load_court_data import load_sc_data
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+SC_PATH = MAIN_DIR / "data" / "sc_opinions.json"
+LLM_PATH = MAIN_DIR / "data" / "sc_opinions_with_sections.json"
+OUTPUT_PATH = MAIN_DIR / "data" / "sc_opinions_parsed_sections.json"
+
+
+def recall_against(reference: list[list[int]], parsed: list[list[int]], texts: list[str]) -> float:
+    """Share of documents whose reference sections were all found, ignoring sections whose
+    number does not occur in the text at all (same check as `sc_opinions_add_sections.py`)."""
+    hits = 0
+    for s_ref, s_parsed, text in zip(reference, parsed, texts, strict=True):
+        if not missing_sections(s_ref, s_parsed, text):
+            hits += 1
+    return hits / max(len(reference), 1)
+
+
+if __name__ == "__main__":
+    sc_df = load_sc_data(SC_PATH)
+    texts = sc_df.text.fillna("").tolist()
+
+    start = time.perf_counter()
+    parsed = [extract_civil_code_sections(text) for text in texts]
+    elapsed = time.perf_counter() - start
+
+    sc_df["sections_parsed"] = [sections for sections, _ in parsed]
+    sc_df["parse_confident"] = [confident for _, confident in parsed]
+
+    print(f"Parsed {len(texts)} opinions ({sum(map(len, texts)):,} chars) in {elapsed:.2f} s")
+    print(f"Confident parses: {sc_df.parse_confident.mean():.1%}")
+
+    annotated = sc_df.sections_annotated.tolist()
+    parsed_sections = sc_df.sections_parsed.tolist()
+    print(f"Recall vs. annotations (all): {recall_against(annotated, parsed_sections, texts):.1%}")
+    confident = sc_df[sc_df.parse_confident]
+    confident_recall = recall_against(
+        confident.sections_annotated.tolist(),
+        confident.sections_parsed.tolist(),
+        confident.text.tolist(),
+    )
+    print(f"Recall vs. annotations (confident): {confident_recall:.1%}")
+
+    if LLM_PATH.exists():
+        llm_df = pd.read_json(LLM_PATH, lines=True)[["permanent_link", "sections_inferred"]]
+        merged = sc_df.merge(llm_df, on="permanent_link")
+        agreement = [
+            set(p) == set(i)
+            for p, i in zip(merged.sections_parsed, merged.sections_inferred, strict=True)
+        ]
+        print(f"Exact agreement with LLM extraction: {sum(agreement) / max(len(agreement), 1):.1%}")
+
+    sc_df.to_json(OUTPUT_PATH, orient="records", lines=True, force_ascii=False, indent=4)
@@ -0,0 +1,38 @@
+import sys
+from pathlib import Path
+
+import dotenv
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.apis.google import gemini_infer
+from src.apis.rate_limit import get_rate_limiter, rate_limited
+from src.load_court_data import load_sc_data
+from src.tournament import Variant, run_tournament
+
+TEMPLATE_NAMES = ["extract_acts_01.jinja2", "extract_acts_02.jinja2", "extract_acts_03.jinja2"]
+
+MAIN_DIR = Path(__file__).resolve().parent.parent
+ENV_PATH = MAIN_DIR / ".env"
+SC_PATH = MAIN_DIR / "data" / "sc_opinions.json"
+
+
+if __name__ == "__main__":
+    dotenv.load_dotenv(ENV_PATH)
+
+    # Random order, so that every prefix of the sample is representative
+    sc_df = load_sc_data(SC_PATH).sample(frac=1, random_state=0)
+
+    infer = rate_limited(gemini_infer, get_rate_limiter("gemini"))
+    variants = [Variant(name.removesuffix(".jinja2"), name, infer) for name in TEMPLATE_NAMES]
+
+    result = run_tournament(
+        sc_df.text.fillna("").tolist(), sc_df.sections_annotated.tolist(), variants, max_workers=32
+    )
+    print(
+        f"Tournament {result.status} after {result.opinions} opinions "
+        f"and {result.requests} requests"
+    )
+    print(result.scores.to_string(index=False))
+    if result.winner is not None:
+        print(f"Winner: {result.winner}")
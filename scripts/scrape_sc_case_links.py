@@ -1,26 +1,28 @@
 import argparse
+import asyncio
 import json
 import re
-import time
+import sys
 from pathlib import Path
-from urllib.parse import urljoin
+from urllib.parse import urljoin, urlsplit
 
-import requests
 from bs4 import BeautifulSoup
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.fetcher import Fetcher, HostLimit, HttpCache
+
 BASE_URL = "https://rozhodnuti.nsoud.cz"
 SUBDIR = Path(__file__).parent / "sc_case_links"
 
 
-def fetch_page(url):
+async def fetch_page(fetcher: Fetcher, url):
     """Fetch and return the BeautifulSoup object for a given URL."""
-    try:
-        response = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        response.raise_for_status()
-        return BeautifulSoup(response.text, "html.parser")
-    except requests.RequestException as e:
-        print(f"Error fetching {url}: {e}")
+    result = await fetcher.fetch(url)
+    if not result.ok:
+        print(f"Error fetching {url}: {result.error}")
         return None
+    return BeautifulSoup(result.text, "html.parser")
 
 
 def extract_opinion_links(soup, base_url, entry_id):
@@ -72,27 +74,36 @@ def save_results_to_json(results, filepath: Path):
 
 
 def scrape_opinions(start_url, base_url, sleep_time=12):
-    """Main scraping function that fetches and processes all pages."""
-    results = []
-    entry_id = 1
-    next_page_url = start_url
+    """Main scraping function that fetches and processes all pages.
 
-    while next_page_url:
-        soup = fetch_page(next_page_url)
-        if not soup:
-            break
+    Pages are requested at least `sleep_time` seconds apart over one kept-alive connection.
+    """
+    return asyncio.run(_scrape_opinions(start_url, base_url, sleep_time))
 
-        page_results, entry_id = extract_opinion_links(soup, start_url, entry_id)
-        if not page_results:
-            print(f"No court opinion links found on {next_page_url}. Stopping scraping.")
-            break
 
-        results.extend(page_results)
-        next_page_url = find_next_page_url(soup, base_url)
+async def _scrape_opinions(start_url, base_url, sleep_time):
+    results = []
+    entry_id = 1
+    next_page_url = start_url
 
-        if next_page_url:
-            # Wait before fetching the next page to respect rate limit
-            time.sleep(sleep_time)
+    # The pages follow one another, so a single connection suffices
+    limit = HostLimit(max_concurrency=1, min_interval=sleep_time)
+    fetcher = Fetcher(
+        cache=HttpCache(), host_limits={urlsplit(start_url).hostname: limit}, timeout=10
+    )
+    async with fetcher:
+        while next_page_url:
+            soup = await fetch_page(fetcher, next_page_url)
+            if not soup:
+                break
+
+            page_results, entry_id = extract_opinion_links(soup, start_url, entry_id)
+            if not page_results:
+                print(f"No court opinion links found on {next_page_url}. Stopping scraping.")
+                break
+
+            results.extend(page_results)
+            next_page_url = find_next_page_url(soup, base_url)
 
     return results
 
@@ -1,14 +1,18 @@
+import asyncio
 import json
 import os
 import re
-import threading
-from concurrent.futures import ThreadPoolExecutor
+import sys
 from dataclasses import asdict, dataclass
 from pathlib import Path
 from typing import Any, TypedDict
 
-import requests
 from bs4 import BeautifulSoup
+from tqdm.asyncio import tqdm_asyncio
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.fetcher import Fetcher, FetchResult, HttpCache
 
 BASE_DIR = Path(__file__).parent.parent
 LINKS_DIR = BASE_DIR / "sc_case_links"
@@ -166,41 +170,27 @@ def load_case_links_from_directory(directory_path: str) -> list[CaseLink]:
     return all_cases
 
 
-# Create a lock for thread-safe operations
-print_lock = threading.Lock()
-results_lock = threading.Lock()
-
-
-def process_case(case: CaseLink) -> dict:
+def process_case(case: CaseLink, page: FetchResult) -> dict:
     """
-    Process a single case by fetching and scraping the court decision.
-    This function is designed to be used with ThreadPoolExecutor.
+    Scrape the court decision of a single case from its fetched page.
+    Failed fetches and pages that cannot be scraped yield a minimal record.
     """
     permanent_link = case.get('permanent_link', '')
     source_file = case.get('source_file', '')
     case_id = case.get('case_id', '')
 
     try:
-        with print_lock:
-            print(f"Processing: {case_id} from {source_file}")
+        if not page.ok:
+            raise RuntimeError(page.error)
 
-        response = requests.get(permanent_link, timeout=30)
-        response.raise_for_status()
-
-        decision_data = scrape_court_decision(
-            response.text,
+        return scrape_court_decision(
+            page.text,
             permanent_link=permanent_link,
             source_file=source_file
         )
 
-        with print_lock:
-            print(f"Successfully processed: {case_id}")
-
-        return decision_data
-
     except Exception as e:
-        with print_lock:
-            print(f"Error processing {case_id} from {source_file}: {e}")
+        print(f"Error processing {case_id} from {source_file}: {e}")
 
         # Return a minimal record for failed cases
         return {
@@ -212,36 +202,37 @@ def process_case(case: CaseLink) -> dict:
         }
 
 
-def scrape_all_court_decisions(links_directory: str, output_file: str, max_workers: int = 10):
+async def scrape_court_decisions(cases: list[CaseLink]) -> list[dict]:
+    """
+    Fetch and scrape the court decisions of the cases, in the order of `cases`.
+    Each page is scraped as soon as it arrives, so only its extracted data is kept.
+    """
+    async with Fetcher(cache=HttpCache()) as fetcher:
+
+        async def scrape(case: CaseLink) -> dict:
+            return process_case(case, await fetcher.fetch(case.get('permanent_link', '')))
+
+        decisions = await tqdm_asyncio.gather(*(scrape(case) for case in cases))
+        print(f"Revalidated {fetcher.revalidated} cached pages")
+    return decisions
+
+
+def scrape_all_court_decisions(links_directory: str, output_file: str):
     """
     Scrape all court decisions from links in the specified directory and save to a single JSON file.
 
+    Pages are fetched concurrently within the politeness limits of `src.fetcher.HOST_LIMITS`
+    over pooled connections; pages cached by a previous run are only revalidated.
+
     Args:
         links_directory: Directory containing JSON files with case links
         output_file: Path to save the combined results
-        max_workers: Maximum number of threads to use
     """
     # Load all case links
     all_cases = load_case_links_from_directory(links_directory)
     print(f"Found {len(all_cases)} cases to process")
 
-    # Store all results
-    all_decisions = []
-
-    # Process cases with thread pool
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        # Submit all cases to the executor
-        future_to_case = {executor.submit(process_case, case): case for case in all_cases}
-
-        # Process results as they complete
-        for future in future_to_case:
-            try:
-                decision_data = future.result()
-                with results_lock:
-                    all_decisions.append(decision_data)
-            except Exception as e:
-                case = future_to_case[future]
-                print(f"Exception processing case {case.get('case_id', '')}: {e}")
+    all_decisions = asyncio.run(scrape_court_decisions(all_cases))
 
     # Save all results to a single JSON file
     output_path = Path(output_file)
@@ -254,4 +245,4 @@ def scrape_all_court_decisions(links_directory: str, output_file: str, max_worke
 
 
 if __name__ == "__main__":
-    scrape_all_court_decisions(str(LINKS_DIR), str(OUTPUT_FILE), max_workers=20)
+    scrape_all_court_decisions(str(LINKS_DIR), str(OUTPUT_FILE))
@@ -1,9 +1,15 @@
-from functools import partial
+from functools import cache, partial
+from typing import Iterator
 
 import anthropic
 
 from ..constants import ANTHROPIC_API_KEY, DEFAULT_MAX_TOKENS
+from .clients import get_async_client, make_async_http_client
 from .common import get_api_key
+from .completion import Completion
+from .prompt_cache import prompt_cache_stats, split_prompt
+from .streaming import consume_stream
+from .telemetry import InferenceTracker, track_inference
 
 CLAUDE_DEFAULT_MODEL = "claude-3-7-sonnet-20250219"
 
@@ -11,8 +17,55 @@ CLAUDE_DEFAULT_MODEL = "claude-3-7-sonnet-20250219"
 get_anthropic_api_key = partial(get_api_key, key_name=ANTHROPIC_API_KEY)
 
 
+@cache
+def get_claude_client(api_key: str) -> anthropic.Anthropic:
+    """Returns a long-lived client so that connections are reused across calls."""
+    return anthropic.Anthropic(api_key=api_key)
+
+
+def get_claude_async_client(api_key: str) -> anthropic.AsyncAnthropic:
+    """Returns a pooled async client bound to the running event loop."""
+    return get_async_client(
+        ("anthropic", api_key),
+        lambda: anthropic.AsyncAnthropic(api_key=api_key, http_client=make_async_http_client()),
+    )
+
+
+# Claude has no JSON mode; prefilling the answer with "[" makes it continue a JSON list
+JSON_PREFILL = "["
+
+
+def claude_messages(text: str, prefill: str | None = None) -> list[dict]:
+    """User message with the static prompt prefix marked for Anthropic's prompt cache,
+    optionally followed by the beginning of the assistant's answer."""
+    prefix, suffix = split_prompt(text)
+    if not prefix:
+        messages: list[dict] = [{"role": "user", "content": text}]
+    else:
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                    {"type": "text", "text": suffix},
+                ],
+            }
+        ]
+    if prefill:
+        messages.append({"role": "assistant", "content": prefill})
+    return messages
+
+
+def _record_claude_usage(usage, tracker: InferenceTracker) -> None:
+    cached = getattr(usage, "cache_read_input_tokens", None) or 0
+    written = getattr(usage, "cache_creation_input_tokens", None) or 0
+    input_tokens = usage.input_tokens + cached + written
+    prompt_cache_stats.record("claude", input_tokens, cached, written)
+    tracker.usage(input_tokens, usage.output_tokens, cached)
+
+
 def claude_count_tokens(text: str, api_key: str | None = None) -> int:
-    client = anthropic.Anthropic(api_key=get_anthropic_api_key(api_key))
+    client = get_claude_client(get_anthropic_api_key(api_key))
 
     response = client.messages.count_tokens(
         model="claude-3-7-sonnet-20250219",
@@ -23,6 +76,41 @@ def claude_count_tokens(text: str, api_key: str | None = None) -> int:
     return response.input_tokens
 
 
+def claude_complete(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1,
+    top_k: int = 100,
+    system: str | None = None,
+    model: str = CLAUDE_DEFAULT_MODEL,
+    json_mode: bool = False,
+    prefill: str | None = None,
+    api_key: str | None = None,
+) -> Completion:
+    """`claude_infer` with the stop reason; `prefill` starts the assistant's answer
+    (trailing whitespace is not allowed there and is stripped)."""
+    if prefill is None and json_mode:
+        prefill = JSON_PREFILL
+    if prefill is not None:
+        prefill = prefill.rstrip()
+
+    client = get_claude_client(get_anthropic_api_key(api_key))
+    with track_inference("claude", model, text) as tracker:
+        message = client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_k=top_k,
+            system=system if system is not None else anthropic.NOT_GIVEN,
+            messages=claude_messages(text, prefill),  # type: ignore
+        )
+        _record_claude_usage(message.usage, tracker)
+        tracker.finish(message.stop_reason)
+    content = message.content[0].text if message.content else ""  # type: ignore
+    return Completion(content, message.stop_reason, prefill)
+
+
 def claude_infer(
     text: str,
     *,
@@ -31,15 +119,103 @@ def claude_infer(
     top_k: int = 100,
     system: str | None = None,
     model: str = CLAUDE_DEFAULT_MODEL,
+    json_mode: bool = False,
     api_key: str | None = None,
 ) -> str:
-    client = anthropic.Anthropic(api_key=get_anthropic_api_key(api_key))
-    message = client.messages.create(
+    completion = claude_complete(
+        text,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_k=top_k,
+        system=system,
         model=model,
+        json_mode=json_mode,
+        api_key=api_key,
+    )
+    return completion.full_text  # type: ignore
+
+
+async def claude_infer_async(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1,
+    top_k: int = 100,
+    system: str | None = None,
+    model: str = CLAUDE_DEFAULT_MODEL,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> str:
+    client = get_claude_async_client(get_anthropic_api_key(api_key))
+    with track_inference("claude", model, text) as tracker:
+        message = await client.messages.create(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_k=top_k,
+            system=system if system is not None else anthropic.NOT_GIVEN,
+            messages=claude_messages(text, JSON_PREFILL if json_mode else None),  # type: ignore
+        )
+        _record_claude_usage(message.usage, tracker)
+        tracker.finish(message.stop_reason)
+    content = message.content[0].text if message.content else ""  # type: ignore
+    return JSON_PREFILL + content if json_mode else content
+
+
+def _claude_text_stream(
+    text: str,
+    *,
+    max_tokens: int,
+    temperature: float,
+    top_k: int,
+    system: str | None,
+    model: str,
+    json_mode: bool,
+    api_key: str | None,
+) -> Iterator[str]:
+    client = get_claude_client(get_anthropic_api_key(api_key))
+    with (
+        track_inference("claude", model, text) as tracker,
+        client.messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            top_k=top_k,
+            system=system if system is not None else anthropic.NOT_GIVEN,
+            messages=claude_messages(text, JSON_PREFILL if json_mode else None),  # type: ignore
+        ) as stream,
+    ):
+        if json_mode:
+            yield JSON_PREFILL
+        for chunk in stream.text_stream:
+            tracker.first_token()
+            yield chunk
+        message = stream.get_final_message()
+        _record_claude_usage(message.usage, tracker)
+        tracker.finish(message.stop_reason)
+
+
+def claude_infer_stream(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1,
+    top_k: int = 100,
+    system: str | None = None,
+    model: str = CLAUDE_DEFAULT_MODEL,
+    json_mode: bool = False,
+    on_repetition: str = "prefix",
+    api_key: str | None = None,
+) -> str | None:
+    """Streaming `claude_infer` that aborts the request when the output starts repeating."""
+    chunks = _claude_text_stream(
+        text,
         max_tokens=max_tokens,
         temperature=temperature,
         top_k=top_k,
-        system=system if system is not None else anthropic.NOT_GIVEN,
-        messages=[{"role": "user", "content": text}],
+        system=system,
+        model=model,
+        json_mode=json_mode,
+        api_key=api_key,
     )
-    return message.content[0].text  # type: ignore
+    return consume_stream(chunks, on_repetition=on_repetition)
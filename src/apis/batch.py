@@ -0,0 +1,266 @@
+import hashlib
+import json
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterator, Protocol, Sequence
+
+from ..constants import DEFAULT_MAX_TOKENS
+from .common import is_invalid_json
+
+DEFAULT_JOB_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "batch_jobs"
+DEFAULT_POLL_INTERVAL = 60.0
+
+
+class BatchBackend(Protocol):
+    """A provider batch endpoint. Requests are `(custom_id, prompt)` pairs."""
+
+    name: str
+    max_requests: int
+    max_bytes: int
+
+    def submit(self, requests: Sequence[tuple[str, str]]) -> str: ...
+
+    def is_done(self, job_id: str) -> bool: ...
+
+    def results(self, job_id: str) -> dict[str, str | None]: ...
+
+
+class AnthropicBatchBackend:
+    """Anthropic Message Batches API."""
+
+    name = "anthropic"
+    max_requests = 100_000
+    max_bytes = 256_000_000
+
+    def __init__(
+        self,
+        model: str | None = None,
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        temperature: float = 1,
+        api_key: str | None = None,
+    ):
+        # Imported here so that the module does not require every provider SDK
+        from .anthropic import CLAUDE_DEFAULT_MODEL, get_anthropic_api_key, get_claude_client
+
+        self.client = get_claude_client(get_anthropic_api_key(api_key))
+        self.params = {
+            "model": model or CLAUDE_DEFAULT_MODEL,
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+        }
+
+    def submit(self, requests: Sequence[tuple[str, str]]) -> str:
+        from .anthropic import claude_messages
+
+        batch = self.client.messages.batches.create(
+            requests=[
+                {
+                    "custom_id": custom_id,
+                    "params": {**self.params, "messages": claude_messages(text)},
+                }
+                for custom_id, text in requests
+            ]  # type: ignore
+        )
+        return batch.id
+
+    def is_done(self, job_id: str) -> bool:
+        return self.client.messages.batches.retrieve(job_id).processing_status == "ended"
+
+    def results(self, job_id: str) -> dict[str, str | None]:
+        out: dict[str, str | None] = {}
+        for entry in self.client.messages.batches.results(job_id):
+            if entry.result.type == "succeeded":
+                out[entry.custom_id] = entry.result.message.content[0].text  # type: ignore
+            else:
+                out[entry.custom_id] = None
+        return out
+
+
+class OpenAIBatchBackend:
+    """OpenAI Batch API over the chat completions endpoint."""
+
+    name = "openai"
+    max_requests = 50_000
+    max_bytes = 200_000_000
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        temperature: float = 1,
+        api_key: str | None = None,
+    ):
+        from .openai import get_openai_api_key, get_openai_client
+
+        self.client = get_openai_client(get_openai_api_key(api_key))
+        self.params = {"model": model, "max_tokens": max_tokens, "temperature": temperature}
+
+    def submit(self, requests: Sequence[tuple[str, str]]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {**self.params, "messages": [{"role": "user", "content": text}]},
+                },
+                ensure_ascii=False,
+            )
+            for custom_id, text in requests
+        ]
+        input_file = self.client.files.create(
+            file=("batch.jsonl", "\n".join(lines).encode("utf-8")), purpose="batch"
+        )
+        batch = self.client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    def is_done(self, job_id: str) -> bool:
+        status = self.client.batches.retrieve(job_id).status
+        return status in ("completed", "failed", "expired", "cancelled")
+
+    def results(self, job_id: str) -> dict[str, str | None]:
+        batch = self.client.batches.retrieve(job_id)
+        out: dict[str, str | None] = {}
+        if batch.output_file_id is None:
+            return out
+        for line in self.client.files.content(batch.output_file_id).text.splitlines():
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            try:
+                out[entry["custom_id"]] = entry["response"]["body"]["choices"][0]["message"][
+                    "content"
+                ]
+            except (KeyError, TypeError, IndexError):
+                out[entry["custom_id"]] = None
+        return out
+
+
+@dataclass
+class BatchJob:
+    job_id: str
+    attempt: int
+    indices: list[int]
+
+
+@dataclass
+class BatchJobStore:
+    """Submitted batch jobs of one run, persisted as JSON so that a run can be resumed."""
+
+    path: Path
+    jobs: list[BatchJob] = field(default_factory=list)
+
+    @classmethod
+    def load(cls, path: Path) -> "BatchJobStore":
+        if not path.exists():
+            return cls(path)
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(path, [BatchJob(**job) for job in data["jobs"]])
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"jobs": [asdict(job) for job in self.jobs]}, f, indent=2)
+        tmp_path.replace(self.path)
+
+    def add(self, job: BatchJob) -> None:
+        self.jobs.append(job)
+        self.save()
+
+    def for_attempt(self, attempt: int) -> list[BatchJob]:
+        return [job for job in self.jobs if job.attempt == attempt]
+
+
+def make_run_id(texts: Sequence[str], backend: BatchBackend) -> str:
+    """Identifies a run by its prompts and backend configuration."""
+    digest = hashlib.sha256(backend.name.encode("utf-8"))
+    digest.update(json.dumps(getattr(backend, "params", {}), sort_keys=True).encode("utf-8"))
+    for text in texts:
+        digest.update(hashlib.sha256(text.encode("utf-8")).digest())
+    return digest.hexdigest()[:16]
+
+
+def _custom_id(attempt: int, index: int) -> str:
+    return f"r{attempt}-{index}"
+
+
+def _index_from_custom_id(custom_id: str) -> int:
+    return int(custom_id.split("-", 1)[1])
+
+
+def chunk_requests(
+    requests: Sequence[tuple[str, str]], max_requests: int, max_bytes: int
+) -> Iterator[list[tuple[str, str]]]:
+    """Splits requests into chunks respecting the provider's request-count and size limits."""
+    chunk: list[tuple[str, str]] = []
+    chunk_bytes = 0
+    for request in requests:
+        # Leave headroom for the JSON envelope around every prompt
+        size = len(request[1].encode("utf-8")) + 1024
+        if chunk and (len(chunk) >= max_requests or chunk_bytes + size > max_bytes):
+            yield chunk
+            chunk, chunk_bytes = [], 0
+        chunk.append(request)
+        chunk_bytes += size
+    if chunk:
+        yield chunk
+
+
+def run_inference_batch(
+    texts: Sequence[str],
+    backend: BatchBackend,
+    retries: int = 3,
+    poll_interval: float = DEFAULT_POLL_INTERVAL,
+    job_dir: Path | str = DEFAULT_JOB_DIR,
+    run_id: str | None = None,
+) -> list[str | None]:
+    """Run inference through a provider batch API
+
+    Job IDs are persisted under `job_dir`, so calling the function again with the same
+    texts and backend resumes polling instead of submitting new jobs. Items with invalid
+    JSON are resubmitted in follow-up batches.
+
+    Args:
+        texts: Strings to process
+        backend: Batch endpoint, e.g. `AnthropicBatchBackend()` or `OpenAIBatchBackend()`
+        retries: Number of follow-up batches for invalid JSON
+        poll_interval: Seconds between job status checks
+        job_dir: Directory where job IDs are persisted
+        run_id: Identifier of the run (derived from the texts and backend by default)
+
+    Returns:
+        List of inference results in the order of `texts`
+    """
+    run_id = run_id or make_run_id(texts, backend)
+    store = BatchJobStore.load(Path(job_dir) / f"{run_id}.json")
+    results: list[str | None] = [None] * len(texts)
+
+    for attempt in range(retries + 1):
+        pending = [i for i, result in enumerate(results) if is_invalid_json(result)]
+        if not pending:
+            break
+
+        # Submit whatever this attempt has not submitted yet (all of it unless resuming)
+        submitted = {i for job in store.for_attempt(attempt) for i in job.indices}
+        to_submit = [(_custom_id(attempt, i), texts[i]) for i in pending if i not in submitted]
+        for chunk in chunk_requests(to_submit, backend.max_requests, backend.max_bytes):
+            job_id = backend.submit(chunk)
+            indices = [_index_from_custom_id(custom_id) for custom_id, _ in chunk]
+            store.add(BatchJob(job_id=job_id, attempt=attempt, indices=indices))
+
+        for job in store.for_attempt(attempt):
+            while not backend.is_done(job.job_id):
+                time.sleep(poll_interval)
+            for custom_id, result in backend.results(job.job_id).items():
+                idx = _index_from_custom_id(custom_id)
+                if is_invalid_json(results[idx]):
+                    results[idx] = result
+
+    return results
@@ -0,0 +1,172 @@
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import partial
+from pathlib import Path
+from typing import Any, Callable
+
+from ..constants import INFERENCE_CACHE_BYPASS
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data"
+DEFAULT_CACHE_PATH = DATA_DIR / "inference_cache.sqlite"
+
+# Keyword arguments that do not influence the generated output
+_IGNORED_KWARGS = frozenset({"api_key"})
+
+
+def _describe_infer_func(
+    infer_func: Callable[..., Any], infer_kwargs: dict[str, Any]
+) -> tuple[str, dict[str, Any]]:
+    """Returns the provider identifier and the full set of generation parameters."""
+    kwargs = dict(infer_kwargs)
+    while isinstance(infer_func, partial):
+        kwargs = {**infer_func.keywords, **kwargs}
+        infer_func = infer_func.func
+
+    provider = f"{infer_func.__module__}.{getattr(infer_func, '__qualname__', repr(infer_func))}"
+
+    # Include defaults (e.g. the default model) so that changing them invalidates the cache
+    try:
+        for name, param in inspect.signature(infer_func).parameters.items():
+            if param.default is not inspect.Parameter.empty and name not in kwargs:
+                kwargs[name] = param.default
+    except (TypeError, ValueError):
+        pass
+
+    params = {k: v for k, v in kwargs.items() if k not in _IGNORED_KWARGS}
+    return provider, params
+
+
+def make_cache_key(text: str, infer_func: Callable[..., Any], **infer_kwargs) -> str:
+    """Returns a content hash of the prompt, provider, model and sampling parameters."""
+    provider, params = _describe_infer_func(infer_func, infer_kwargs)
+    payload = json.dumps(
+        {"provider": provider, "params": params, "text": text},
+        sort_keys=True,
+        ensure_ascii=False,
+        default=repr,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class InferenceCache:
+    """Persistent SQLite cache of inference results keyed by `make_cache_key`.
+
+    Args:
+        path: Path of the SQLite database file
+        max_age: Entries older than this number of seconds are evicted (None = no limit)
+        max_bytes: Least recently used entries are evicted above this total size (None = no limit)
+        bypass: Skip lookups (results are still stored). Defaults to the value of the
+            `CASELAW_CACHE_BYPASS` environment variable.
+    """
+
+    def __init__(
+        self,
+        path: Path | str = DEFAULT_CACHE_PATH,
+        max_age: float | None = None,
+        max_bytes: int | None = None,
+        bypass: bool | None = None,
+    ):
+        self.path = Path(path)
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        if bypass is None:
+            bypass = os.environ.get(INFERENCE_CACHE_BYPASS, "").lower() in ("1", "true", "yes")
+        self.bypass = bypass
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " key TEXT PRIMARY KEY,"
+            " result TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self.evict()
+
+    def get(self, key: str) -> str | None:
+        if self.bypass:
+            self.misses += 1
+            return None
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            now = time.time()
+            if row is not None and self.max_age is not None and now - row[1] > self.max_age:
+                self._conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                self._conn.commit()
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE results SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, result: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                (key, result, len(result.encode("utf-8")), now, now),
+            )
+            self._conn.commit()
+        if self.max_bytes is not None:
+            self.evict()
+
+    def evict(self) -> int:
+        """Removes expired entries and trims the cache to `max_bytes`; returns the count removed."""
+        removed = 0
+        with self._lock:
+            if self.max_age is not None:
+                cursor = self._conn.execute(
+                    "DELETE FROM results WHERE created_at < ?", (time.time() - self.max_age,)
+                )
+                removed += cursor.rowcount
+
+            if self.max_bytes is not None:
+                total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+                excess = total[0] - self.max_bytes
+                if excess > 0:
+                    rows = self._conn.execute(
+                        "SELECT key, size FROM results ORDER BY accessed_at ASC"
+                    ).fetchall()
+                    stale = []
+                    for key, size in rows:
+                        if excess <= 0:
+                            break
+                        stale.append((key,))
+                        excess -= size
+                    self._conn.executemany("DELETE FROM results WHERE key = ?", stale)
+                    removed += len(stale)
+
+            self._conn.commit()
+        return removed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self) -> None:
+        self._conn.close()
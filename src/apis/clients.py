@@ -0,0 +1,49 @@
+import asyncio
+import importlib.util
+import weakref
+from typing import Any, Callable, TypeVar
+
+import httpx
+
+T = TypeVar("T")
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+DEFAULT_TIMEOUT = httpx.Timeout(600.0, connect=10.0)
+DEFAULT_LIMITS = httpx.Limits(max_connections=1000, max_keepalive_connections=200)
+
+# Async clients are bound to the event loop they were created in
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[Any, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def make_async_http_client(
+    timeout: httpx.Timeout = DEFAULT_TIMEOUT,
+    limits: httpx.Limits = DEFAULT_LIMITS,
+    **kwargs,
+) -> httpx.AsyncClient:
+    """Returns a keep-alive async HTTP client, using HTTP/2 when `h2` is installed."""
+    return httpx.AsyncClient(http2=HTTP2_AVAILABLE, timeout=timeout, limits=limits, **kwargs)
+
+
+def get_async_client(key: Any, factory: Callable[[], T]) -> T:
+    """Returns the client stored under `key` for the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.setdefault(loop, {})
+    if key not in clients:
+        clients[key] = factory()
+    return clients[key]
+
+
+async def aclose_async_clients() -> None:
+    """Closes all pooled clients created in the running event loop."""
+    loop = asyncio.get_running_loop()
+    clients = _async_clients.pop(loop, {})
+    for client in clients.values():
+        close = getattr(client, "aclose", None) or getattr(client, "close", None)
+        if close is None:
+            continue
+        result = close()
+        if asyncio.iscoroutine(result):
+            await result
@@ -1,11 +1,18 @@
+import asyncio
 import json
 import os
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from functools import partial
-from typing import Callable, Collection, Sequence
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, Iterable, Iterator, Sequence
 
 import tqdm
 
+from .cache import InferenceCache, make_cache_key
+
+if TYPE_CHECKING:
+    from .journal import RunJournal
+    from .retry import RetryPolicy
+
 
 def get_api_key(key: str | None, key_name: str | None) -> str:
     if key is None and key_name is None:
@@ -15,10 +22,60 @@ def get_api_key(key: str | None, key_name: str | None) -> str:
     return os.environ[key_name]  # type: ignore
 
 
+def iter_inference_parallel(
+    texts: Iterable[str],
+    infer_func: Callable[..., str | None],
+    max_workers: int = 10,
+    max_in_flight: int | None = None,
+    **infer_kwargs,
+) -> Iterator[tuple[int, str | None]]:
+    """Run inference in parallel, pulling texts lazily and yielding results as they complete
+
+    At most `max_in_flight` texts are taken from `texts` ahead of the results, so memory
+    is bounded by the window rather than by the corpus (pass a generator of rendered
+    prompts to avoid materializing them).
+
+    Args:
+        texts: Strings to process, consumed lazily
+        infer_func: Inference function to call on each text
+        max_workers: Maximum number of parallel workers
+        max_in_flight: Maximum number of submitted texts without a yielded result
+            (defaults to `2 * max_workers`)
+        **infer_kwargs: Additional keyword arguments to pass to the inference function
+
+    Yields:
+        Tuples `(index, result)` in completion order, `index` being the position in `texts`
+    """
+    run_infer = partial(infer_func, **infer_kwargs)
+    window = max_in_flight or 2 * max_workers
+    text_iterator = enumerate(texts)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight: dict[Future, int] = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < window:
+                try:
+                    idx, text = next(text_iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[executor.submit(run_infer, text)] = idx
+
+            if not in_flight:
+                return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield in_flight.pop(future), future.result()
+
+
 def run_inference_parallel(
-    texts: Collection[str],
+    texts: Sequence[str],
     infer_func: Callable[..., str | None],
     max_workers: int = 10,
+    cache: InferenceCache | None = None,
+    on_result: Callable[[int, str | None], None] | None = None,
     **infer_kwargs,
 ) -> list[str | None]:
     """Run inference in parallel for a list of texts
@@ -27,19 +84,108 @@ def run_inference_parallel(
         texts: Strings to process
         infer_func: Inference function to call on each text
         max_workers: Maximum number of parallel workers
+        cache: Optional persistent cache; only texts without a cached result are sent and
+            valid-JSON results are stored
+        on_result: Optional callback called with `(index, result)` as soon as each result
+            is available
         **infer_kwargs: Additional keyword arguments to pass to the inference function
 
     Returns:
         List of inference results
     """
-    run_infer = partial(infer_func, **infer_kwargs)
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        thread_iterator = executor.map(run_infer, texts)
-        tqdm_iterator = tqdm.tqdm(thread_iterator, total=len(texts))
-        results = list(tqdm_iterator)
+    keys: list[str] = []
+    results: list[str | None] = [None] * len(texts)
+    if cache is not None:
+        keys = [make_cache_key(text, infer_func, **infer_kwargs) for text in texts]
+        results = [cache.get(key) for key in keys]
+    if on_result is not None:
+        for idx, result in enumerate(results):
+            if result is not None:
+                on_result(idx, result)
+
+    missing = [idx for idx, result in enumerate(results) if result is None]
+    result_iterator = iter_inference_parallel(
+        (texts[idx] for idx in missing), infer_func, max_workers, **infer_kwargs
+    )
+    for pos, result in tqdm.tqdm(result_iterator, total=len(missing)):
+        idx = missing[pos]
+        results[idx] = result
+        if cache is not None and result and not is_invalid_json(result):
+            cache.put(keys[idx], result)
+        if on_result is not None:
+            on_result(idx, result)
+
     return results
 
 
+async def run_inference_parallel_async(
+    texts: Sequence[str],
+    infer_func: Callable[..., Awaitable[str | None]],
+    max_concurrency: int = 100,
+    cache: InferenceCache | None = None,
+    **infer_kwargs,
+) -> list[str | None]:
+    """Run inference concurrently on a single thread for a list of texts
+
+    Use with the `*_infer_async` functions, which share one pooled client per provider
+    and event loop. Results are returned in the order of `texts`.
+
+    Args:
+        texts: Strings to process
+        infer_func: Async inference function to call on each text
+        max_concurrency: Maximum number of requests in flight
+        cache: Optional persistent cache of valid-JSON results
+        **infer_kwargs: Additional keyword arguments to pass to the inference function
+
+    Returns:
+        List of inference results
+    """
+    keys: list[str] = []
+    results: list[str | None] = [None] * len(texts)
+    if cache is not None:
+        keys = [make_cache_key(text, infer_func, **infer_kwargs) for text in texts]
+        results = [cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+    progress = tqdm.tqdm(total=len(missing))
+
+    async def run_one(idx: int) -> None:
+        async with semaphore:
+            result = await infer_func(texts[idx], **infer_kwargs)
+        results[idx] = result
+        if cache is not None and result and not is_invalid_json(result):
+            cache.put(keys[idx], result)
+        progress.update()
+
+    try:
+        await asyncio.gather(*(run_one(idx) for idx in missing))
+    finally:
+        progress.close()
+    return results
+
+
+def run_inference_async(
+    texts: Sequence[str],
+    infer_func: Callable[..., Awaitable[str | None]],
+    max_concurrency: int = 100,
+    cache: InferenceCache | None = None,
+    **infer_kwargs,
+) -> list[str | None]:
+    """Synchronous entry point for `run_inference_parallel_async` (outside of notebooks)"""
+    from .clients import aclose_async_clients
+
+    async def main() -> list[str | None]:
+        try:
+            return await run_inference_parallel_async(
+                texts, infer_func, max_concurrency, cache, **infer_kwargs
+            )
+        finally:
+            await aclose_async_clients()
+
+    return asyncio.run(main())
+
+
 def is_invalid_json(s: str | None) -> bool:
     if s is None:
         return True
@@ -55,38 +201,78 @@ def run_inference_parallel_with_retry(
     infer_func: Callable[..., str | None],
     max_workers: int = 10,
     retries=3,
+    cache: InferenceCache | None = None,
+    journal: "RunJournal | None" = None,
+    ids: Sequence[Hashable] | None = None,
+    retry_policy: "RetryPolicy | None" = None,
     **infer_kwargs,
 ):
-    """Retry inference for texts that returned invalid JSON
+    """Retry inference for texts that returned invalid JSON or a retryable error
+
+    Every item is retried on its own, immediately after its failure (with exponential
+    backoff and jitter), so a failed item does not wait for the rest of the run.
 
     Args:
         texts: Strings to process
         infer_func: Inference function to call on each text
         max_workers: Maximum number of parallel workers
-        retries: Number of retries for invalid JSON
+        retries: Number of retries for invalid JSON (ignored if `retry_policy` is given)
+        cache: Optional persistent cache of valid-JSON results
+        journal: Optional run journal; each result is recorded as soon as it finishes and
+            documents with a valid result for the same prompt and configuration in the
+            journal are not requested again
+        ids: Document IDs of the texts, required with `journal`
+        retry_policy: Backoff, attempt and deadline settings of the per-item retries
         **infer_kwargs: Additional keyword arguments to pass to the inference function
 
     Returns:
         List of inference results
     """
+    from .retry import RetryPolicy, with_retry
 
-    results_raw = run_inference_parallel(texts, infer_func, max_workers, **infer_kwargs)
+    results_raw: list[str | None] = [None] * len(texts)
 
-    for _ in range(retries):
-        invalid_indices = [
-            i for i, result in enumerate(results_raw) if is_invalid_json(result) or not result
-        ]
+    if journal is not None:
+        if ids is None or len(ids) != len(texts):
+            raise ValueError("Document ids matching the texts must be provided with a journal.")
+        journal_keys = {
+            doc_id: make_cache_key(text, infer_func, **infer_kwargs)
+            for doc_id, text in zip(ids, texts, strict=True)
+        }
+        completed = journal.completed(journal_keys)
+        results_raw = [completed.get(doc_id) for doc_id in ids]
 
-        if not invalid_indices:
-            break
+    todo_indices = [i for i, result in enumerate(results_raw) if result is None]
+    if not todo_indices:
+        return results_raw
 
-        sub_templatize = [texts[i] for i in invalid_indices]
+    sub_templatize = [texts[i] for i in todo_indices]
 
-        repair_results = run_inference_parallel(
-            sub_templatize, infer_func, max_workers, **infer_kwargs
+    on_result = None
+    if journal is not None and ids is not None:
+        on_result = partial(
+            _record_result,
+            journal,
+            [ids[i] for i in todo_indices],
+            [journal_keys[ids[i]] for i in todo_indices],
         )
 
-        for idx, result in zip(invalid_indices, repair_results, strict=True):
-            results_raw[idx] = result
+    retry_infer = with_retry(infer_func, retry_policy or RetryPolicy(max_attempts=retries + 1))
+    repair_results = run_inference_parallel(
+        sub_templatize, retry_infer, max_workers, cache, on_result, **infer_kwargs
+    )
+
+    for idx, result in zip(todo_indices, repair_results, strict=True):
+        results_raw[idx] = result
 
     return results_raw
+
+
+def _record_result(
+    journal: "RunJournal",
+    sub_ids: Sequence[Hashable],
+    sub_keys: Sequence[str],
+    idx: int,
+    result: str | None,
+) -> None:
+    journal.record(sub_ids[idx], result, sub_keys[idx])
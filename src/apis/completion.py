@@ -0,0 +1,27 @@
+from dataclasses import dataclass
+
+# Finish reasons meaning that generation stopped at `max_tokens`, across providers
+TRUNCATION_REASONS = frozenset({"max_tokens", "length", "MAX_TOKENS"})
+
+
+@dataclass(frozen=True)
+class Completion:
+    """Generated text with the provider's finish reason.
+
+    `text` is what the model generated; `prefill` is the start of the answer that was
+    supplied in the request (Claude only), so `full_text` is the whole answer.
+    """
+
+    text: str | None
+    finish_reason: str | None = None
+    prefill: str | None = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.finish_reason in TRUNCATION_REASONS
+
+    @property
+    def full_text(self) -> str | None:
+        if self.text is None:
+            return None
+        return (self.prefill or "") + self.text
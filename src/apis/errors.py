@@ -0,0 +1,90 @@
+import re
+from dataclasses import dataclass
+from typing import Mapping
+
+# 429 = too many requests, 529 = Anthropic overloaded, 503 = Gemini/Fireworks unavailable
+THROTTLING_STATUS_CODES = frozenset({429, 503, 529})
+
+
+def get_status_code(exc: BaseException) -> int | None:
+    """Returns the HTTP status code carried by a provider SDK or `requests` exception."""
+    # anthropic/openai: `status_code`, google-genai: `code`
+    for attr in ("status_code", "code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def get_response_headers(exc: BaseException) -> Mapping[str, str]:
+    headers = getattr(getattr(exc, "response", None), "headers", None)
+    return headers if headers is not None else {}
+
+
+def is_rate_limit_error(exc: BaseException) -> bool:
+    return get_status_code(exc) in THROTTLING_STATUS_CODES
+
+
+def _parse_duration(value: str | None) -> float | None:
+    """Parses `12`, `1.5`, `6m0s` or `250ms` into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = re.findall(r"(\d+(?:\.\d+)?)(ms|s|m|h)", value)
+    if not parts:
+        return None
+    scale = {"ms": 0.001, "s": 1, "m": 60, "h": 3600}
+    return sum(float(number) * scale[unit] for number, unit in parts)
+
+
+def _parse_int(value: str | None) -> int | None:
+    try:
+        return int(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+@dataclass
+class RateLimitInfo:
+    retry_after: float | None = None
+    remaining_requests: int | None = None
+    remaining_tokens: int | None = None
+
+
+def parse_rate_limit_headers(headers: Mapping[str, str]) -> RateLimitInfo:
+    """Reads the OpenAI/Fireworks (`x-ratelimit-*`) and Anthropic (`anthropic-ratelimit-*`)
+    rate-limit headers."""
+    headers = {k.lower(): v for k, v in headers.items()}
+    retry_after = _parse_duration(headers.get("retry-after"))
+    if retry_after is None:
+        retry_after = _parse_duration(headers.get("x-ratelimit-reset-requests"))
+
+    remaining_requests = _parse_int(
+        headers.get("x-ratelimit-remaining-requests")
+        or headers.get("anthropic-ratelimit-requests-remaining")
+    )
+    remaining_tokens = _parse_int(
+        headers.get("x-ratelimit-remaining-tokens")
+        or headers.get("anthropic-ratelimit-input-tokens-remaining")
+        or headers.get("anthropic-ratelimit-tokens-remaining")
+    )
+    return RateLimitInfo(retry_after, remaining_requests, remaining_tokens)
+
+
+RETRYABLE_STATUS_CODES = frozenset({408, 409, 429, 500, 502, 503, 504, 529})
+
+
+def is_retryable_error(exc: BaseException) -> bool:
+    """Timeouts, connection failures, throttling and server errors are worth retrying;
+    other client errors (bad request, authentication, ...) are permanent."""
+    status = get_status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    # SDK exceptions (anthropic.APITimeoutError, httpx.ConnectError, requests.Timeout, ...)
+    return any("Timeout" in cls.__name__ or "Connect" in cls.__name__ for cls in type(exc).__mro__)
@@ -1,29 +1,55 @@
 import json
-from functools import partial
+import os
+from functools import cache, partial
+from typing import Iterator
 
 import requests
+from requests.adapters import HTTPAdapter
 
-from ..constants import DEFAULT_MAX_TOKENS, FIREWORKS_API_KEY
+from ..constants import DEFAULT_MAX_TOKENS, FIREWORKS_API_KEY, FIREWORKS_BASE_URL
+from .clients import get_async_client, make_async_http_client
 from .common import get_api_key
+from .completion import Completion
+from .json_repair import REFERENCES_SCHEMA
+from .streaming import consume_stream
+from .telemetry import InferenceTracker, track_inference
 
-FIREWORKS_URL = "https://api.fireworks.ai/inference/v1/chat/completions"
+FIREWORKS_DEFAULT_BASE_URL = "https://api.fireworks.ai/inference/v1"
 FIREWORKS_DEFAULT_MODEL = "deepseek-v3"
+FIREWORKS_TIMEOUT = 600
+FIREWORKS_POOL_SIZE = 100
 
 
 get_fireworks_api_key = partial(get_api_key, key_name=FIREWORKS_API_KEY)
 
 
-def fireworks_infer(
+def fireworks_url() -> str:
+    """Chat completions endpoint, overridable with the FIREWORKS_BASE_URL variable."""
+    base_url = os.environ.get(FIREWORKS_BASE_URL) or FIREWORKS_DEFAULT_BASE_URL
+    return base_url.rstrip("/") + "/chat/completions"
+
+
+@cache
+def get_fireworks_session() -> requests.Session:
+    """Returns a shared keep-alive session with a connection pool sized for parallel runs."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=FIREWORKS_POOL_SIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _fireworks_request(
     text: str,
     *,
-    max_tokens: int = DEFAULT_MAX_TOKENS,
-    temperature: float = 0.6,
-    top_k: int = 100,
-    top_p: float = 1.0,
-    model: str = FIREWORKS_DEFAULT_MODEL,
-    api_key: str | None = None,
-) -> str | None:
-    url = FIREWORKS_URL
+    max_tokens: int,
+    temperature: float,
+    top_k: int,
+    top_p: float,
+    model: str,
+    json_mode: bool,
+    api_key: str | None,
+) -> tuple[dict, dict]:
     payload = {
         "model": f"accounts/fireworks/models/{model}",
         "max_tokens": max_tokens,
@@ -34,14 +60,177 @@ def fireworks_infer(
         "temperature": temperature,
         "messages": [{"role": "user", "content": text}],
     }
+    if json_mode:
+        payload["response_format"] = {"type": "json_object", "schema": REFERENCES_SCHEMA}
     headers = {
         "Accept": "application/json",
         "Content-Type": "application/json",
         "Authorization": f"Bearer {get_fireworks_api_key(api_key)}",
     }
-    response = requests.request("POST", url, headers=headers, data=json.dumps(payload))
+    return payload, headers
+
 
+def _parse_fireworks_completion(response_json: dict) -> Completion:
     try:
-        return response.json()["choices"][0]["message"]["content"]
+        choice = response_json["choices"][0]
+        return Completion(choice["message"]["content"], choice.get("finish_reason"))
     except KeyError:
+        return Completion(None)
+
+
+def _record_fireworks_usage(response_json: dict, tracker: InferenceTracker) -> Completion:
+    """Parses the completion and reports its usage and finish reason to the tracker."""
+    usage = response_json.get("usage") or {}
+    tracker.usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+    completion = _parse_fireworks_completion(response_json)
+    tracker.finish(completion.finish_reason)
+    return completion
+
+
+def fireworks_complete(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 0.6,
+    top_k: int = 100,
+    top_p: float = 1.0,
+    model: str = FIREWORKS_DEFAULT_MODEL,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> Completion:
+    """`fireworks_infer` with the finish reason."""
+    payload, headers = _fireworks_request(
+        text,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_k=top_k,
+        top_p=top_p,
+        model=model,
+        json_mode=json_mode,
+        api_key=api_key,
+    )
+    with track_inference("fireworks", model, text) as tracker:
+        response = get_fireworks_session().post(
+            fireworks_url(), headers=headers, json=payload, timeout=FIREWORKS_TIMEOUT
+        )
+        response.raise_for_status()
+        return _record_fireworks_usage(response.json(), tracker)
+
+
+def fireworks_infer(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 0.6,
+    top_k: int = 100,
+    top_p: float = 1.0,
+    model: str = FIREWORKS_DEFAULT_MODEL,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> str | None:
+    return fireworks_complete(
+        text,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_k=top_k,
+        top_p=top_p,
+        model=model,
+        json_mode=json_mode,
+        api_key=api_key,
+    ).text
+
+
+async def fireworks_infer_async(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 0.6,
+    top_k: int = 100,
+    top_p: float = 1.0,
+    model: str = FIREWORKS_DEFAULT_MODEL,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> str | None:
+    payload, headers = _fireworks_request(
+        text,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_k=top_k,
+        top_p=top_p,
+        model=model,
+        json_mode=json_mode,
+        api_key=api_key,
+    )
+    client = get_async_client("fireworks", make_async_http_client)
+    with track_inference("fireworks", model, text) as tracker:
+        response = await client.post(
+            fireworks_url(), headers=headers, json=payload, timeout=FIREWORKS_TIMEOUT
+        )
+        response.raise_for_status()
+        return _record_fireworks_usage(response.json(), tracker).text
+
+
+def _parse_fireworks_event(line: bytes | str) -> str | None:
+    """Returns the text delta of one server-sent event line."""
+    if isinstance(line, bytes):
+        line = line.decode("utf-8")
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:") :].strip()
+    if data == "[DONE]":
         return None
+    try:
+        return json.loads(data)["choices"][0]["delta"].get("content")
+    except (KeyError, IndexError, json.JSONDecodeError):
+        return None
+
+
+def _fireworks_text_stream(
+    text: str, model: str, payload: dict, headers: dict
+) -> Iterator[str | None]:
+    with (
+        track_inference("fireworks", model, text) as tracker,
+        get_fireworks_session().post(
+            fireworks_url(),
+            headers={**headers, "Accept": "text/event-stream"},
+            json={**payload, "stream": True},
+            timeout=FIREWORKS_TIMEOUT,
+            stream=True,
+        ) as response,
+    ):
+        response.raise_for_status()
+        for line in response.iter_lines():
+            delta = _parse_fireworks_event(line)
+            if delta:
+                tracker.first_token()
+            yield delta
+
+
+def fireworks_infer_stream(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 0.6,
+    top_k: int = 100,
+    top_p: float = 1.0,
+    model: str = FIREWORKS_DEFAULT_MODEL,
+    json_mode: bool = False,
+    on_repetition: str = "prefix",
+    api_key: str | None = None,
+) -> str | None:
+    """Streaming `fireworks_infer` that aborts the request when the output starts repeating.
+
+    Closing the response drops the connection, which stops the generation server-side.
+    """
+    payload, headers = _fireworks_request(
+        text,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        top_k=top_k,
+        top_p=top_p,
+        model=model,
+        json_mode=json_mode,
+        api_key=api_key,
+    )
+    chunks = _fireworks_text_stream(text, model, payload, headers)
+    return consume_stream(chunks, on_repetition=on_repetition)
@@ -1,32 +1,65 @@
-from functools import partial
+import os
+from functools import cache, partial
+from typing import Iterator
 
 from google import genai
 from google.genai import types
 
 from src.apis.common import get_api_key
 
-from ..constants import DEFAULT_MAX_TOKENS, GOOGLE_API_KEY
+from ..constants import DEFAULT_MAX_TOKENS, GEMINI_BASE_URL, GOOGLE_API_KEY
+from .clients import get_async_client
+from .completion import Completion
+from .prompt_cache import prompt_cache_stats
+from .streaming import consume_stream
+from .telemetry import InferenceTracker, track_inference
+
+GEMINI_DEFAULT_MODEL = "gemini-2.0-flash"
 
 get_google_api_key = partial(get_api_key, key_name=GOOGLE_API_KEY)
 
 
-def gemini_infer(
+def _gemini_http_options() -> types.HttpOptions | None:
+    """Base URL override from the GEMINI_BASE_URL variable."""
+    base_url = os.environ.get(GEMINI_BASE_URL)
+    return types.HttpOptions(base_url=base_url) if base_url else None
+
+
+@cache
+def get_gemini_client(api_key: str) -> genai.Client:
+    """Returns a long-lived client so that connections are reused across calls."""
+    return genai.Client(api_key=api_key, http_options=_gemini_http_options())
+
+
+def get_gemini_async_client(api_key: str):
+    """Returns a pooled async client bound to the running event loop."""
+    return get_async_client(
+        ("gemini", api_key),
+        lambda: genai.Client(api_key=api_key, http_options=_gemini_http_options()).aio,
+    )
+
+
+def _gemini_request(
     text: str,
     *,
-    top_k: int = 40,
-    top_p: float = 0.95,
-    max_tokens: int = DEFAULT_MAX_TOKENS,
-    temperature: float = 1.0,
-    api_key: str | None = None,
-):
-    client = genai.Client(api_key=get_google_api_key(api_key))
+    top_k: int,
+    top_p: float,
+    max_tokens: int,
+    temperature: float,
+    json_mode: bool = False,
+) -> tuple[list[types.Content], types.GenerateContentConfig]:
+    """Builds the request contents and config.
 
-    model = "gemini-2.0-flash"
+    The prompt is sent whole. The static template prefix (about 1k tokens) is far below
+    the minimum size of Gemini's explicit cached contents, so Gemini relies on implicit
+    caching, which serves a prefix shared with recent requests at a discount; the cached
+    input tokens are reported in the usage metadata.
+    """
     contents = [
         types.Content(
             role="user",
             parts=[
-                types.Part.from_text(text=text),
+                types.Part.from_text(text=str(text)),
             ],
         ),
     ]
@@ -35,11 +68,171 @@ def gemini_infer(
         top_p=top_p,
         top_k=top_k,
         max_output_tokens=max_tokens,
-        response_mime_type="text/plain",
+        response_mime_type="application/json" if json_mode else "text/plain",
+        response_schema=list[str] if json_mode else None,
+    )
+    return contents, generate_content_config
+
+
+def _record_gemini_usage(usage, tracker: InferenceTracker) -> None:
+    if usage is None:
+        return
+    prompt_cache_stats.record("gemini", usage.prompt_token_count, usage.cached_content_token_count)
+    tracker.usage(
+        usage.prompt_token_count, usage.candidates_token_count, usage.cached_content_token_count
     )
 
-    return client.models.generate_content(
-        model=model,
-        contents=contents,
-        config=generate_content_config,
+
+def _gemini_finish_reason(response) -> str | None:
+    if response.candidates and response.candidates[0].finish_reason is not None:
+        return response.candidates[0].finish_reason.name
+    return None
+
+
+def gemini_complete(
+    text: str,
+    *,
+    top_k: int = 40,
+    top_p: float = 0.95,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1.0,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> Completion:
+    """`gemini_infer` with the finish reason."""
+    api_key = get_google_api_key(api_key)
+    client = get_gemini_client(api_key)
+    with track_inference("gemini", GEMINI_DEFAULT_MODEL, text) as tracker:
+        contents, generate_content_config = _gemini_request(
+            text,
+            top_k=top_k,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+        )
+
+        response = client.models.generate_content(
+            model=GEMINI_DEFAULT_MODEL,
+            contents=contents,
+            config=generate_content_config,
+        )
+        _record_gemini_usage(response.usage_metadata, tracker)
+        finish_reason = _gemini_finish_reason(response)
+        tracker.finish(finish_reason)
+    return Completion(response.text, finish_reason)
+
+
+def gemini_infer(
+    text: str,
+    *,
+    top_k: int = 40,
+    top_p: float = 0.95,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1.0,
+    json_mode: bool = False,
+    api_key: str | None = None,
+):
+    return gemini_complete(
+        text,
+        top_k=top_k,
+        top_p=top_p,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_mode=json_mode,
+        api_key=api_key,
     ).text
+
+
+async def gemini_infer_async(
+    text: str,
+    *,
+    top_k: int = 40,
+    top_p: float = 0.95,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1.0,
+    json_mode: bool = False,
+    api_key: str | None = None,
+):
+    api_key = get_google_api_key(api_key)
+    client = get_gemini_async_client(api_key)
+    with track_inference("gemini", GEMINI_DEFAULT_MODEL, text) as tracker:
+        contents, generate_content_config = _gemini_request(
+            text,
+            top_k=top_k,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+        )
+
+        response = await client.models.generate_content(
+            model=GEMINI_DEFAULT_MODEL,
+            contents=contents,
+            config=generate_content_config,
+        )
+        _record_gemini_usage(response.usage_metadata, tracker)
+        tracker.finish(_gemini_finish_reason(response))
+    return response.text
+
+
+def _gemini_text_stream(
+    text: str,
+    *,
+    top_k: int,
+    top_p: float,
+    max_tokens: int,
+    temperature: float,
+    json_mode: bool,
+    api_key: str | None,
+) -> Iterator[str | None]:
+    api_key = get_google_api_key(api_key)
+    client = get_gemini_client(api_key)
+    with track_inference("gemini", GEMINI_DEFAULT_MODEL, text) as tracker:
+        contents, generate_content_config = _gemini_request(
+            text,
+            top_k=top_k,
+            top_p=top_p,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            json_mode=json_mode,
+        )
+        usage = None
+        for chunk in client.models.generate_content_stream(
+            model=GEMINI_DEFAULT_MODEL,
+            contents=contents,
+            config=generate_content_config,
+        ):
+            # Usage is cumulative, so only the last report counts
+            usage = chunk.usage_metadata or usage
+            if chunk.text:
+                tracker.first_token()
+            finish_reason = _gemini_finish_reason(chunk)
+            if finish_reason is not None:
+                tracker.finish(finish_reason)
+            yield chunk.text
+        _record_gemini_usage(usage, tracker)
+
+
+def gemini_infer_stream(
+    text: str,
+    *,
+    top_k: int = 40,
+    top_p: float = 0.95,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1.0,
+    json_mode: bool = False,
+    on_repetition: str = "prefix",
+    api_key: str | None = None,
+) -> str | None:
+    """Streaming `gemini_infer` that aborts the request when the output starts repeating."""
+    chunks = _gemini_text_stream(
+        text,
+        top_k=top_k,
+        top_p=top_p,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        json_mode=json_mode,
+        api_key=api_key,
+    )
+    return consume_stream(chunks, on_repetition=on_repetition)
@@ -0,0 +1,89 @@
+import json
+import threading
+import time
+from pathlib import Path
+from typing import Any, Hashable, Mapping
+
+from .common import is_invalid_json
+
+
+def _hashable(value: Any) -> Hashable:
+    """Turns JSON lists back into tuples, so IDs such as `(doc, chunk)` survive a round trip."""
+    if isinstance(value, list):
+        return tuple(_hashable(v) for v in value)
+    return value
+
+
+class RunJournal:
+    """Append-only JSONL journal of inference results keyed by document ID.
+
+    Every result is written (and flushed) the moment it arrives, so an interrupted run
+    can be resumed by skipping the documents that already have a valid result. Each
+    record can carry a key of the request (e.g. `make_cache_key` of the prompt, model
+    and parameters), so that results of a different prompt or configuration are not
+    resumed.
+    """
+
+    def __init__(self, path: Path | str, resume: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume and self.path.exists():
+            self.path.unlink()
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        if self._file.tell() > 0 and not self._ends_with_newline():
+            # Terminate a line cut short by a crash, so the next record starts a new one
+            self._file.write("\n")
+            self._file.flush()
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, "rb") as f:
+            f.seek(-1, 2)
+            return f.read(1) == b"\n"
+
+    def record(self, doc_id: Hashable, result: str | None, key: str | None = None) -> None:
+        line = json.dumps(
+            {
+                "id": doc_id,
+                "key": key,
+                "result": result,
+                "valid": not is_invalid_json(result),
+                "time": time.time(),
+            },
+            ensure_ascii=False,
+        )
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def completed(self, keys: Mapping[Hashable, str] | None = None) -> dict[Hashable, str]:
+        """Returns the latest valid result of every document in the journal.
+
+        Args:
+            keys: Expected request key of each document; when given, only results
+                recorded with the matching key are returned
+        """
+        done: dict[Hashable, str] = {}
+        with self._lock, open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A line cut short by a crash
+                    continue
+                if not entry["valid"]:
+                    continue
+                doc_id = _hashable(entry["id"])
+                if keys is not None and entry.get("key") != keys.get(doc_id):
+                    continue
+                done[doc_id] = entry["result"]
+        return done
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "RunJournal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -0,0 +1,73 @@
+import json
+import re
+
+from .streaming import close_json_prefix
+
+# Structured-output schema of the extraction templates: a list of reference strings
+REFERENCES_SCHEMA = {"type": "array", "items": {"type": "string"}}
+
+# OpenAI's strict JSON schemas need an object at the root
+REFERENCES_OBJECT_KEY = "references"
+REFERENCES_OBJECT_SCHEMA = {
+    "type": "object",
+    "properties": {REFERENCES_OBJECT_KEY: REFERENCES_SCHEMA},
+    "required": [REFERENCES_OBJECT_KEY],
+    "additionalProperties": False,
+}
+
+_TRAILING_COMMA_RE = re.compile(r",\s*(?=[\]}])")
+
+
+def _loads_list(text: str) -> list | None:
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        return None
+    if isinstance(parsed, dict) and isinstance(parsed.get(REFERENCES_OBJECT_KEY), list):
+        return parsed[REFERENCES_OBJECT_KEY]
+    return parsed if isinstance(parsed, list) else None
+
+
+def repair_json_list(raw: str | None, close_truncated: bool = True) -> str | None:
+    """Salvages a JSON list from a malformed or truncated response.
+
+    Handles markdown fences and surrounding prose, trailing commas, the
+    `{"references": [...]}` wrapper of structured outputs, and, with `close_truncated`,
+    truncated output (including a degenerate, duplicated tail) by closing the list after
+    its last complete element. Closing drops the references that were cut off, so leave
+    it off where the request can still be continued or retried.
+
+    Returns:
+        The list as a JSON string, or None if nothing could be salvaged
+    """
+    if raw is None:
+        return None
+    text = raw.replace("```json", "").replace("```", "").strip()
+
+    parsed = _loads_list(text)
+    if parsed is None:
+        start, end = text.find("["), text.rfind("]")
+        if start != -1 and end > start:
+            candidate = text[start : end + 1]
+            parsed = _loads_list(candidate)
+            if parsed is None:
+                parsed = _loads_list(_TRAILING_COMMA_RE.sub("", candidate))
+
+    if parsed is None:
+        if not close_truncated:
+            return None
+        closed = close_json_prefix(text)
+        parsed = json.loads(closed) if closed is not None else None
+        if not parsed:
+            # An empty salvage of a non-empty response is a failure, not a result
+            return None
+
+    return json.dumps(parsed, ensure_ascii=False)
+
+
+def unwrap_references(content: str | None) -> str | None:
+    """Turns a `{"references": [...]}` structured output into the plain JSON list."""
+    if content is None:
+        return None
+    parsed = _loads_list(content)
+    return json.dumps(parsed, ensure_ascii=False) if parsed is not None else content
@@ -0,0 +1,298 @@
+import json
+import math
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from ..constants import (
+    ANTHROPIC_API_KEY,
+    FIREWORKS_API_KEY,
+    FIREWORKS_BASE_URL,
+    GEMINI_BASE_URL,
+    GOOGLE_API_KEY,
+    OPENAI_API_KEY,
+)
+
+# Responses that are not valid JSON: the first one is repairable locally, the second is not
+MALFORMED_RESPONSES = (
+    'Here are the references:\n```json\n["§ 1 o. z.", "§ 2 o. z.",]\n```',
+    "I am sorry, I cannot find any references in this text.",
+)
+
+
+@dataclass
+class MockBehavior:
+    """Behaviour of the mock provider.
+
+    Args:
+        latency: Median latency of a response in seconds
+        latency_sigma: Shape of the log-normal latency distribution (0 = constant latency)
+        error_rate: Share of requests answered with an error status
+        error_statuses: Statuses of the injected errors, picked uniformly
+        retry_after: `retry-after` header of the injected errors (None = no header)
+        truncation_rate: Share of responses cut in half with a max-tokens finish reason
+        malformed_rate: Share of responses that are not valid JSON (see `MALFORMED_RESPONSES`)
+        references: Number of references in a regular response
+        seed: Seed of the random generator, for reproducible runs
+    """
+
+    latency: float = 0.05
+    latency_sigma: float = 0.0
+    error_rate: float = 0.0
+    error_statuses: tuple[int, ...] = (429, 500, 503)
+    retry_after: float | None = None
+    truncation_rate: float = 0.0
+    malformed_rate: float = 0.0
+    references: int = 5
+    seed: int | None = None
+
+
+@dataclass(frozen=True)
+class _Reply:
+    status: int
+    text: str = ""
+    truncated: bool = False
+    delay: float = 0.0
+
+
+def _prompt_text(api: str, payload: dict) -> str:
+    if api == "gemini":
+        contents = payload.get("contents") or []
+        return "".join(p.get("text", "") for c in contents for p in c.get("parts", []))
+    parts = []
+    for message in payload.get("messages") or []:
+        content = message.get("content")
+        if isinstance(content, list):
+            parts.extend(block.get("text", "") for block in content)
+        elif isinstance(content, str):
+            parts.append(content)
+    return "".join(parts)
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockLLMServer:
+    """Local stand-in for the provider APIs, for offline tests and benchmarks.
+
+    Serves the OpenAI-compatible chat completions API (OpenAI and Fireworks, including
+    streaming), Anthropic's messages API and Gemini's generateContent API, each answering
+    with a JSON list of references. Latency, errors, truncation and malformed output are
+    injected according to `behavior`.
+
+    Use `environ()` to point the provider wrappers at the server:
+
+        with MockLLMServer(MockBehavior(error_rate=0.05)) as server:
+            os.environ.update(server.environ())
+            run_inference_parallel_with_retry(prompts, fireworks_infer)
+
+    Provider clients are cached per API key, so set the variables before the first call.
+    """
+
+    def __init__(self, behavior: MockBehavior | None = None, host: str = "127.0.0.1"):
+        self.behavior = behavior or MockBehavior()
+        self.counts: Counter = Counter()
+        self._rng = random.Random(self.behavior.seed)
+        self._lock = threading.Lock()
+        self._httpd = _MockHTTPServer((host, 0), _make_handler(self))
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environ(self, api_key: str = "mock-key") -> dict[str, str]:
+        """Environment variables that send every provider wrapper to this server."""
+        return {
+            ANTHROPIC_API_KEY: api_key,
+            OPENAI_API_KEY: api_key,
+            GOOGLE_API_KEY: api_key,
+            FIREWORKS_API_KEY: api_key,
+            "ANTHROPIC_BASE_URL": self.url,
+            "OPENAI_BASE_URL": f"{self.url}/v1",
+            GEMINI_BASE_URL: self.url,
+            FIREWORKS_BASE_URL: f"{self.url}/inference/v1",
+        }
+
+    def start(self) -> "MockLLMServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "MockLLMServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _draw(self) -> _Reply:
+        """Decides the fate of one request."""
+        b = self.behavior
+        with self._lock:
+            rng = self._rng
+            delay = b.latency
+            if b.latency_sigma:
+                delay *= math.exp(rng.gauss(0, b.latency_sigma))
+            self.counts["requests"] += 1
+            if rng.random() < b.error_rate:
+                self.counts["errors"] += 1
+                return _Reply(rng.choice(b.error_statuses), delay=delay)
+            if rng.random() < b.malformed_rate:
+                self.counts["malformed"] += 1
+                return _Reply(200, rng.choice(MALFORMED_RESPONSES), delay=delay)
+            references = [f"§ {100 + i} o. z." for i in range(b.references)]
+            text = json.dumps(references, ensure_ascii=False)
+            if rng.random() < b.truncation_rate:
+                self.counts["truncated"] += 1
+                return _Reply(200, text[: len(text) // 2], truncated=True, delay=delay)
+            self.counts["ok"] += 1
+            return _Reply(200, text, delay=delay)
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Parallel benchmarks open many connections at once
+    request_queue_size = 1024
+
+
+def _openai_body(payload: dict, prompt: str, reply: _Reply) -> dict:
+    text = reply.text
+    structured = (payload.get("response_format") or {}).get("type") == "json_schema"
+    if structured and not reply.truncated and text.startswith("["):
+        text = json.dumps({"references": json.loads(text)}, ensure_ascii=False)
+    return {
+        "id": "chatcmpl-mock",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": payload.get("model", "mock"),
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "length" if reply.truncated else "stop",
+            }
+        ],
+        "usage": {
+            "prompt_tokens": _tokens(prompt),
+            "completion_tokens": _tokens(text),
+            "total_tokens": _tokens(prompt) + _tokens(text),
+        },
+    }
+
+
+def _openai_events(reply: _Reply) -> bytes:
+    """Server-sent events of a streamed chat completion."""
+    step = max(1, len(reply.text) // 4)
+    pieces = [reply.text[i : i + step] for i in range(0, len(reply.text), step)]
+    events = [{"choices": [{"index": 0, "delta": {"content": p}}]} for p in pieces]
+    finish_reason = "length" if reply.truncated else "stop"
+    events.append({"choices": [{"index": 0, "delta": {}, "finish_reason": finish_reason}]})
+    lines = [f"data: {json.dumps(event, ensure_ascii=False)}\n\n" for event in events]
+    lines.append("data: [DONE]\n\n")
+    return "".join(lines).encode("utf-8")
+
+
+def _anthropic_body(payload: dict, prompt: str, reply: _Reply) -> dict:
+    text = reply.text
+    messages = payload.get("messages") or []
+    if messages and messages[-1].get("role") == "assistant":
+        # The model continues the prefilled answer
+        prefill = messages[-1].get("content") or ""
+        text = text[len(prefill) :] if text.startswith(prefill) else text
+    return {
+        "id": "msg_mock",
+        "type": "message",
+        "role": "assistant",
+        "model": payload.get("model", "mock"),
+        "content": [{"type": "text", "text": text}],
+        "stop_reason": "max_tokens" if reply.truncated else "end_turn",
+        "stop_sequence": None,
+        "usage": {"input_tokens": _tokens(prompt), "output_tokens": _tokens(text)},
+    }
+
+
+def _gemini_body(payload: dict, prompt: str, reply: _Reply) -> dict:
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": [{"text": reply.text}]},
+                "finishReason": "MAX_TOKENS" if reply.truncated else "STOP",
+            }
+        ],
+        "usageMetadata": {
+            "promptTokenCount": _tokens(prompt),
+            "candidatesTokenCount": _tokens(reply.text),
+            "totalTokenCount": _tokens(prompt) + _tokens(reply.text),
+        },
+    }
+
+
+def _make_handler(server: MockLLMServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        # Keep-alive, so that the clients' connection pools are exercised
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str, headers=None) -> None:
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, body: dict, headers=None) -> None:
+            self._send(status, json.dumps(body).encode("utf-8"), "application/json", headers)
+
+        def do_POST(self) -> None:
+            length = int(self.headers.get("Content-Length") or 0)
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            path = self.path.split("?")[0]
+            if path.endswith("/chat/completions"):
+                api = "openai"
+            elif path.endswith("/messages"):
+                api = "anthropic"
+            elif path.endswith(":generateContent"):
+                api = "gemini"
+            else:
+                self._send_json(404, {"error": {"code": 404, "message": f"No route {path}"}})
+                return
+            if payload.get("stream") and api != "openai":
+                self._send_json(501, {"error": {"code": 501, "message": "Not streamed"}})
+                return
+
+            reply = server._draw()
+            time.sleep(reply.delay)
+            if reply.status != 200:
+                headers = {}
+                if server.behavior.retry_after is not None:
+                    headers["retry-after"] = str(server.behavior.retry_after)
+                error = {"code": reply.status, "message": "Injected error", "type": "mock"}
+                self._send_json(reply.status, {"type": "error", "error": error}, headers)
+                return
+
+            prompt = _prompt_text(api, payload)
+            if api == "openai" and payload.get("stream"):
+                self._send(200, _openai_events(reply), "text/event-stream")
+            elif api == "openai":
+                self._send_json(200, _openai_body(payload, prompt, reply))
+            elif api == "anthropic":
+                self._send_json(200, _anthropic_body(payload, prompt, reply))
+            else:
+                self._send_json(200, _gemini_body(payload, prompt, reply))
+
+    return Handler
@@ -1,26 +1,181 @@
-from functools import partial
+from functools import cache, partial
+from typing import Iterator
 
-from openai import OpenAI
+from openai import NOT_GIVEN, AsyncOpenAI, OpenAI
 
 from ..constants import DEFAULT_MAX_TOKENS, OPENAI_API_KEY
+from .clients import get_async_client, make_async_http_client
 from .common import get_api_key
+from .completion import Completion
+from .json_repair import REFERENCES_OBJECT_SCHEMA, unwrap_references
+from .prompt_cache import prompt_cache_stats
+from .streaming import consume_stream
+from .telemetry import InferenceTracker, track_inference
 
 get_openai_api_key = partial(get_api_key, key_name=OPENAI_API_KEY)
 
 
+@cache
+def get_openai_client(api_key: str) -> OpenAI:
+    """Returns a long-lived client so that connections are reused across calls."""
+    return OpenAI(api_key=api_key)
+
+
+def get_openai_async_client(api_key: str) -> AsyncOpenAI:
+    """Returns a pooled async client bound to the running event loop."""
+    return get_async_client(
+        ("openai", api_key),
+        lambda: AsyncOpenAI(api_key=api_key, http_client=make_async_http_client()),
+    )
+
+
+def _record_openai_usage(usage, tracker: InferenceTracker) -> None:
+    """OpenAI caches prompt prefixes of 1024+ tokens automatically, which is why templates
+    put the static instructions first; only the cache hits need to be read back."""
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    prompt_cache_stats.record("openai", usage.prompt_tokens, cached)
+    tracker.usage(usage.prompt_tokens, usage.completion_tokens, cached)
+
+
+def _openai_model(mini: bool) -> str:
+    return "gpt-4o-mini" if mini else "gpt-4"
+
+
+def _openai_response_format(json_mode: bool, mini: bool):
+    """Strict JSON schema output. Only gpt-4o-mini supports structured outputs; with
+    plain gpt-4 the prompt alone asks for JSON."""
+    if not json_mode or not mini:
+        return NOT_GIVEN
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": "references", "strict": True, "schema": REFERENCES_OBJECT_SCHEMA},
+    }
+
+
+def openai_complete(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1,
+    mini: bool = False,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> Completion:
+    """`openai_infer` with the finish reason."""
+    client = get_openai_client(get_openai_api_key(api_key))
+    with track_inference("openai", _openai_model(mini), text) as tracker:
+        completion = client.chat.completions.create(
+            model=_openai_model(mini),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": text}],
+            response_format=_openai_response_format(json_mode, mini),  # type: ignore
+        )
+        _record_openai_usage(completion.usage, tracker)
+        choice = completion.choices[0]
+        tracker.finish(choice.finish_reason)
+    content = choice.message.content
+    return Completion(unwrap_references(content) if json_mode else content, choice.finish_reason)
+
+
 def openai_infer(
     text: str,
     *,
     max_tokens: int = DEFAULT_MAX_TOKENS,
     temperature: float = 1,
     mini: bool = False,
+    json_mode: bool = False,
     api_key: str | None = None,
 ) -> str:
-    client = OpenAI(api_key=get_openai_api_key(api_key))
-    completion = client.chat.completions.create(
-        model="gpt-4o-mini" if mini else "gpt-4",
+    completion = openai_complete(
+        text,
+        max_tokens=max_tokens,
+        temperature=temperature,
+        mini=mini,
+        json_mode=json_mode,
+        api_key=api_key,
+    )
+    return completion.text  # type: ignore
+
+
+async def openai_infer_async(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1,
+    mini: bool = False,
+    json_mode: bool = False,
+    api_key: str | None = None,
+) -> str:
+    client = get_openai_async_client(get_openai_api_key(api_key))
+    with track_inference("openai", _openai_model(mini), text) as tracker:
+        completion = await client.chat.completions.create(
+            model=_openai_model(mini),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": text}],
+            response_format=_openai_response_format(json_mode, mini),  # type: ignore
+        )
+        _record_openai_usage(completion.usage, tracker)
+        tracker.finish(completion.choices[0].finish_reason)
+    content = completion.choices[0].message.content
+    return unwrap_references(content) if json_mode else content  # type: ignore
+
+
+def _openai_text_stream(
+    text: str,
+    *,
+    max_tokens: int,
+    temperature: float,
+    mini: bool,
+    json_mode: bool,
+    api_key: str | None,
+) -> Iterator[str | None]:
+    client = get_openai_client(get_openai_api_key(api_key))
+    with (
+        track_inference("openai", _openai_model(mini), text) as tracker,
+        client.chat.completions.create(
+            model=_openai_model(mini),
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": text}],
+            response_format=_openai_response_format(json_mode, mini),  # type: ignore
+            stream=True,
+            stream_options={"include_usage": True},
+        ) as stream,
+    ):
+        for chunk in stream:
+            if chunk.choices:
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    tracker.first_token()
+                if choice.finish_reason is not None:
+                    tracker.finish(choice.finish_reason)
+                yield choice.delta.content
+            _record_openai_usage(chunk.usage, tracker)
+
+
+def openai_infer_stream(
+    text: str,
+    *,
+    max_tokens: int = DEFAULT_MAX_TOKENS,
+    temperature: float = 1,
+    mini: bool = False,
+    json_mode: bool = False,
+    on_repetition: str = "prefix",
+    api_key: str | None = None,
+) -> str | None:
+    """Streaming `openai_infer` that aborts the request when the output starts repeating."""
+    chunks = _openai_text_stream(
+        text,
         max_tokens=max_tokens,
         temperature=temperature,
-        messages=[{"role": "user", "content": text}],
+        mini=mini,
+        json_mode=json_mode,
+        api_key=api_key,
     )
-    return completion.choices[0].message.content  # type: ignore
+    content = consume_stream(chunks, on_repetition=on_repetition)
+    return unwrap_references(content) if json_mode else content
@@ -0,0 +1,71 @@
+import threading
+from dataclasses import dataclass, field
+
+from ..templates import CachedPrompt
+
+
+def split_prompt(text: str) -> tuple[str, str]:
+    """Returns the cacheable prefix (empty if there is none) and the variable suffix."""
+    if isinstance(text, CachedPrompt) and text.prefix_len > 0:
+        return text.prefix, text.suffix
+    return "", str(text)
+
+
+@dataclass
+class ProviderCacheStats:
+    requests: int = 0
+    input_tokens: int = 0
+    cached_tokens: int = 0
+    cache_write_tokens: int = 0
+
+    @property
+    def hit_ratio(self) -> float:
+        """Share of input tokens served from the provider's prompt cache."""
+        return self.cached_tokens / self.input_tokens if self.input_tokens else 0.0
+
+
+@dataclass
+class PromptCacheStats:
+    """Prompt-cache token counts reported by the providers, per provider.
+
+    `input_tokens` includes cached tokens, so that `hit_ratio` is comparable across
+    providers (Anthropic reports cached tokens separately from the other input tokens).
+    """
+
+    providers: dict[str, ProviderCacheStats] = field(default_factory=dict)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(
+        self,
+        provider: str,
+        input_tokens: int | None,
+        cached_tokens: int | None = 0,
+        cache_write_tokens: int | None = 0,
+    ) -> None:
+        with self._lock:
+            stats = self.providers.setdefault(provider, ProviderCacheStats())
+            stats.requests += 1
+            stats.input_tokens += input_tokens or 0
+            stats.cached_tokens += cached_tokens or 0
+            stats.cache_write_tokens += cache_write_tokens or 0
+
+    def reset(self) -> None:
+        with self._lock:
+            self.providers.clear()
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        with self._lock:
+            return {
+                name: {
+                    "requests": s.requests,
+                    "input_tokens": s.input_tokens,
+                    "cached_tokens": s.cached_tokens,
+                    "cache_write_tokens": s.cache_write_tokens,
+                    "hit_ratio": round(s.hit_ratio, 3),
+                }
+                for name, s in self.providers.items()
+            }
+
+
+# Shared by all provider wrappers; reset it at the start of a run and print it at the end
+prompt_cache_stats = PromptCacheStats()
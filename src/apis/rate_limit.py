@@ -0,0 +1,242 @@
+import asyncio
+import threading
+import time
+from functools import wraps
+from typing import Awaitable, Callable
+
+from ..token_count import TOKENIZER_PROFILES, count_tokens
+from .errors import get_response_headers, is_rate_limit_error, parse_rate_limit_headers
+from .registry import resolve_provider
+
+# Conservative defaults; raise them to match the account tier (None = unlimited)
+PROVIDER_RATE_LIMITS: dict[str, dict[str, int | None]] = {
+    "claude": {"rpm": 1000, "tpm": 80_000},
+    "openai": {"rpm": 5000, "tpm": 2_000_000},
+    "gemini": {"rpm": 2000, "tpm": 4_000_000},
+    "fireworks": {"rpm": 600, "tpm": None},
+}
+
+DEFAULT_RETRY_AFTER = 1.0
+_POLL_INTERVAL = 0.05
+
+
+def estimate_prompt_tokens(text: str, provider: str | None = None) -> int:
+    """Offline token estimate used for tokens-per-minute budgeting."""
+    if provider not in TOKENIZER_PROFILES:
+        return len(text) // 4 + 1
+    return count_tokens(text, provider)
+
+
+class TokenBucket:
+    """Continuously refilled bucket holding at most `per_minute` units."""
+
+    def __init__(self, per_minute: int):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are available now)."""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self.level) / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= min(amount, self.capacity)
+
+    def cap(self, remaining: int) -> None:
+        """Aligns the bucket with the remaining budget reported by the provider."""
+        self.level = min(self.level, float(remaining))
+
+
+class AdaptiveRateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets with AIMD concurrency control.
+
+    Concurrency grows by one after every `concurrency` successful requests and is
+    multiplied by `decrease_factor` when the provider throttles. Throttling also pauses
+    new requests for the `retry-after` period reported by the provider.
+
+    Args:
+        rpm: Requests per minute (None = unlimited)
+        tpm: Estimated prompt tokens per minute (None = unlimited)
+        provider: Provider name used to pick the offline token counter
+        initial_concurrency: Starting number of requests in flight
+        min_concurrency: Lower bound of the adaptive concurrency
+        max_concurrency: Upper bound of the adaptive concurrency
+        decrease_factor: Multiplicative decrease applied on throttling
+    """
+
+    def __init__(
+        self,
+        rpm: int | None = None,
+        tpm: int | None = None,
+        initial_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_concurrency: int = 256,
+        decrease_factor: float = 0.5,
+        provider: str | None = None,
+    ):
+        self.provider = provider
+        self.requests = TokenBucket(rpm) if rpm else None
+        self.tokens = TokenBucket(tpm) if tpm else None
+        self.concurrency = float(initial_concurrency)
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.decrease_factor = decrease_factor
+
+        self.in_flight = 0
+        self.throttled = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+
+    def try_acquire(self, tokens: int = 0) -> float:
+        """Acquires a slot if possible. Returns 0 on success, otherwise the seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= int(self.concurrency):
+                return _POLL_INTERVAL
+
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Blocks until a request may be sent. Returns the acquisition time for `release`."""
+        while (wait := self.try_acquire(tokens)) > 0:
+            with self._cond:
+                self._cond.wait(timeout=wait)
+        return time.monotonic()
+
+    async def acquire_async(self, tokens: int = 0) -> float:
+        while (wait := self.try_acquire(tokens)) > 0:
+            await asyncio.sleep(wait)
+        return time.monotonic()
+
+    def release(self, acquired_at: float, exc: BaseException | None = None) -> None:
+        """Returns the slot and adapts concurrency to the outcome of the request."""
+        with self._cond:
+            self.in_flight -= 1
+
+            if exc is not None and is_rate_limit_error(exc):
+                self.throttled += 1
+                info = parse_rate_limit_headers(get_response_headers(exc))
+                now = time.monotonic()
+                retry_after = info.retry_after or DEFAULT_RETRY_AFTER
+                self._paused_until = max(self._paused_until, now + retry_after)
+                if self.requests is not None and info.remaining_requests is not None:
+                    self.requests.cap(info.remaining_requests)
+                if self.tokens is not None and info.remaining_tokens is not None:
+                    self.tokens.cap(info.remaining_tokens)
+                # Decrease once per congestion event, not once per request that was in flight
+                if acquired_at >= self._last_decrease:
+                    self.concurrency = max(
+                        self.min_concurrency, self.concurrency * self.decrease_factor
+                    )
+                    self._last_decrease = now
+                    self._successes = 0
+            elif exc is None:
+                self._successes += 1
+                if self._successes >= int(self.concurrency):
+                    self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+                    self._successes = 0
+
+            self._cond.notify_all()
+
+
+_limiters: dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> AdaptiveRateLimiter:
+    """Returns the limiter shared by all calls to `provider` in this process.
+
+    Aliases of a registered provider (e.g. "anthropic" for "claude") share its limiter.
+    """
+    try:
+        provider = resolve_provider(provider).name
+    except KeyError:
+        pass
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = AdaptiveRateLimiter(
+                **PROVIDER_RATE_LIMITS.get(provider, {}), provider=provider
+            )
+        return _limiters[provider]
+
+
+def rate_limited(
+    infer_func: Callable[..., str | None],
+    limiter: AdaptiveRateLimiter,
+    max_throttle_retries: int = 5,
+) -> Callable[..., str | None]:
+    """Wraps an inference function so that every call goes through `limiter`.
+
+    Throttled requests are re-queued behind the limiter up to `max_throttle_retries` times.
+    """
+
+    @wraps(infer_func)
+    def wrapper(text: str, **infer_kwargs) -> str | None:
+        tokens = estimate_prompt_tokens(text, limiter.provider)
+        attempt = 0
+        while True:
+            acquired_at = limiter.acquire(tokens)
+            try:
+                result = infer_func(text, **infer_kwargs)
+            except Exception as e:
+                limiter.release(acquired_at, e)
+                if is_rate_limit_error(e) and attempt < max_throttle_retries:
+                    attempt += 1
+                    continue
+                raise
+            limiter.release(acquired_at)
+            return result
+
+    return wrapper
+
+
+def rate_limited_async(
+    infer_func: Callable[..., Awaitable[str | None]],
+    limiter: AdaptiveRateLimiter,
+    max_throttle_retries: int = 5,
+) -> Callable[..., Awaitable[str | None]]:
+    """Async counterpart of `rate_limited` for the `*_infer_async` functions."""
+
+    @wraps(infer_func)
+    async def wrapper(text: str, **infer_kwargs) -> str | None:
+        tokens = estimate_prompt_tokens(text, limiter.provider)
+        attempt = 0
+        while True:
+            acquired_at = await limiter.acquire_async(tokens)
+            try:
+                result = await infer_func(text, **infer_kwargs)
+            except Exception as e:
+                limiter.release(acquired_at, e)
+                if is_rate_limit_error(e) and attempt < max_throttle_retries:
+                    attempt += 1
+                    continue
+                raise
+            limiter.release(acquired_at)
+            return result
+
+    return wrapper
@@ -0,0 +1,110 @@
+import importlib
+import threading
+from dataclasses import dataclass, field
+from typing import Callable
+
+# Function variants every provider module offers, as `<prefix>_<variant>`
+VARIANTS = ("infer", "infer_async", "infer_stream", "complete")
+
+
+@dataclass(frozen=True)
+class ProviderSpec:
+    """Where the inference functions of a provider live.
+
+    Args:
+        name: Canonical provider name
+        module: Dotted path of the module with the `<prefix>_<variant>` functions; it is
+            only imported when one of them is first requested
+        prefix: Function name prefix (the name by default)
+        functions: Functions given directly, by variant (take precedence over `module`)
+    """
+
+    name: str
+    module: str | None = None
+    prefix: str | None = None
+    functions: dict[str, Callable] = field(default_factory=dict)
+
+
+_providers: dict[str, ProviderSpec] = {}
+_aliases: dict[str, str] = {}
+_lock = threading.Lock()
+
+
+def register_provider(
+    name: str,
+    module: str | None = None,
+    prefix: str | None = None,
+    aliases: tuple[str, ...] = (),
+    **functions: Callable,
+) -> ProviderSpec:
+    """Registers a provider under `name` and its `aliases` (replacing an earlier one).
+
+    Either point to a module, which is imported lazily, or pass the functions directly:
+
+        register_provider("local", "my_package.local_llm", prefix="local")
+        register_provider("echo", infer=lambda text, **kwargs: text)
+    """
+    if module is None and not functions:
+        raise ValueError("A provider needs a module or functions.")
+    unknown = set(functions) - set(VARIANTS)
+    if unknown:
+        raise ValueError(f"Unknown function variants: {sorted(unknown)}")
+    spec = ProviderSpec(name, module, prefix or name, functions)
+    with _lock:
+        _providers[name] = spec
+        for alias in (name, *aliases):
+            _aliases[alias.lower()] = name
+    return spec
+
+
+def unregister_provider(name: str) -> None:
+    """Removes a provider and all of its aliases (given its name or any alias)."""
+    with _lock:
+        canonical = _aliases.get(name.lower())
+        if canonical is None:
+            raise KeyError(f"Unknown provider {name!r}")
+        del _providers[canonical]
+        for alias in [a for a, target in _aliases.items() if target == canonical]:
+            del _aliases[alias]
+
+
+def resolve_provider(name: str) -> ProviderSpec:
+    """Returns the provider registered under `name` or one of its aliases."""
+    with _lock:
+        canonical = _aliases.get(name.lower())
+        if canonical is None:
+            known = ", ".join(sorted(_aliases))
+            raise KeyError(f"Unknown provider {name!r} (known: {known})")
+        return _providers[canonical]
+
+
+def available_providers() -> list[str]:
+    with _lock:
+        return sorted(_providers)
+
+
+def get_infer_func(name: str, variant: str = "infer") -> Callable:
+    """Returns a provider function, importing the provider (and its SDK) on first use.
+
+    Args:
+        name: Provider name or alias, e.g. "gemini", "google", "claude" or "anthropic"
+        variant: One of `VARIANTS`; "complete" returns a `Completion` with the finish reason
+    """
+    if variant not in VARIANTS:
+        raise ValueError(f"Unknown variant {variant!r}, expected one of {VARIANTS}")
+    spec = resolve_provider(name)
+    if variant in spec.functions:
+        return spec.functions[variant]
+    if spec.module is None:
+        raise KeyError(f"Provider {spec.name!r} has no {variant!r} function")
+    module = importlib.import_module(spec.module)
+    try:
+        return getattr(module, f"{spec.prefix}_{variant}")
+    except AttributeError:
+        raise KeyError(f"Provider {spec.name!r} has no {variant!r} function") from None
+
+
+register_provider("claude", f"{__package__}.anthropic", aliases=("anthropic",))
+register_provider("gemini", f"{__package__}.google", aliases=("google",))
+register_provider("openai", f"{__package__}.openai")
+register_provider("fireworks", f"{__package__}.fireworks")
@@ -0,0 +1,144 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+from functools import wraps
+from typing import Awaitable, Callable
+
+from .common import is_invalid_json
+from .errors import get_response_headers, is_retryable_error, parse_rate_limit_headers
+from .json_repair import repair_json_list
+from .telemetry import current_attempt
+
+
+@dataclass
+class RetryPolicy:
+    """Per-request retry schedule with exponential backoff and full jitter.
+
+    Args:
+        max_attempts: Maximum number of calls per item (including the first one)
+        base_delay: Backoff before the first retry, doubled for every further retry
+        max_delay: Upper bound of a single backoff
+        deadline: Seconds after which an item is given up (None = no deadline). Async calls
+            are cancelled at the deadline; a sync call cannot be interrupted, so there the
+            deadline only stops further retries and a single hung call is bounded by the
+            client's request timeout alone
+        retry_invalid_json: Whether a response that is not valid JSON is retried
+        repair_json: Whether syntax errors of invalid JSON (fences, prose, trailing commas)
+            are first repaired locally; truncated output is always retried
+    """
+
+    max_attempts: int = 4
+    base_delay: float = 1.0
+    max_delay: float = 60.0
+    deadline: float | None = None
+    retry_invalid_json: bool = True
+    repair_json: bool = True
+
+    def backoff(self, attempt: int, exc: BaseException | None = None) -> float:
+        """Delay before retry number `attempt` (1-based), honouring `retry-after`."""
+        if exc is not None:
+            retry_after = parse_rate_limit_headers(get_response_headers(exc)).retry_after
+            if retry_after is not None:
+                return min(retry_after, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+def _repair(policy: RetryPolicy, result: str | None) -> str | None:
+    """Replaces an invalid JSON result by its local repair, if one is possible.
+
+    Truncated output is left invalid, so that it is continued or retried rather than
+    accepted without its cut-off references.
+    """
+    if not policy.repair_json or not result or not is_invalid_json(result):
+        return result
+    repaired = repair_json_list(result, close_truncated=False)
+    return repaired if repaired is not None else result
+
+
+def _needs_retry(policy: RetryPolicy, result: str | None) -> bool:
+    return not result or (policy.retry_invalid_json and is_invalid_json(result))
+
+
+def with_retry(
+    infer_func: Callable[..., str | None], policy: RetryPolicy | None = None
+) -> Callable[..., str | None]:
+    """Wraps an inference function so that each call is retried on its own.
+
+    Invalid JSON is repaired locally where possible. Retryable errors (timeouts, 429,
+    5xx) and JSON beyond repair are retried after a backoff; permanent errors are raised
+    immediately. When attempts or the deadline run out, the last result is returned
+    (None if the last attempt raised).
+    """
+    policy = policy or RetryPolicy()
+
+    @wraps(infer_func)
+    def wrapper(text: str, **infer_kwargs) -> str | None:
+        start = time.monotonic()
+        result = None
+        for attempt in range(1, policy.max_attempts + 1):
+            exc = None
+            token = current_attempt.set(attempt)
+            try:
+                result = _repair(policy, infer_func(text, **infer_kwargs))
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                exc, result = e, None
+            finally:
+                current_attempt.reset(token)
+            if exc is None and not _needs_retry(policy, result):
+                return result
+            if attempt == policy.max_attempts:
+                break
+
+            delay = policy.backoff(attempt, exc)
+            if policy.deadline is not None:
+                remaining = policy.deadline - (time.monotonic() - start)
+                if remaining <= delay:
+                    break
+            time.sleep(delay)
+        return result
+
+    return wrapper
+
+
+def with_retry_async(
+    infer_func: Callable[..., Awaitable[str | None]], policy: RetryPolicy | None = None
+) -> Callable[..., Awaitable[str | None]]:
+    """Async counterpart of `with_retry`."""
+    policy = policy or RetryPolicy()
+
+    @wraps(infer_func)
+    async def wrapper(text: str, **infer_kwargs) -> str | None:
+        start = time.monotonic()
+        result = None
+        for attempt in range(1, policy.max_attempts + 1):
+            exc = None
+            token = current_attempt.set(attempt)
+            try:
+                call = infer_func(text, **infer_kwargs)
+                if policy.deadline is not None:
+                    remaining = policy.deadline - (time.monotonic() - start)
+                    call = asyncio.wait_for(call, max(remaining, 0.0))
+                result = _repair(policy, await call)
+            except Exception as e:
+                if not is_retryable_error(e):
+                    raise
+                exc, result = e, None
+            finally:
+                current_attempt.reset(token)
+            if exc is None and not _needs_retry(policy, result):
+                return result
+            if attempt == policy.max_attempts:
+                break
+
+            delay = policy.backoff(attempt, exc)
+            if policy.deadline is not None:
+                remaining = policy.deadline - (time.monotonic() - start)
+                if remaining <= delay:
+                    break
+            await asyncio.sleep(delay)
+        return result
+
+    return wrapper
@@ -0,0 +1,214 @@
+import contextvars
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Sequence
+
+from .common import is_invalid_json
+
+
+@dataclass
+class ProviderHealth:
+    """Sliding-window latency and error statistics of one provider with a circuit breaker.
+
+    The circuit opens when the error rate of the window reaches `failure_threshold`
+    (once `min_samples` requests finished); after `cooldown` seconds requests are let
+    through again and the next outcome decides whether it stays open.
+    """
+
+    window: int = 200
+    min_samples: int = 10
+    failure_threshold: float = 0.5
+    cooldown: float = 60.0
+
+    latencies: deque = field(init=False)
+    outcomes: deque = field(init=False)
+    opened_at: float | None = None
+
+    def __post_init__(self):
+        self.latencies = deque(maxlen=self.window)
+        self.outcomes = deque(maxlen=self.window)
+
+    def record(self, latency: float, ok: bool) -> None:
+        if ok:
+            self.latencies.append(latency)
+        self.outcomes.append(ok)
+        if ok and self.opened_at is not None:
+            self.opened_at = None
+            self.outcomes.clear()
+        elif not ok and (self.opened_at is not None or self._tripped()):
+            self.opened_at = time.monotonic()
+
+    def _tripped(self) -> bool:
+        if len(self.outcomes) < self.min_samples:
+            return False
+        return self.error_rate >= self.failure_threshold
+
+    @property
+    def error_rate(self) -> float:
+        if not self.outcomes:
+            return 0.0
+        return 1 - sum(self.outcomes) / len(self.outcomes)
+
+    def available(self) -> bool:
+        return self.opened_at is None or time.monotonic() - self.opened_at >= self.cooldown
+
+    def percentile(self, q: float) -> float | None:
+        """Latency percentile of successful requests (None until `min_samples` are known)."""
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class HedgedRouter:
+    """Inference function that routes each request over several providers.
+
+    A request goes to the first available provider. If it is still running after that
+    provider's p95 latency, a hedged duplicate is sent to the next available provider
+    (the same one if it is the only one) and the first valid result wins. A losing request
+    that has not started yet is cancelled; one already running cannot be interrupted in
+    its worker thread, so it is abandoned: it runs to the end (and is billed) and its
+    result is discarded. `stats()` counts the abandoned requests per provider. Errors and
+    invalid results fail over to the next provider right away, and providers whose error
+    rate trips the circuit breaker are skipped.
+
+    The router itself follows the `infer_func(text, **kwargs)` contract, so it can be
+    passed to `run_inference_parallel_with_retry`.
+
+    Args:
+        providers: (name, inference function) pairs in order of preference
+        hedge_delay: Fixed hedging delay in seconds (the provider's p95 by default)
+        default_hedge_delay: Hedging delay until enough latencies are known
+        max_attempts: Maximum number of requests (hedges and failovers) per call
+        is_valid: Acceptance test of a result (valid JSON by default)
+        max_workers: Size of the thread pool running the provider requests
+        **health_kwargs: Settings of every provider's `ProviderHealth`
+    """
+
+    def __init__(
+        self,
+        providers: Sequence[tuple[str, Callable[..., str | None]]],
+        hedge_delay: float | None = None,
+        default_hedge_delay: float = 30.0,
+        max_attempts: int = 3,
+        is_valid: Callable[[str | None], bool] = lambda result: not is_invalid_json(result),
+        max_workers: int = 128,
+        **health_kwargs,
+    ):
+        if not providers:
+            raise ValueError("At least one provider is required.")
+        self.providers = list(providers)
+        self.hedge_delay = hedge_delay
+        self.default_hedge_delay = default_hedge_delay
+        self.max_attempts = max_attempts
+        self.is_valid = is_valid
+        self.health = {name: ProviderHealth(**health_kwargs) for name, _ in self.providers}
+        self.hedged = 0
+        self.failovers = 0
+        self.abandoned: Counter[str] = Counter()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        # Stable identity for `make_cache_key` and progress output
+        names = ",".join(name for name, _ in self.providers)
+        self.__name__ = self.__qualname__ = f"HedgedRouter({names})"
+
+    def _candidates(self) -> list[tuple[str, Callable[..., str | None]]]:
+        """Available providers in order of preference (all of them if none is available)."""
+        with self._lock:
+            available = [p for p in self.providers if self.health[p[0]].available()]
+        return available or list(self.providers)
+
+    def _delay(self, name: str) -> float:
+        if self.hedge_delay is not None:
+            return self.hedge_delay
+        with self._lock:
+            p95 = self.health[name].percentile(0.95)
+        return p95 if p95 is not None else self.default_hedge_delay
+
+    def _run(self, name: str, infer_func: Callable[..., str | None], text: str, kwargs: dict):
+        start = time.monotonic()
+        try:
+            result = infer_func(text, **kwargs)
+        except Exception:
+            with self._lock:
+                self.health[name].record(time.monotonic() - start, ok=False)
+            raise
+        with self._lock:
+            self.health[name].record(time.monotonic() - start, ok=self.is_valid(result))
+        return result
+
+    def __call__(self, text: str, **infer_kwargs) -> str | None:
+        candidates = self._candidates()
+        in_flight: dict[Future, str] = {}
+        attempts = 0
+        last_result: str | None = None
+        last_exc: BaseException | None = None
+
+        def launch() -> float:
+            nonlocal attempts
+            name, infer_func = candidates[attempts % len(candidates)]
+            attempts += 1
+            # The caller's context carries the retry attempt into the telemetry records
+            context = contextvars.copy_context()
+            future = self._executor.submit(
+                context.run, self._run, name, infer_func, text, infer_kwargs
+            )
+            in_flight[future] = name
+            return self._delay(name)
+
+        delay: float | None = launch()
+        while in_flight:
+            done, _ = wait(list(in_flight), timeout=delay, return_when=FIRST_COMPLETED)
+            if not done:
+                # Hedge: the oldest request is slower than the provider's p95
+                if attempts < self.max_attempts:
+                    with self._lock:
+                        self.hedged += 1
+                    delay = launch()
+                else:
+                    delay = None
+                continue
+
+            for future in done:
+                in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_exc = e
+                    continue
+                if self.is_valid(result):
+                    for other, name in in_flight.items():
+                        if not other.cancel():
+                            with self._lock:
+                                self.abandoned[name] += 1
+                    return result
+                last_result = result
+
+            # Fail over right away unless a hedge is still running
+            if not in_flight and attempts < self.max_attempts:
+                with self._lock:
+                    self.failovers += 1
+                delay = launch()
+
+        if last_result is None and last_exc is not None:
+            raise last_exc
+        return last_result
+
+    def stats(self) -> dict[str, dict[str, float | bool | None]]:
+        with self._lock:
+            return {
+                name: {
+                    "p50": health.percentile(0.5),
+                    "p95": health.percentile(0.95),
+                    "error_rate": round(health.error_rate, 3),
+                    "available": health.available(),
+                    "abandoned": self.abandoned[name],
+                }
+                for name, health in self.health.items()
+            }
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
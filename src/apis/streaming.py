@@ -0,0 +1,156 @@
+import json
+import logging
+import re
+from collections import Counter, deque
+from typing import Iterable, Iterator
+
+_STRING_RE = re.compile(r'"((?:[^"\\]|\\.)*)"')
+_WORD_RE = re.compile(r"\S+")
+_QUOTE_RE = re.compile(r'(?<!\\)"')
+
+logger = logging.getLogger(__name__)
+
+# What a streaming inference function returns when it aborts a degenerate generation:
+# "prefix" closes the valid part of the output into a JSON list (None if it has no
+# complete element), "retry" returns None so that `with_retry` calls the model again
+# right away.
+ON_REPETITION_ACTIONS = ("prefix", "retry")
+
+
+class RepetitionDetector:
+    """Detects degenerate repetition in a generation as it streams in.
+
+    Two signals are watched: a JSON string entry emitted more than `max_entry_repeats`
+    times (the templates ask for unique references), and a word n-gram occurring more
+    than `max_ngram_repeats` times within a single entry. N-grams are not counted across
+    entries, which legitimately share long statute names and differ only by section number.
+
+    Args:
+        ngram_size: Number of words in an n-gram
+        max_ngram_repeats: Allowed occurrences of a single n-gram within an entry
+        max_entry_repeats: Allowed occurrences of a single JSON string entry
+    """
+
+    def __init__(self, ngram_size: int = 8, max_ngram_repeats: int = 5, max_entry_repeats: int = 3):
+        self.ngram_size = ngram_size
+        self.max_ngram_repeats = max_ngram_repeats
+        self.max_entry_repeats = max_entry_repeats
+        self.text = ""
+        self.reason: str | None = None
+
+        self._entries: Counter[str] = Counter()
+        self._entry_pos = 0
+        self._ngrams: Counter[tuple[str, ...]] = Counter()
+        self._window: deque[str] = deque(maxlen=ngram_size)
+        self._word_pos = 0
+
+    @property
+    def triggered(self) -> bool:
+        return self.reason is not None
+
+    def feed(self, chunk: str) -> bool:
+        """Appends a streamed chunk. Returns True once the output is degenerate."""
+        self.text += chunk
+        if self.reason is None:
+            self._check_entries()
+        if self.reason is None:
+            self._check_ngrams()
+        return self.triggered
+
+    def _check_entries(self) -> None:
+        for match in _STRING_RE.finditer(self.text, self._entry_pos):
+            self._entry_pos = match.end()
+            entry = " ".join(match.group(1).split())
+            self._entries[entry] += 1
+            if self._entries[entry] > self.max_entry_repeats:
+                self.reason = f"entry repeated: {entry}"
+                return
+
+    def _check_ngrams(self) -> None:
+        # Only words followed by whitespace are complete
+        end = max(self.text.rfind(" "), self.text.rfind("\n"))
+        for match in _WORD_RE.finditer(self.text, self._word_pos, max(end, self._word_pos)):
+            self._word_pos = match.end()
+            if _QUOTE_RE.search(match.group()):
+                # An entry starts or ends here
+                self._window.clear()
+                self._ngrams.clear()
+                continue
+            self._window.append(match.group())
+            if len(self._window) < self.ngram_size:
+                continue
+            ngram = tuple(self._window)
+            self._ngrams[ngram] += 1
+            if self._ngrams[ngram] > self.max_ngram_repeats:
+                self.reason = f"n-gram repeated: {' '.join(ngram)}"
+                return
+
+
+def close_json_prefix(text: str) -> str | None:
+    """Closes the valid prefix of a (truncated) JSON list into a complete JSON list.
+
+    Complete elements are kept in order with duplicates dropped; a trailing partial
+    element is discarded. Returns None if the text does not contain a list.
+    """
+    text = text.replace("```json", "").replace("```", "")
+    start = text.find("[")
+    if start == -1:
+        return None
+
+    decoder = json.JSONDecoder()
+    elements: dict[str, object] = {}
+    pos = start + 1
+    while True:
+        while pos < len(text) and text[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(text) or text[pos] == "]":
+            break
+        try:
+            element, end = decoder.raw_decode(text, pos)
+        except json.JSONDecodeError:
+            break
+        elements.setdefault(json.dumps(element, ensure_ascii=False, sort_keys=True), element)
+        pos = end
+    return json.dumps(list(elements.values()), ensure_ascii=False)
+
+
+def consume_stream(
+    chunks: Iterable[str | None],
+    detector: RepetitionDetector | None = None,
+    on_repetition: str = "prefix",
+) -> str | None:
+    """Joins streamed text chunks, aborting the stream as soon as it degenerates.
+
+    Args:
+        chunks: Text deltas; closing the iterator must close the underlying request
+        detector: Repetition detector (a fresh `RepetitionDetector` by default)
+        on_repetition: "prefix" to return the closed JSON prefix (None if it is empty),
+            "retry" to return None
+
+    Returns:
+        The generated text, or the abort result described above
+    """
+    if on_repetition not in ON_REPETITION_ACTIONS:
+        raise ValueError(f"on_repetition must be one of {ON_REPETITION_ACTIONS}")
+    detector = detector or RepetitionDetector()
+
+    iterator: Iterator[str | None] = iter(chunks)
+    try:
+        for chunk in iterator:
+            if chunk and detector.feed(chunk):
+                break
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+    if not detector.triggered:
+        return detector.text
+    logger.warning(
+        "Aborted a degenerate generation after %d chars (%s)", len(detector.text), detector.reason
+    )
+    if on_repetition == "retry":
+        return None
+    closed = close_json_prefix(detector.text)
+    # An empty salvage of a non-empty response is a failure, not a result
+    return closed if closed != "[]" else None
@@ -0,0 +1,243 @@
+import json
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Iterable, Iterator, Protocol
+
+from ..token_count import text_hash
+
+# Attempt number of the request being made, set by `with_retry` (1 outside of retries)
+current_attempt: ContextVar[int] = ContextVar("inference_attempt", default=1)
+
+
+@dataclass
+class InferenceRecord:
+    """One provider call.
+
+    `outcome` is "ok", "error" (the call raised) or "aborted" (a stream was closed early,
+    e.g. on repetition). Token counts are the provider's usage report (None if the
+    provider did not report it); `input_tokens` includes `cached_tokens`. `prompt_hash`
+    is the `text_hash` of the prompt, which joins records to documents.
+    """
+
+    provider: str
+    model: str
+    prompt_hash: str
+    started_at: float
+    latency: float = 0.0
+    time_to_first_token: float | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    cached_tokens: int | None = None
+    finish_reason: str | None = None
+    attempt: int = 1
+    outcome: str = "ok"
+    error: str | None = None
+
+
+class TelemetrySink(Protocol):
+    def write(self, record: InferenceRecord) -> None: ...
+
+
+class JsonlSink:
+    """Appends every record to a JSON Lines file as soon as the call finishes."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self.path.open("a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, record: InferenceRecord) -> None:
+        line = json.dumps(asdict(record), ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "JsonlSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class MemorySink:
+    """Keeps the records in memory for a run summary."""
+
+    def __init__(self):
+        self.records: list[InferenceRecord] = []
+        self._lock = threading.Lock()
+
+    def write(self, record: InferenceRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            records = list(self.records)
+        return summarize_records(records)
+
+
+def load_records(path: Path | str) -> list[InferenceRecord]:
+    """Reads the records written by a `JsonlSink`."""
+    with open(path, encoding="utf-8") as f:
+        return [InferenceRecord(**json.loads(line)) for line in f if line.strip()]
+
+
+def _percentile(ordered: list[float], q: float) -> float | None:
+    if not ordered:
+        return None
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _summarize(records: list[InferenceRecord]) -> dict:
+    latencies = sorted(r.latency for r in records if r.outcome == "ok")
+    first_tokens = sorted(
+        r.time_to_first_token for r in records if r.time_to_first_token is not None
+    )
+    output_tokens = sum(r.output_tokens or 0 for r in records)
+    span = max(r.started_at + r.latency for r in records) - min(r.started_at for r in records)
+    outcomes = Counter(r.outcome for r in records)
+    return {
+        "requests": len(records),
+        "errors": outcomes["error"],
+        "aborted": outcomes["aborted"],
+        "retries": sum(r.attempt > 1 for r in records),
+        "p50": _percentile(latencies, 0.5),
+        "p95": _percentile(latencies, 0.95),
+        "p99": _percentile(latencies, 0.99),
+        "ttft_p50": _percentile(first_tokens, 0.5),
+        "input_tokens": sum(r.input_tokens or 0 for r in records),
+        "cached_tokens": sum(r.cached_tokens or 0 for r in records),
+        "output_tokens": output_tokens,
+        "requests_per_s": round(len(records) / span, 3) if span > 0 else None,
+        "output_tokens_per_s": round(output_tokens / span, 1) if span > 0 else None,
+        "finish_reasons": dict(Counter(r.finish_reason for r in records if r.finish_reason)),
+    }
+
+
+def summarize_records(records: Iterable[InferenceRecord]) -> dict[str, dict]:
+    """Latency percentiles (of successful calls), throughput and token totals.
+
+    Rates are measured over the wall-clock span of the records. Returns one entry per
+    `provider/model` and an `all` entry (empty if there are no records).
+    """
+    records = list(records)
+    if not records:
+        return {}
+    groups: dict[str, list[InferenceRecord]] = {}
+    for record in records:
+        groups.setdefault(f"{record.provider}/{record.model}", []).append(record)
+    summary = {name: _summarize(group) for name, group in groups.items()}
+    summary["all"] = _summarize(records)
+    return summary
+
+
+@dataclass
+class Telemetry:
+    """Registry of the sinks that receive the records of all provider wrappers."""
+
+    sinks: list[TelemetrySink] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.sinks)
+
+    def add_sink(self, sink: TelemetrySink) -> None:
+        with self._lock:
+            self.sinks.append(sink)
+
+    def remove_sink(self, sink: TelemetrySink) -> None:
+        with self._lock:
+            if sink in self.sinks:
+                self.sinks.remove(sink)
+
+    @contextmanager
+    def recording(self, *sinks: TelemetrySink) -> Iterator[None]:
+        """Sends the records to `sinks` within the block."""
+        for sink in sinks:
+            self.add_sink(sink)
+        try:
+            yield
+        finally:
+            for sink in sinks:
+                self.remove_sink(sink)
+
+    def emit(self, record: InferenceRecord) -> None:
+        with self._lock:
+            sinks = list(self.sinks)
+        for sink in sinks:
+            sink.write(record)
+
+
+# Shared by all provider wrappers; add a sink to start recording
+telemetry = Telemetry()
+
+
+class InferenceTracker:
+    """Collects the measurements of one call within `track_inference`."""
+
+    def __init__(self, record: InferenceRecord | None, start: float):
+        self.record = record
+        self._start = start
+
+    def first_token(self) -> None:
+        """Marks the arrival of the first streamed text (later calls are ignored)."""
+        if self.record is not None and self.record.time_to_first_token is None:
+            self.record.time_to_first_token = time.monotonic() - self._start
+
+    def usage(
+        self,
+        input_tokens: int | None,
+        output_tokens: int | None,
+        cached_tokens: int | None = None,
+    ) -> None:
+        if self.record is not None:
+            self.record.input_tokens = input_tokens
+            self.record.output_tokens = output_tokens
+            self.record.cached_tokens = cached_tokens
+
+    def finish(self, finish_reason: str | None) -> None:
+        if self.record is not None:
+            self.record.finish_reason = finish_reason
+
+
+@contextmanager
+def track_inference(provider: str, model: str, text: str) -> Iterator[InferenceTracker]:
+    """Measures a provider call and emits its record when the block exits.
+
+    Does nothing (beyond handing out a no-op tracker) while no sink is registered.
+    """
+    start = time.monotonic()
+    if not telemetry.active:
+        yield InferenceTracker(None, start)
+        return
+
+    record = InferenceRecord(
+        provider=provider,
+        model=model,
+        prompt_hash=text_hash(str(text)),
+        started_at=time.time(),
+        attempt=current_attempt.get(),
+    )
+    try:
+        yield InferenceTracker(record, start)
+    except GeneratorExit:
+        record.outcome = "aborted"
+        raise
+    except BaseException as e:
+        record.outcome = "error"
+        record.error = type(e).__name__
+        raise
+    finally:
+        record.latency = time.monotonic() - start
+        telemetry.emit(record)
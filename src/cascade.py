@@ -0,0 +1,228 @@
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from functools import partial, wraps
+from typing import Callable, Iterable, Sequence
+
+import pandas as pd
+
+from .apis.common import is_invalid_json, run_inference_parallel_with_retry
+from .citations import extract_civil_code_sections
+from .constants import MODEL_PRICES
+from .filter_references import missing_sections, process_raw_result
+from .templates import render_template_parts
+from .token_count import count_tokens
+
+
+@dataclass(frozen=True)
+class CascadeTier:
+    """One model of the cascade.
+
+    Args:
+        name: Label used in the report
+        infer_func: Inference function of the model
+        model: Key into `MODEL_PRICES`
+        provider: Provider whose token counter is used for cost estimates
+    """
+
+    name: str
+    infer_func: Callable[..., str | None]
+    model: str
+    provider: str
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        price_in, price_out = MODEL_PRICES.get(self.model, (0.0, 0.0))
+        return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+def default_tiers() -> list[CascadeTier]:
+    """Gemini Flash, then GPT-4o mini, then Claude (cheapest first)."""
+    # Imported here so that the module does not require every provider SDK
+    from .apis.anthropic import CLAUDE_DEFAULT_MODEL, claude_infer
+    from .apis.google import GEMINI_DEFAULT_MODEL, gemini_infer
+    from .apis.openai import openai_infer
+
+    return [
+        CascadeTier("gemini-flash", gemini_infer, GEMINI_DEFAULT_MODEL, "gemini"),
+        CascadeTier("gpt-4o-mini", partial(openai_infer, mini=True), "gpt-4o-mini", "openai"),
+        CascadeTier("claude", claude_infer, CLAUDE_DEFAULT_MODEL, "claude"),
+    ]
+
+
+def validate_output(
+    raw: str | None, opinion: str, annotated: Iterable[int] | None = None
+) -> str | None:
+    """Checks an extraction result. Returns the reason of the failure, or None if it passes.
+
+    The checks are, in order: valid JSON list of strings, no civil code section found by
+    the citation parser is missing (only when the parser is confident), and no annotated
+    section that occurs in the opinion text is missing.
+    """
+    if is_invalid_json(raw):
+        return "invalid_json"
+    try:
+        inferred = set(process_raw_result(raw))  # type: ignore
+    except (AttributeError, TypeError):
+        return "invalid_json"
+
+    sections, confident = extract_civil_code_sections(opinion)
+    if confident and set(sections) - inferred:
+        return "parser_mismatch"
+
+    if annotated is not None and missing_sections(annotated, inferred, opinion):
+        return "annotation_mismatch"
+    return None
+
+
+@dataclass
+class TierReport:
+    name: str
+    submitted: int = 0
+    resolved: int = 0
+    failures: Counter = field(default_factory=Counter)
+    seconds: float = 0.0
+    request_seconds: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost: float = 0.0
+
+
+@dataclass
+class CascadeResult:
+    """Outputs of a cascade run.
+
+    `results` holds the accepted output of every document, or the output of the last
+    tier that ran for documents that no tier resolved (`tiers[i]` is None for those).
+    """
+
+    results: list[str | None]
+    tiers: list[str | None]
+    report: list[TierReport]
+    baseline_cost: float
+    baseline_request_seconds: float | None
+
+    @property
+    def cost(self) -> float:
+        return sum(tier.cost for tier in self.report)
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = [
+            {
+                "tier": t.name,
+                "submitted": t.submitted,
+                "resolved": t.resolved,
+                "failures": dict(t.failures),
+                "wall_seconds": round(t.seconds, 2),
+                "mean_latency": round(t.request_seconds / t.submitted, 2) if t.submitted else None,
+                "input_tokens": t.input_tokens,
+                "output_tokens": t.output_tokens,
+                "cost_usd": round(t.cost, 4),
+            }
+            for t in self.report
+        ]
+        return pd.DataFrame(rows)
+
+    def summary(self) -> str:
+        lines = [self.to_frame().to_string(index=False)]
+        unresolved = sum(tier is None for tier in self.tiers)
+        lines.append(f"Unresolved documents: {unresolved}")
+        lines.append(
+            f"Estimated cost: ${self.cost:.4f} vs ${self.baseline_cost:.4f} with the last tier "
+            f"only (saved ${self.baseline_cost - self.cost:.4f})"
+        )
+        if self.baseline_request_seconds is not None:
+            spent = sum(t.request_seconds for t in self.report)
+            lines.append(
+                f"Request time: {spent:.1f} s vs ~{self.baseline_request_seconds:.1f} s with "
+                f"the last tier only"
+            )
+        return "\n".join(lines)
+
+
+def _timed(infer_func: Callable[..., str | None], report: TierReport, lock: threading.Lock):
+    @wraps(infer_func)
+    def wrapper(text: str, **infer_kwargs) -> str | None:
+        start = time.monotonic()
+        try:
+            return infer_func(text, **infer_kwargs)
+        finally:
+            with lock:
+                report.request_seconds += time.monotonic() - start
+
+    return wrapper
+
+
+def run_cascade(
+    texts: Sequence[str],
+    tiers: Sequence[CascadeTier] | None = None,
+    annotations: Sequence[Iterable[int] | None] | None = None,
+    template_name: str = "extract_acts_03.jinja2",
+    max_workers: int = 10,
+    **infer_kwargs,
+) -> CascadeResult:
+    """Run extraction with the cheapest model first, escalating documents that fail validation
+
+    Args:
+        texts: Opinion texts (not rendered prompts)
+        tiers: Models from the cheapest to the strongest (`default_tiers()` by default)
+        annotations: Annotated civil code sections per opinion (None where unknown)
+        template_name: Template rendered with each opinion as `court_opinion`
+        max_workers: Maximum number of parallel workers
+        **infer_kwargs: Additional keyword arguments to pass to `run_inference_parallel_with_retry`
+
+    Returns:
+        Accepted outputs, the tier that resolved each document and the per-tier report
+    """
+    tiers = list(tiers) if tiers is not None else default_tiers()
+    if annotations is not None and len(annotations) != len(texts):
+        raise ValueError("Annotations must match the texts.")
+
+    prompts = [render_template_parts(template_name, court_opinion=text) for text in texts]
+    results: list[str | None] = [None] * len(texts)
+    resolved_by: list[str | None] = [None] * len(texts)
+    reports: list[TierReport] = []
+    pending = list(range(len(texts)))
+
+    for tier in tiers:
+        if not pending:
+            break
+        report = TierReport(tier.name, submitted=len(pending))
+        reports.append(report)
+        infer = _timed(tier.infer_func, report, threading.Lock())
+
+        start = time.monotonic()
+        raw_results = run_inference_parallel_with_retry(
+            [prompts[i] for i in pending], infer, max_workers, **infer_kwargs
+        )
+        report.seconds = time.monotonic() - start
+
+        still_pending = []
+        for i, raw in zip(pending, raw_results, strict=True):
+            report.input_tokens += count_tokens(prompts[i], tier.provider)
+            report.output_tokens += count_tokens(raw or "", tier.provider)
+            annotated = annotations[i] if annotations is not None else None
+            failure = validate_output(raw, texts[i], annotated)
+            if raw is not None:
+                results[i] = raw
+            if failure is None:
+                resolved_by[i] = tier.name
+                report.resolved += 1
+            else:
+                report.failures[failure] += 1
+                still_pending.append(i)
+        report.cost = tier.cost(report.input_tokens, report.output_tokens)
+        pending = still_pending
+
+    # What sending every document to the last tier would have cost
+    last = tiers[-1]
+    baseline_cost = last.cost(
+        sum(count_tokens(prompt, last.provider) for prompt in prompts),
+        sum(count_tokens(raw or "", last.provider) for raw in results),
+    )
+    baseline_seconds = None
+    last_report = next((r for r in reports if r.name == last.name), None)
+    if last_report is not None and last_report.submitted:
+        baseline_seconds = last_report.request_seconds / last_report.submitted * len(texts)
+
+    return CascadeResult(results, resolved_by, reports, baseline_cost, baseline_seconds)
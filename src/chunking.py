@@ -0,0 +1,163 @@
+import json
+import re
+from typing import Callable, Iterable, Sequence
+
+from .apis.common import run_inference_parallel_with_retry
+from .templates import render_template_parts
+from .token_count import count_tokens
+
+DEFAULT_CHUNK_TOKENS = 6000
+DEFAULT_OVERLAP_TOKENS = 300
+
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n|\n")
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.;:!?])\s+")
+
+
+def _split_oversized(paragraph: str, max_tokens: int, provider: str) -> list[str]:
+    """Splits a paragraph longer than `max_tokens` on sentence boundaries (or hard, if needed)."""
+    pieces: list[str] = []
+    current: list[str] = []
+    current_tokens = 0
+    for sentence in _SENTENCE_SPLIT_RE.split(paragraph):
+        # Counted on their own, with one token for the joining space
+        tokens = count_tokens(sentence, provider) + 1
+        if current and current_tokens + tokens > max_tokens:
+            pieces.append(" ".join(current))
+            current, current_tokens = [], 0
+        current.append(sentence)
+        current_tokens += tokens
+    pieces.append(" ".join(current))
+
+    out: list[str] = []
+    for piece in pieces:
+        tokens = count_tokens(piece, provider)
+        if tokens <= max_tokens:
+            out.append(piece)
+            continue
+        step = max(1, len(piece) * max_tokens // tokens)
+        out.extend(piece[i : i + step] for i in range(0, len(piece), step))
+    return out
+
+
+def split_into_chunks(
+    text: str,
+    max_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    provider: str = "gemini",
+) -> list[str]:
+    """Splits a text into paragraph-aligned chunks of at most `max_tokens` tokens.
+
+    Consecutive chunks share trailing paragraphs of up to `overlap_tokens` tokens, so that
+    a citation at a chunk boundary is seen whole at least once.
+    """
+    paragraphs: list[str] = []
+    for paragraph in _PARAGRAPH_SPLIT_RE.split(text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if count_tokens(paragraph, provider) > max_tokens:
+            paragraphs.extend(_split_oversized(paragraph, max_tokens, provider))
+        else:
+            paragraphs.append(paragraph)
+
+    chunks: list[str] = []
+    current: list[tuple[str, int]] = []
+    current_tokens = 0
+    for paragraph in paragraphs:
+        tokens = count_tokens(paragraph, provider)
+        if current and current_tokens + tokens > max_tokens:
+            chunks.append("\n\n".join(p for p, _ in current))
+            # Carry the tail of the chunk over as overlap
+            overlap: list[tuple[str, int]] = []
+            overlap_size = 0
+            for p, t in reversed(current):
+                if overlap_size + t > overlap_tokens or overlap_size + t + tokens > max_tokens:
+                    break
+                overlap.insert(0, (p, t))
+                overlap_size += t
+            current, current_tokens = overlap, overlap_size
+        current.append((paragraph, tokens))
+        current_tokens += tokens
+
+    if current:
+        chunks.append("\n\n".join(p for p, _ in current))
+    return chunks
+
+
+def _reference_key(reference: str) -> str:
+    return " ".join(reference.split())
+
+
+def merge_reference_lists(lists: Iterable[Sequence[str]]) -> list[str]:
+    """Concatenates per-chunk reference lists, dropping duplicates (up to whitespace) and
+    keeping the order of first appearance."""
+    merged: dict[str, str] = {}
+    for references in lists:
+        for reference in references:
+            merged.setdefault(_reference_key(reference), reference)
+    return list(merged.values())
+
+
+def _parse_reference_list(raw: str | None) -> list[str] | None:
+    if raw is None:
+        return None
+    try:
+        parsed = json.loads(raw.replace("```json", "").replace("```", "").strip())
+    except json.JSONDecodeError:
+        return None
+    return parsed if isinstance(parsed, list) else None
+
+
+def run_chunked_extraction(
+    texts: Sequence[str],
+    infer_func: Callable[..., str | None],
+    template_name: str = "extract_acts_03.jinja2",
+    max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+    overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+    provider: str = "gemini",
+    max_workers: int = 10,
+    **infer_kwargs,
+) -> list[str | None]:
+    """Extract references from long opinions chunk by chunk
+
+    All chunks of all opinions are processed in one parallel run, so a single huge
+    decision is spread over many workers. The per-chunk JSON lists are merged into one
+    JSON list per opinion, compatible with `process_raw_results`.
+
+    Args:
+        texts: Opinion texts (not rendered prompts)
+        infer_func: Inference function to call on each chunk prompt
+        template_name: Template rendered with each chunk as `court_opinion`
+        max_chunk_tokens: Maximum number of opinion tokens per chunk
+        overlap_tokens: Maximum number of tokens shared by consecutive chunks
+        provider: Provider whose token counter sizes the chunks
+        max_workers: Maximum number of parallel workers
+        **infer_kwargs: Additional keyword arguments to pass to `run_inference_parallel_with_retry`
+
+    Returns:
+        JSON list string per opinion ("[]" for an empty one), or None if any of its
+        chunks failed
+    """
+    owners: list[int] = []
+    prompts: list[str] = []
+    for idx, text in enumerate(texts):
+        for chunk in split_into_chunks(text, max_chunk_tokens, overlap_tokens, provider):
+            owners.append(idx)
+            prompts.append(render_template_parts(template_name, court_opinion=chunk))
+
+    chunk_results = run_inference_parallel_with_retry(
+        prompts, infer_func, max_workers, **infer_kwargs
+    )
+
+    per_text: list[list[list[str] | None]] = [[] for _ in texts]
+    for owner, raw in zip(owners, chunk_results, strict=True):
+        per_text[owner].append(_parse_reference_list(raw))
+
+    results: list[str | None] = []
+    for chunk_lists in per_text:
+        if any(references is None for references in chunk_lists):
+            results.append(None)
+            continue
+        merged = merge_reference_lists(chunk_lists)  # type: ignore
+        results.append(json.dumps(merged, ensure_ascii=False))
+    return results
@@ -0,0 +1,227 @@
+import re
+from dataclasses import dataclass, field
+
+CIVIL_CODE = "89/2012 Sb."
+
+# Canonical identifiers of acts commonly cited by their abbreviation or name. Order matters:
+# explicit collection numbers win over abbreviations.
+_ACT_PATTERNS: list[tuple[re.Pattern, str | None]] = [
+    (re.compile(r"(?:zák(?:on\w*|\.)\s+)?(?:č\.\s*)?(\d+)\s*/\s*(\d{4})\s*Sb\.?"), None),
+    (re.compile(r"občansk\w*\s+zákoník\w*"), CIVIL_CODE),
+    (re.compile(r"o\.\s*z\."), CIVIL_CODE),
+    (re.compile(r"N?OZ\b"), CIVIL_CODE),
+    (re.compile(r"obč\.\s*zák\.?"), "40/1964 Sb."),
+    (re.compile(r"o\.\s*s\.\s*ř\.?|OSŘ\b|občansk\w*\s+soudní\w*\s+řád\w*"), "99/1963 Sb."),
+    (re.compile(r"z\.\s*ř\.\s*s\.?|ZŘS\b"), "292/2013 Sb."),
+    (re.compile(r"s\.\s*ř\.\s*s\.?|SŘS\b"), "150/2002 Sb."),
+    (re.compile(r"tr\.\s*zák(?:\.|oník\w*)|TZ\b"), "40/2009 Sb."),
+    (re.compile(r"tr\.\s*ř\.?|TŘ\b"), "141/1961 Sb."),
+    (re.compile(r"obch\.\s*zák\.?|obchodní\w*\s+zákoník\w*"), "513/1991 Sb."),
+    (re.compile(r"z\.\s*o\.\s*k\.?|ZOK\b"), "90/2012 Sb."),
+    (re.compile(r"ins\.\s*zák\.?|IZ\b|insolvenční\w*\s+zákon\w*"), "182/2006 Sb."),
+    (re.compile(r"zák\.\s*práce|ZP\b|zákoník\w*\s+práce"), "262/2006 Sb."),
+    (re.compile(r"Listin(?:a|y|ou|ě|u)\b"), "2/1993 Sb."),
+    (re.compile(r"Ústav(?:a|y|ou|ě|u)\b"), "1/1993 Sb."),
+]
+
+# "téhož zákona", "citovaného zákona", ... refer to the previously cited act
+_SAME_ACT_RE = re.compile(
+    r"(?:téhož|tohoto|citovaného|uvedeného|cit\.)\s+(?:zákona|zákoníku|předpisu)"
+)
+# "zákona o obchodních korporacích" - an act we cannot map, but an act nonetheless
+_NAMED_ACT_RE = re.compile(
+    r"(?:zákona|zákon|zák\.|vyhlášky|nařízení)\s+(?:č\.\s*[\w/]+|o(?:\s+[^\W\d_]+){1,4})"
+)
+
+_ANCHOR_RE = re.compile(r"§§?|\bčl\.|\bčlánk\w*")
+_ITEM_RE = re.compile(r"\s*(\d+)([a-z]{0,2})(?![a-záčďéěíňóřšťúůýž0-9])")
+_PARAGRAPH_RE = re.compile(
+    r"\s*(?:odst\.|odstav\w*)\s*(\d+[a-z]?(?:\s*(?:,|a|až|nebo)\s*\d+[a-z]?)*)"
+)
+_LETTER_RE = re.compile(r"\s*(?:písm\.|písmen\w*)\s*([a-z]\)?(?:\s*(?:,|a|až|nebo)\s*[a-z]\))*)")
+_SENTENCE_RE = re.compile(r"\s*vět(?:a|y|ou|ě)\s+(?:první|druh|třetí|čtvrt|poslední)\w*")
+_POINT_RE = re.compile(r"\s*bod(?:u|ě)?\s*\d+\.?")
+_CONTINUATION_RE = re.compile(r"\s*a\s+(?:násl\.|následující\w*|další\w*)")
+_CONNECTOR_RE = re.compile(r"\s*(,|až|a|nebo|či|resp\.|-|–)\s*(?:§\s*|čl\.\s*)?(?=\d)")
+_ACT_PREFIX_RE = re.compile(r"\s*,?\s*\(?\s*")
+
+_MAX_RANGE = 50
+
+# Anything that hints at a citation: § / čl. anchors and act identifiers
+CITATION_MARKER_RE = re.compile(
+    "|".join([_ANCHOR_RE.pattern] + [pattern.pattern for pattern, _ in _ACT_PATTERNS])
+)
+
+
+@dataclass(frozen=True)
+class Citation:
+    """A single provision reference such as `§ 153a odst. 3 písm. b) o. s. ř.`."""
+
+    kind: str  # "§" or "čl."
+    number: int
+    suffix: str = ""
+    paragraph: str | None = None
+    letter: str | None = None
+    act: str | None = None
+    continuation: bool = False
+    start: int = 0
+    end: int = 0
+
+    @property
+    def label(self) -> str:
+        parts = [f"{self.kind} {self.number}{self.suffix}"]
+        if self.paragraph:
+            parts.append(f"odst. {self.paragraph}")
+        if self.letter:
+            parts.append(f"písm. {self.letter}")
+        if self.continuation:
+            parts.append("a násl.")
+        if self.act:
+            parts.append(self.act)
+        return " ".join(parts)
+
+
+@dataclass
+class ParseResult:
+    citations: list[Citation] = field(default_factory=list)
+
+    @property
+    def unresolved(self) -> list[Citation]:
+        """Citations of sections whose act could not be determined."""
+        return [c for c in self.citations if c.act is None]
+
+    @property
+    def confident(self) -> bool:
+        """Every cited section was attributed to an act, so no LLM pass is needed."""
+        return not self.unresolved
+
+    def sections(self, act: str = CIVIL_CODE) -> list[int]:
+        """Unique section numbers of `act` in order of first appearance."""
+        seen: dict[int, None] = {}
+        for c in self.citations:
+            if c.kind == "§" and c.act == act:
+                seen.setdefault(c.number, None)
+        return list(seen)
+
+
+def _normalize_spaces(text: str) -> str:
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def _match_act(text: str, pos: int, previous_act: str | None) -> tuple[str | None, int]:
+    """Returns the act identifier starting at `pos` (after optional brackets) and its end."""
+    prefix = _ACT_PREFIX_RE.match(text, pos)
+    start = prefix.end() if prefix else pos
+
+    for pattern, canonical in _ACT_PATTERNS:
+        match = pattern.match(text, start)
+        if match:
+            if canonical is None:
+                canonical = f"{int(match.group(1))}/{match.group(2)} Sb."
+            return canonical, match.end()
+
+    match = _SAME_ACT_RE.match(text, start)
+    if match:
+        return previous_act, match.end()
+
+    match = _NAMED_ACT_RE.match(text, start)
+    if match:
+        return _normalize_spaces(match.group()), match.end()
+
+    return None, pos
+
+
+def _parse_group(text: str, pos: int, kind: str) -> tuple[list[dict], int]:
+    """Parses `17 odst. 1, 18 a 20 až 22 a násl.` starting at `pos`."""
+    items: list[dict] = []
+    range_start: int | None = None
+
+    while True:
+        match = _ITEM_RE.match(text, pos)
+        if not match:
+            break
+        item = {"kind": kind, "number": int(match.group(1)), "suffix": match.group(2)}
+        item_start = match.start(1)
+        pos = match.end()
+
+        if (match := _PARAGRAPH_RE.match(text, pos)) is not None:
+            item["paragraph"] = _normalize_spaces(match.group(1))
+            pos = match.end()
+        if (match := _LETTER_RE.match(text, pos)) is not None:
+            item["letter"] = _normalize_spaces(match.group(1))
+            pos = match.end()
+        for extra_re in (_SENTENCE_RE, _POINT_RE):
+            if (match := extra_re.match(text, pos)) is not None:
+                pos = match.end()
+        if (match := _CONTINUATION_RE.match(text, pos)) is not None:
+            item["continuation"] = True
+            pos = match.end()
+
+        item["start"], item["end"] = item_start, pos
+
+        # Expand "§ 20 až 22" into the sections of the range
+        if range_start is not None and not item["suffix"]:
+            first = items[-1]["number"] + 1
+            if 0 < item["number"] - first < _MAX_RANGE:
+                for number in range(first, item["number"]):
+                    items.append({**item, "number": number, "paragraph": None, "letter": None})
+        range_start = None
+        items.append(item)
+
+        connector = _CONNECTOR_RE.match(text, pos)
+        if not connector:
+            break
+        if connector.group(1) in ("až", "-", "–"):
+            range_start = item["number"]
+        pos = connector.end()
+
+    return items, pos
+
+
+def parse_citations(text: str) -> ParseResult:
+    """Scans an opinion once and returns all section (`§`) and article (`čl.`) citations.
+
+    The act of a group of citations (`§ 17 a § 2000 odst. 1 o. z.`) is the identifier
+    that follows the group, possibly in brackets; `téhož zákona` and similar refer back
+    to the previous act.
+    """
+    text = text.replace("\xa0", " ")
+    result = ParseResult()
+    previous_act: str | None = None
+    pos = 0
+
+    while (anchor := _ANCHOR_RE.search(text, pos)) is not None:
+        kind = "§" if anchor.group().startswith("§") else "čl."
+        items, end = _parse_group(text, anchor.end(), kind)
+        if not items:
+            pos = anchor.end()
+            continue
+
+        act, act_end = _match_act(text, end, previous_act)
+        if act is not None:
+            previous_act = act
+            end = act_end
+
+        result.citations.extend(
+            Citation(
+                kind=item["kind"],
+                number=item["number"],
+                suffix=item["suffix"],
+                paragraph=item.get("paragraph"),
+                letter=item.get("letter"),
+                act=act,
+                continuation=item.get("continuation", False),
+                start=item["start"],
+                end=item["end"],
+            )
+            for item in items
+        )
+        pos = end
+
+    return result
+
+
+def extract_civil_code_sections(text: str) -> tuple[list[int], bool]:
+    """Civil code section numbers cited in an opinion and whether the parse is confident."""
+    result = parse_citations(text)
+    return result.sections(CIVIL_CODE), result.confident
@@ -3,4 +3,20 @@ OPENAI_API_KEY = "OPENAI_API_KEY"
 GOOGLE_API_KEY = "GEMINI_API_KEY"
 FIREWORKS_API_KEY = "FIREWORKS_API_KEY"
 
+INFERENCE_CACHE_BYPASS = "CASELAW_CACHE_BYPASS"
+
+# Base URL overrides, e.g. to point the providers at `src.apis.mock_server`
+# (the Anthropic and OpenAI SDKs read ANTHROPIC_BASE_URL and OPENAI_BASE_URL themselves)
+FIREWORKS_BASE_URL = "FIREWORKS_BASE_URL"
+GEMINI_BASE_URL = "GEMINI_BASE_URL"
+
 DEFAULT_MAX_TOKENS = 2048
+
+# USD per million (input, output) tokens, used for cost estimates in run reports
+MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gemini-2.0-flash": (0.10, 0.40),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4": (30.0, 60.0),
+    "claude-3-7-sonnet-20250219": (3.0, 15.0),
+    "deepseek-v3": (0.90, 0.90),
+}
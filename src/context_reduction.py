@@ -0,0 +1,113 @@
+import re
+from dataclasses import dataclass
+from typing import Any, Iterable
+
+from .citations import CITATION_MARKER_RE
+from .templates import render_template_parts
+
+GAP_MARKER = "\n[…]\n"
+
+# The operative part ends with "takto:", the reasoning with the instructions on appeal
+# ("Poučení:") and the place, date and signature of the presiding judge.
+_HEADER_END_RE = re.compile(r"takto\s*:", re.IGNORECASE)
+_INSTRUCTIONS_RE = re.compile(r"\n\s*Poučení\s*:", re.IGNORECASE)
+_SIGNATURE_RE = re.compile(r"\n\s*V\s+[A-ZÁČĎÉĚÍŇÓŘŠŤÚŮÝŽ]\w+\s+dne\s+\d")
+
+_HEADER_SHARE = 0.3
+_FOOTER_SHARE = 0.3
+
+
+@dataclass
+class ReducedOpinion:
+    text: str
+    original_chars: int
+    reduced_chars: int
+    spans: int
+
+    @property
+    def ratio(self) -> float:
+        """Reduced size relative to the original (0.1 = ten times smaller)."""
+        return self.reduced_chars / max(self.original_chars, 1)
+
+
+def strip_boilerplate(text: str) -> str:
+    """Removes the header up to `takto:`, the `Poučení:` section and the signature block."""
+    length = len(text)
+    start, end = 0, length
+
+    header = _HEADER_END_RE.search(text, 0, int(length * _HEADER_SHARE))
+    if header:
+        start = header.end()
+
+    footer_from = int(length * (1 - _FOOTER_SHARE))
+    for pattern in (_INSTRUCTIONS_RE, _SIGNATURE_RE):
+        match = pattern.search(text, max(start, footer_from))
+        if match:
+            end = min(end, match.start())
+
+    return text[start:end].strip()
+
+
+def _snap_left(text: str, pos: int) -> int:
+    """Moves `pos` left to the start of a word."""
+    while pos > 0 and not text[pos - 1].isspace():
+        pos -= 1
+    return pos
+
+
+def _snap_right(text: str, pos: int) -> int:
+    while pos < len(text) and not text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def citation_spans(text: str, before: int = 300, after: int = 200) -> list[tuple[int, int]]:
+    """Merged `(start, end)` windows around all citation markers in `text`."""
+    spans: list[tuple[int, int]] = []
+    for match in CITATION_MARKER_RE.finditer(text):
+        start = _snap_left(text, max(0, match.start() - before))
+        end = _snap_right(text, min(len(text), match.end() + after))
+        if spans and start <= spans[-1][1]:
+            spans[-1] = (spans[-1][0], max(spans[-1][1], end))
+        else:
+            spans.append((start, end))
+    return spans
+
+
+def reduce_opinion(
+    text: str, before: int = 300, after: int = 200, strip: bool = True
+) -> ReducedOpinion:
+    """Keeps only the passages around citations, separated by `GAP_MARKER`.
+
+    Args:
+        text: Full opinion text
+        before: Characters of context kept before each citation marker
+        after: Characters of context kept after each citation marker
+        strip: Whether to remove the header, `Poučení:` and signature block first
+    """
+    body = strip_boilerplate(text) if strip else text
+    spans = citation_spans(body, before, after)
+    reduced = GAP_MARKER.join(body[start:end].strip() for start, end in spans)
+    return ReducedOpinion(
+        text=reduced, original_chars=len(text), reduced_chars=len(reduced), spans=len(spans)
+    )
+
+
+def render_reduced_template(
+    template_name: str,
+    texts: Iterable[str],
+    before: int = 300,
+    after: int = 200,
+    **kwargs: Any,
+) -> tuple[list[str], list[ReducedOpinion]]:
+    """Renders compacted opinions into `template_name` (as `court_opinion`).
+
+    Returns:
+        Rendered prompts and the reduction record of every opinion
+    """
+    reduced = [reduce_opinion(text, before, after) for text in texts]
+    prompts = [
+        render_template_parts(template_name, court_opinion=opinion.text, **kwargs)
+        for opinion in reduced
+    ]
+    return prompts, reduced
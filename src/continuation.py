@@ -0,0 +1,86 @@
+import json
+from functools import wraps
+from typing import Callable
+
+from .apis.completion import Completion
+from .apis.json_repair import repair_json_list
+from .apis.streaming import close_json_prefix
+from .chunking import merge_reference_lists
+from .templates import render_template
+
+CONTINUATION_TEMPLATE_NAME = "continue_list.jinja2"
+DEFAULT_MAX_CONTINUATIONS = 3
+
+
+def _complete_items(text: str | None) -> list:
+    """Complete elements of a (possibly truncated) JSON list."""
+    closed = close_json_prefix(text or "")
+    return json.loads(closed) if closed is not None else []
+
+
+def complete_with_continuation(
+    complete_func: Callable[..., Completion],
+    text: str,
+    max_continuations: int = DEFAULT_MAX_CONTINUATIONS,
+    prefill: bool = False,
+    **infer_kwargs,
+) -> str | None:
+    """Runs a `*_complete` function and continues the output while it is truncated.
+
+    With `prefill` (Claude), the truncated output is sent back as the start of the
+    assistant's answer, so the model only generates the rest of the same list. Otherwise
+    a follow-up prompt lists the references extracted so far and asks for the remaining
+    ones, and the lists are merged in order.
+
+    Returns:
+        The output as is if it was never truncated, otherwise the stitched JSON list
+        (None if the first request produced nothing). If the output is still truncated
+        after `max_continuations`, the stitched list is returned unclosed: invalid JSON,
+        so that retries and resumed runs treat the item as unfinished, while
+        `process_raw_result` can still salvage its complete entries.
+    """
+    completion = complete_func(text, **infer_kwargs)
+    if not completion.truncated or completion.text is None:
+        return completion.full_text
+
+    output = completion.full_text or ""
+    items = _complete_items(output)
+    for _ in range(max_continuations):
+        if prefill:
+            completion = complete_func(text, prefill=output, **infer_kwargs)
+            output = completion.full_text or output
+            items = _complete_items(output)
+        else:
+            prompt = render_template(
+                CONTINUATION_TEMPLATE_NAME,
+                prompt=text,
+                extracted=json.dumps(items, ensure_ascii=False, indent=2),
+            )
+            completion = complete_func(prompt, **infer_kwargs)
+            items = merge_reference_lists([items, _complete_items(completion.full_text)])
+        if not completion.truncated:
+            break
+
+    if completion.truncated:
+        return output if prefill else json.dumps(items, ensure_ascii=False)[:-1]
+    if prefill:
+        # The stitched answer is complete; repair only normalizes it (e.g. fences)
+        return repair_json_list(output, close_truncated=False) or output
+    return json.dumps(items, ensure_ascii=False)
+
+
+def with_continuation(
+    complete_func: Callable[..., Completion],
+    max_continuations: int = DEFAULT_MAX_CONTINUATIONS,
+    prefill: bool = False,
+) -> Callable[..., str | None]:
+    """Turns a `*_complete` function into an inference function that continues
+    truncated outputs (see `complete_with_continuation`)."""
+
+    @wraps(complete_func)
+    def wrapper(text: str, **infer_kwargs) -> str | None:
+        return complete_with_continuation(
+            complete_func, text, max_continuations, prefill, **infer_kwargs
+        )
+
+    return wrapper
@@ -0,0 +1,171 @@
+from dataclasses import asdict
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .apis.telemetry import InferenceRecord
+from .constants import MODEL_PRICES
+from .token_count import text_hash
+
+# Opinion length buckets in characters
+LENGTH_BINS = (0, 5_000, 15_000, 40_000, np.inf)
+LENGTH_LABELS = ("<5k", "5k-15k", "15k-40k", ">40k")
+
+
+def _section_pairs(sections: Sequence[Iterable[int] | None]) -> pd.DataFrame:
+    """Unique (document, section) pairs; None documents and None sections are skipped."""
+    lists = pd.Series([list(s) if s is not None else [] for s in sections], dtype=object)
+    exploded = lists.explode().dropna()
+    pairs = pd.DataFrame({"document": exploded.index, "section": exploded.astype(int).values})
+    return pairs.drop_duplicates()
+
+
+def evaluate_sections(
+    annotated: Sequence[Iterable[int] | None],
+    inferred: Sequence[Iterable[int] | None],
+    texts: Sequence[str] | None = None,
+) -> pd.DataFrame:
+    """Per-document precision and recall of inferred vs. annotated civil code sections
+
+    With `texts`, annotated sections whose number does not occur in the opinion are
+    ignored, as they cannot be extracted from it (the rule of `missing_sections`).
+    A document whose inference failed (None) counts as inferring nothing.
+
+    Returns:
+        Frame with one row per document (`document` is its position) and the columns
+        `tp`, `fp`, `fn`, `precision`, `recall`, `f1` and `complete` (no section missing)
+    """
+    if len(inferred) != len(annotated) or (texts is not None and len(texts) != len(annotated)):
+        raise ValueError("Annotated sections, inferred sections and texts must match.")
+
+    gold = _section_pairs(annotated)
+    if texts is not None:
+        text_of = pd.Series(list(texts), dtype=object).fillna("")
+        occurs = [
+            str(section) in text
+            for section, text in zip(gold.section, text_of.values[gold.document], strict=True)
+        ]
+        gold = gold[np.array(occurs, dtype=bool)]
+    merged = gold.merge(
+        _section_pairs(inferred), on=["document", "section"], how="outer", indicator=True
+    )
+    documents = merged.document.to_numpy(dtype=np.int64)
+    side = merged["_merge"].to_numpy()
+    counts = {
+        name: np.bincount(documents[side == kind], minlength=len(annotated))
+        for name, kind in (("tp", "both"), ("fp", "right_only"), ("fn", "left_only"))
+    }
+    result = _add_scores(pd.DataFrame({"document": range(len(annotated)), **counts}))
+    result["complete"] = result.fn == 0
+    return result
+
+
+def _add_scores(frame: pd.DataFrame) -> pd.DataFrame:
+    """Precision, recall and F1 from the `tp`, `fp` and `fn` columns (NaN where undefined)."""
+    tp, fp, fn = (frame[c].astype(float) for c in ("tp", "fp", "fn"))
+    precision = tp / (tp + fp).replace(0, np.nan)
+    recall = tp / (tp + fn).replace(0, np.nan)
+    return frame.assign(
+        precision=precision,
+        recall=recall,
+        f1=2 * precision * recall / (precision + recall).replace(0, np.nan),
+    )
+
+
+def length_buckets(texts: Sequence[str] | pd.Series) -> pd.Series:
+    """Length bucket (see `LENGTH_BINS`) of every opinion."""
+    lengths = pd.Series(list(texts), dtype=object).fillna("").str.len()
+    return pd.cut(lengths, LENGTH_BINS, labels=LENGTH_LABELS, right=False)
+
+
+def request_metrics(
+    records: Iterable[InferenceRecord] | pd.DataFrame,
+    prompts: Sequence[str],
+    per_model: bool = True,
+) -> pd.DataFrame:
+    """Latency, tokens and cost of the requests of every document, from telemetry records
+
+    Records are matched to documents by the hash of their prompt, so only the requests
+    made with exactly these prompts are counted (not e.g. continuation requests).
+    Retried attempts add up, and so do the requests to several models with `per_model`
+    off (e.g. hedged or cascaded runs).
+
+    Returns:
+        Frame with one row per document and model (per document, with the models joined
+        by "+", without `per_model`): `document`, `provider`, `model`, `calls`, `errors`,
+        `latency` (seconds), `input_tokens`, `output_tokens`, `cost_usd`
+    """
+    if not isinstance(records, pd.DataFrame):
+        records = pd.DataFrame([asdict(r) for r in records])
+    columns = ["document", "provider", "model", "calls", "errors", "latency"]
+    columns += ["input_tokens", "output_tokens", "cost_usd"]
+    if records.empty:
+        return pd.DataFrame(columns=columns)
+
+    price_in = records.model.map({m: p[0] for m, p in MODEL_PRICES.items()}).fillna(0.0)
+    price_out = records.model.map({m: p[1] for m, p in MODEL_PRICES.items()}).fillna(0.0)
+    input_tokens = records.input_tokens.fillna(0)
+    output_tokens = records.output_tokens.fillna(0)
+    records = records.assign(
+        input_tokens=input_tokens,
+        output_tokens=output_tokens,
+        cost_usd=(input_tokens * price_in + output_tokens * price_out) / 1_000_000,
+        is_error=records.outcome == "error",
+    )
+
+    documents = pd.DataFrame(
+        {"prompt_hash": [text_hash(str(p)) for p in prompts], "document": range(len(prompts))}
+    )
+    merged = documents.merge(records, on="prompt_hash")
+    if per_model:
+        grouped = merged.groupby(["document", "provider", "model"], as_index=False)
+        labels = {}
+    else:
+        grouped = merged.groupby("document", as_index=False)
+        labels = {"provider": ("provider", _join_unique), "model": ("model", _join_unique)}
+    metrics = grouped.agg(
+        **labels,
+        calls=("prompt_hash", "size"),
+        errors=("is_error", "sum"),
+        latency=("latency", "sum"),
+        input_tokens=("input_tokens", "sum"),
+        output_tokens=("output_tokens", "sum"),
+        cost_usd=("cost_usd", "sum"),
+    )
+    return metrics[columns]
+
+
+def _join_unique(values: pd.Series) -> str:
+    return "+".join(sorted(values.dropna().unique()))
+
+
+def quality_summary(frame: pd.DataFrame, by: str | Sequence[str] | None = None) -> pd.DataFrame:
+    """Micro-averaged precision, recall and F1, overall or per group
+
+    `frame` has the columns of `evaluate_sections`, plus any grouping columns (court,
+    decision category, length bucket, model, ...). If it also has the columns of
+    `request_metrics`, the summary adds latency and cost, and `f1_per_second` (F1 per
+    second of mean request latency) to compare models on quality per second.
+    """
+    if by is None:
+        frame, by = frame.assign(group="all"), "group"
+    aggregations = {
+        "documents": ("tp", "size"),
+        "tp": ("tp", "sum"),
+        "fp": ("fp", "sum"),
+        "fn": ("fn", "sum"),
+        "complete_rate": ("complete", "mean"),
+    }
+    if "latency" in frame:
+        aggregations["mean_latency"] = ("latency", "mean")
+        aggregations["p95_latency"] = ("latency", lambda s: s.quantile(0.95))
+    if "cost_usd" in frame:
+        aggregations["cost_usd"] = ("cost_usd", "sum")
+
+    summary = _add_scores(frame.groupby(by, observed=True).agg(**aggregations))
+    if "cost_usd" in summary:
+        summary["cost_per_document"] = summary.cost_usd / summary.documents
+    if "mean_latency" in summary:
+        summary["f1_per_second"] = summary.f1 / summary.mean_latency.replace(0, np.nan)
+    return summary
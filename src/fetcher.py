@@ -0,0 +1,240 @@
+import asyncio
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Sequence
+from urllib.parse import urlsplit
+
+import httpx
+import tqdm
+
+from .apis.clients import make_async_http_client
+from .apis.errors import is_retryable_error
+from .apis.retry import RetryPolicy
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_HTTP_CACHE_PATH = DATA_DIR / "http_cache.sqlite"
+
+USER_AGENT = "Mozilla/5.0"
+
+
+@dataclass(frozen=True)
+class HostLimit:
+    """Politeness limits of one host.
+
+    Args:
+        max_concurrency: Maximum number of requests in flight
+        min_interval: Minimum number of seconds between the starts of two requests
+    """
+
+    max_concurrency: int = 4
+    min_interval: float = 0.25
+
+
+# Court websites are slow, keep the load on them modest
+HOST_LIMITS: dict[str, HostLimit] = {
+    "rozhodnuti.nsoud.cz": HostLimit(max_concurrency=4, min_interval=0.25),
+    "nalus.usoud.cz": HostLimit(max_concurrency=4, min_interval=0.25),
+}
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """Outcome of one fetch; `text` is None if it failed (see `error`)."""
+
+    url: str
+    status: int | None
+    text: str | None
+    from_cache: bool = False
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None
+
+
+class HttpCache:
+    """Persistent SQLite cache of page bodies with their `ETag`/`Last-Modified` validators.
+
+    Only responses carrying a validator are stored; they are revalidated with a
+    conditional request on every fetch and served from the cache on `304 Not Modified`.
+    """
+
+    def __init__(self, path: Path | str = DEFAULT_HTTP_CACHE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY,"
+            " etag TEXT,"
+            " last_modified TEXT,"
+            " body TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, url: str) -> tuple[str | None, str | None, str] | None:
+        """Returns the ETag, Last-Modified and body stored for `url`."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, body FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def put(self, url: str, etag: str | None, last_modified: str | None, body: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body, time.time()),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class _HostGate:
+    """Concurrency and request-spacing limit of one host."""
+
+    def __init__(self, limit: HostLimit):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit.max_concurrency)
+        self._lock = asyncio.Lock()
+        self._next_start = 0.0
+
+    async def wait_turn(self) -> None:
+        async with self._lock:
+            delay = self._next_start - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start = time.monotonic() + self.limit.min_interval
+
+
+class Fetcher:
+    """Polite async HTTP fetcher with pooled keep-alive connections.
+
+    Requests to a host are limited by its `HostLimit`. Timeouts, connection errors,
+    throttling and server errors are retried with backoff (honouring `retry-after`),
+    and with a cache, pages are revalidated with `If-None-Match`/`If-Modified-Since`.
+
+        async with Fetcher(cache=HttpCache()) as fetcher:
+            result = await fetcher.fetch(url)
+
+    Args:
+        cache: Optional cache of page bodies for conditional requests
+        host_limits: Limits per host name (`HOST_LIMITS` by default)
+        default_limit: Limits of hosts missing from `host_limits`
+        retry_policy: Attempts and backoff of retries
+        timeout: Timeout of a request in seconds
+        encoding: Encoding of the pages, overriding the one declared by the server
+        headers: Additional request headers
+    """
+
+    def __init__(
+        self,
+        cache: HttpCache | None = None,
+        host_limits: dict[str, HostLimit] | None = None,
+        default_limit: HostLimit | None = None,
+        retry_policy: RetryPolicy | None = None,
+        timeout: float = 30.0,
+        encoding: str | None = None,
+        headers: dict[str, str] | None = None,
+    ):
+        self.cache = cache
+        self.host_limits = HOST_LIMITS if host_limits is None else host_limits
+        self.default_limit = default_limit or HostLimit()
+        self.retry_policy = retry_policy or RetryPolicy(max_attempts=4, base_delay=2.0)
+        self.timeout = timeout
+        self.encoding = encoding
+        self.headers = {"User-Agent": USER_AGENT, **(headers or {})}
+        self.revalidated = 0
+        self._gates: dict[str, _HostGate] = {}
+        self._client: httpx.AsyncClient | None = None
+
+    async def __aenter__(self) -> "Fetcher":
+        self._client = make_async_http_client(
+            timeout=httpx.Timeout(self.timeout, connect=10.0),
+            headers=self.headers,
+            follow_redirects=True,
+        )
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlsplit(url).hostname or ""
+        if host not in self._gates:
+            self._gates[host] = _HostGate(self.host_limits.get(host, self.default_limit))
+        return self._gates[host]
+
+    async def _get(self, url: str, headers: dict[str, str]) -> httpx.Response:
+        if self._client is None:
+            raise RuntimeError("Use the fetcher as an async context manager.")
+        gate = self._gate(url)
+        async with gate.semaphore:
+            await gate.wait_turn()
+            return await self._client.get(url, headers=headers)
+
+    async def fetch(self, url: str) -> FetchResult:
+        cached = self.cache.get(url) if self.cache is not None else None
+        headers = {}
+        if cached is not None:
+            etag, last_modified, _ = cached
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        status = None
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                response = await self._get(url, headers)
+                status = response.status_code
+                if status == 304 and cached is not None:
+                    self.revalidated += 1
+                    return FetchResult(url, status, cached[2], from_cache=True)
+                response.raise_for_status()
+            except Exception as e:
+                if not is_retryable_error(e) or attempt == self.retry_policy.max_attempts:
+                    return FetchResult(url, status, None, error=f"{type(e).__name__}: {e}")
+                await asyncio.sleep(self.retry_policy.backoff(attempt, e))
+                continue
+
+            if self.encoding is not None:
+                response.encoding = self.encoding
+            text = response.text
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            if self.cache is not None and (etag or last_modified):
+                self.cache.put(url, etag, last_modified, text)
+            return FetchResult(url, status, text)
+
+    async def fetch_all(self, urls: Iterable[str], progress: bool = True) -> list[FetchResult]:
+        """Fetches all URLs concurrently (within the host limits), in the order of `urls`."""
+        tasks = [asyncio.ensure_future(self.fetch(url)) for url in urls]
+        if progress:
+            for task in tqdm.tqdm(asyncio.as_completed(tasks), total=len(tasks)):
+                await task
+        return list(await asyncio.gather(*tasks))
+
+
+def fetch_all(urls: Sequence[str], progress: bool = True, **fetcher_kwargs) -> list[FetchResult]:
+    """Synchronous entry point: fetches all URLs with one `Fetcher` (see its arguments)."""
+
+    async def main() -> list[FetchResult]:
+        async with Fetcher(**fetcher_kwargs) as fetcher:
+            return await fetcher.fetch_all(urls, progress)
+
+    return asyncio.run(main())
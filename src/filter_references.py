@@ -3,6 +3,8 @@ import json
 import re
 from typing import Iterable
 
+from .apis.json_repair import repair_json_list
+
 
 def is_civil_code_reference(item: str) -> bool:
     # Check for civil code identifiers with optional parentheses
@@ -44,11 +46,23 @@ def extract_section_numbers(items: Iterable[str]) -> list[int]:
     return list(set(filtered))
 
 
+def process_raw_result(raw_result: str) -> list[int]:
+    stripped = raw_result.replace("```json", "").replace("```", "").strip()
+    try:
+        items = json.loads(stripped)
+    except json.JSONDecodeError:
+        repaired = repair_json_list(raw_result)
+        if repaired is None:
+            raise
+        items = json.loads(repaired)
+    return extract_section_numbers(filter_civil_code_references(items))
+
+
 def process_raw_results(raw_results: Iterable[str]) -> list[list[int]]:
-    stripped = (
-        raw_result.replace("```json", "").replace("```", "").strip() for raw_result in raw_results
-    )
-    parsed = map(json.loads, stripped)
-    filtered = map(filter_civil_code_references, parsed)
-    extracted = map(extract_section_numbers, filtered)
-    return list(extracted)
+    return list(map(process_raw_result, raw_results))
+
+
+def missing_sections(annotated: Iterable[int], inferred: Iterable[int], text: str) -> set[int]:
+    """Annotated sections missing from the inferred ones, ignoring sections whose number does
+    not occur in the opinion text at all (those cannot be extracted from it)."""
+    return {m for m in set(annotated) - set(inferred) if str(m) in text}
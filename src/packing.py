@@ -0,0 +1,154 @@
+import json
+import logging
+from typing import Callable, Sequence
+
+from .apis.common import run_inference_parallel_with_retry
+from .templates import render_template_parts
+from .token_count import count_tokens
+
+PACKED_TEMPLATE_NAME = "extract_acts_packed.jinja2"
+DEFAULT_PACK_TOKENS = 8000
+DEFAULT_MAX_DOCS = 8
+DEFAULT_SHORT_TOKENS = 2000
+
+logger = logging.getLogger(__name__)
+
+
+def pack_documents(
+    texts: Sequence[str],
+    max_pack_tokens: int = DEFAULT_PACK_TOKENS,
+    max_docs: int = DEFAULT_MAX_DOCS,
+    short_tokens: int = DEFAULT_SHORT_TOKENS,
+    provider: str = "gemini",
+) -> tuple[list[list[int]], list[int]]:
+    """Bin-packs short documents into packs with first-fit decreasing.
+
+    Args:
+        texts: Documents to pack
+        max_pack_tokens: Token budget of the documents in one pack
+        max_docs: Maximum number of documents in one pack (bounds the output length)
+        short_tokens: Documents above this number of tokens are never packed
+        provider: Provider whose token counter is used
+
+    Returns:
+        Packs of at least two document indices, and the indices of documents to be sent alone
+    """
+    tokens = [count_tokens(text, provider) for text in texts]
+    short = [i for i, n in enumerate(tokens) if n <= min(short_tokens, max_pack_tokens)]
+    singles = [i for i, n in enumerate(tokens) if n > min(short_tokens, max_pack_tokens)]
+
+    packs: list[list[int]] = []
+    free: list[int] = []
+    for i in sorted(short, key=lambda i: tokens[i], reverse=True):
+        for p, pack in enumerate(packs):
+            if free[p] >= tokens[i] and len(pack) < max_docs:
+                pack.append(i)
+                free[p] -= tokens[i]
+                break
+        else:
+            packs.append([i])
+            free.append(max_pack_tokens - tokens[i])
+
+    singles.extend(pack[0] for pack in packs if len(pack) == 1)
+    packs = [sorted(pack) for pack in packs if len(pack) > 1]
+    return packs, sorted(singles)
+
+
+def _document_id(position: int) -> str:
+    return str(position + 1)
+
+
+def render_packed_prompt(texts: Sequence[str], template_name: str = PACKED_TEMPLATE_NAME) -> str:
+    """Renders documents into the packed template with ids "1", "2", ... in order.
+
+    The template marks the end of its static prefix with `{{ prefix_end }}`.
+    """
+    documents = [{"id": _document_id(k), "text": text} for k, text in enumerate(texts)]
+    return render_template_parts(template_name, documents=documents)
+
+
+def unpack_result(raw: str | None, n_docs: int) -> list[str | None]:
+    """Splits a packed response into per-document JSON lists (None where a document's
+    entry is missing or malformed)."""
+    if raw is None:
+        return [None] * n_docs
+    try:
+        parsed = json.loads(raw.replace("```json", "").replace("```", "").strip())
+    except json.JSONDecodeError:
+        return [None] * n_docs
+    if not isinstance(parsed, dict):
+        return [None] * n_docs
+
+    results: list[str | None] = []
+    for k in range(n_docs):
+        references = parsed.get(_document_id(k))
+        if isinstance(references, list) and all(isinstance(r, str) for r in references):
+            results.append(json.dumps(references, ensure_ascii=False))
+        else:
+            results.append(None)
+    return results
+
+
+def run_packed_inference(
+    texts: Sequence[str],
+    infer_func: Callable[..., str | None],
+    template_name: str = "extract_acts_03.jinja2",
+    packed_template_name: str = PACKED_TEMPLATE_NAME,
+    max_pack_tokens: int = DEFAULT_PACK_TOKENS,
+    max_docs: int = DEFAULT_MAX_DOCS,
+    short_tokens: int = DEFAULT_SHORT_TOKENS,
+    provider: str = "gemini",
+    max_workers: int = 10,
+    **infer_kwargs,
+) -> list[str | None]:
+    """Extract references with short opinions packed several to a request
+
+    Documents missing or malformed in a packed response are re-run on their own with
+    `template_name`, together with the documents too long to be packed.
+
+    Args:
+        texts: Opinion texts (not rendered prompts)
+        infer_func: Inference function
+        template_name: Single-document template (rendered with `court_opinion`)
+        packed_template_name: Multi-document template (rendered with `documents`)
+        max_pack_tokens: Token budget of the opinions in one packed request
+        max_docs: Maximum number of opinions in one packed request
+        short_tokens: Opinions above this number of tokens are sent alone
+        provider: Provider whose token counter sizes the packs
+        max_workers: Maximum number of parallel workers
+        **infer_kwargs: Additional keyword arguments to pass to `run_inference_parallel_with_retry`
+
+    Returns:
+        JSON list string per opinion, compatible with `process_raw_results`
+    """
+    packs, singles = pack_documents(texts, max_pack_tokens, max_docs, short_tokens, provider)
+    results: list[str | None] = [None] * len(texts)
+
+    packed_prompts = [
+        render_packed_prompt([texts[i] for i in pack], packed_template_name) for pack in packs
+    ]
+    packed_raw = run_inference_parallel_with_retry(
+        packed_prompts, infer_func, max_workers, **infer_kwargs
+    )
+    for pack, raw in zip(packs, packed_raw, strict=True):
+        for i, result in zip(pack, unpack_result(raw, len(pack)), strict=True):
+            results[i] = result
+
+    fallback = sorted(singles + [i for pack in packs for i in pack if results[i] is None])
+    logger.info(
+        "Packed %d opinions into %d requests, %d opinions sent alone",
+        len(texts) - len(singles),
+        len(packs),
+        len(fallback),
+    )
+    if fallback:
+        single_prompts = [
+            render_template_parts(template_name, court_opinion=texts[i]) for i in fallback
+        ]
+        single_raw = run_inference_parallel_with_retry(
+            single_prompts, infer_func, max_workers, **infer_kwargs
+        )
+        for i, raw in zip(fallback, single_raw, strict=True):
+            results[i] = raw
+
+    return results
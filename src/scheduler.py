@@ -0,0 +1,246 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Iterator, Sequence
+
+from .apis.common import is_invalid_json, iter_inference_parallel
+from .apis.retry import RetryPolicy, with_retry
+from .citations import CITATION_MARKER_RE
+from .constants import DEFAULT_MAX_TOKENS, MODEL_PRICES
+from .templates import render_template_parts
+from .token_count import count_tokens
+
+# Output size model of the extraction templates: a JSON list with one entry per citation
+TOKENS_PER_CITATION = 12
+OUTPUT_OVERHEAD_TOKENS = 16
+OUTPUT_MARGIN = 1.5
+MIN_MAX_TOKENS = 256
+MAX_MAX_TOKENS = 4 * DEFAULT_MAX_TOKENS
+
+
+def estimate_output_tokens(text: str) -> int:
+    """Expected output tokens of an extraction, from the number of citation markers."""
+    markers = sum(1 for _ in CITATION_MARKER_RE.finditer(text))
+    return OUTPUT_OVERHEAD_TOKENS + markers * TOKENS_PER_CITATION
+
+
+def adaptive_max_tokens(expected_output_tokens: int) -> int:
+    """Output budget of a request: the expected size with a margin, within bounds."""
+    return max(MIN_MAX_TOKENS, min(MAX_MAX_TOKENS, int(expected_output_tokens * OUTPUT_MARGIN)))
+
+
+@dataclass(frozen=True)
+class ScheduledRequest:
+    index: int
+    prompt: str
+    input_tokens: int
+    expected_output_tokens: int
+    max_tokens: int
+
+
+@dataclass
+class RunPlan:
+    """Requests of a run in the order they are submitted (longest first)."""
+
+    requests: list[ScheduledRequest]
+    model: str | None = None
+
+    def cost(self, input_tokens: int, output_tokens: int) -> float:
+        price_in, price_out = MODEL_PRICES.get(self.model or "", (0.0, 0.0))
+        return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+    @property
+    def input_tokens(self) -> int:
+        return sum(r.input_tokens for r in self.requests)
+
+    @property
+    def expected_output_tokens(self) -> int:
+        return sum(r.expected_output_tokens for r in self.requests)
+
+    @property
+    def max_output_tokens(self) -> int:
+        return sum(r.max_tokens for r in self.requests)
+
+    def summary(self) -> str:
+        expected = self.cost(self.input_tokens, self.expected_output_tokens)
+        worst = self.cost(self.input_tokens, self.max_output_tokens)
+        return (
+            f"{len(self.requests)} requests, {self.input_tokens:,} input tokens, "
+            f"~{self.expected_output_tokens:,} output tokens "
+            f"(at most {self.max_output_tokens:,})\n"
+            f"Estimated cost ({self.model}): ${expected:.4f} expected, ${worst:.4f} at most"
+        )
+
+
+def plan_run(
+    texts: Sequence[str],
+    template_name: str = "extract_acts_03.jinja2",
+    provider: str = "gemini",
+    model: str | None = None,
+) -> RunPlan:
+    """Estimates the tokens of every request and orders them longest first.
+
+    Use it on its own as a dry run: `print(plan_run(texts, model=...).summary())`.
+    """
+    requests = []
+    for i, text in enumerate(texts):
+        prompt = render_template_parts(template_name, court_opinion=text)
+        expected = estimate_output_tokens(text)
+        requests.append(
+            ScheduledRequest(
+                index=i,
+                prompt=prompt,
+                input_tokens=count_tokens(prompt, provider),
+                expected_output_tokens=expected,
+                max_tokens=adaptive_max_tokens(expected),
+            )
+        )
+    # Longest first, so that the slowest requests do not start at the end of the run
+    requests.sort(key=lambda r: r.input_tokens + r.expected_output_tokens, reverse=True)
+    return RunPlan(requests, model)
+
+
+@dataclass
+class _Spend:
+    tokens: int = 0
+    cost: float = 0.0
+
+
+class _OverBudget(Exception):
+    """A retry does not fit the budget."""
+
+
+@dataclass
+class ScheduledRun:
+    """Results of `run_scheduled` with what the run spent.
+
+    Args:
+        results: Inference results in the order of the original texts (None if skipped)
+        tokens: Input and output tokens of all attempts, including retries
+        cost: Cost of all attempts in USD
+        attempts: Number of calls to the inference function
+        skipped: Number of requests that did not fit the budget
+    """
+
+    results: list[str | None]
+    tokens: int = 0
+    cost: float = 0.0
+    attempts: int = 0
+    skipped: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"Spent {self.tokens:,} tokens (${self.cost:.4f}) in {self.attempts} attempts, "
+            f"skipped {self.skipped} requests"
+        )
+
+
+def run_scheduled(
+    plan: RunPlan,
+    infer_func: Callable[..., str | None],
+    provider: str = "gemini",
+    max_cost: float | None = None,
+    max_total_tokens: int | None = None,
+    max_workers: int = 10,
+    retry_policy: RetryPolicy | None = None,
+    **infer_kwargs,
+) -> ScheduledRun:
+    """Run a plan with per-request `max_tokens` under a token and cost budget
+
+    Every attempt reserves its worst case (prompt and full `max_tokens`) before it is
+    sent, and is charged its actual output once it completes. A request whose first
+    attempt no longer fits the budget is skipped and gets None. A retry after invalid
+    output, which is usually output cut off by a `max_tokens` set too low, doubles
+    `max_tokens` (up to `MAX_MAX_TOKENS`); a retry that does not fit the budget is not
+    sent, and the request keeps its last (invalid) result.
+
+    Args:
+        plan: Requests from `plan_run`
+        infer_func: Inference function accepting `max_tokens`
+        provider: Provider whose token counter measures the outputs
+        max_cost: Budget in USD, priced with the plan's model, which must be in
+            `MODEL_PRICES` (None = unlimited)
+        max_total_tokens: Budget of input plus output tokens (None = unlimited)
+        max_workers: Maximum number of parallel workers
+        retry_policy: Per-request retry settings
+        **infer_kwargs: Additional keyword arguments to pass to the inference function
+
+    Returns:
+        The results with the tokens, cost and attempts spent and the number of skipped requests
+    """
+    if max_cost is not None and plan.model not in MODEL_PRICES:
+        raise ValueError(f"max_cost needs a model with known prices, got {plan.model!r}")
+    policy = retry_policy or RetryPolicy()
+    run = ScheduledRun([None] * len(plan.requests))
+    reserved = _Spend()
+    lock = threading.Lock()
+
+    def reserve(input_tokens: int, max_tokens: int) -> bool:
+        """Reserves the worst case of an attempt if it fits the budget."""
+        tokens = input_tokens + max_tokens
+        cost = plan.cost(input_tokens, max_tokens)
+        with lock:
+            over_tokens = (
+                max_total_tokens is not None
+                and run.tokens + reserved.tokens + tokens > max_total_tokens
+            )
+            over_cost = max_cost is not None and run.cost + reserved.cost + cost > max_cost
+            if over_tokens or over_cost:
+                return False
+            reserved.tokens += tokens
+            reserved.cost += cost
+            return True
+
+    def admitted() -> Iterator[ScheduledRequest]:
+        for request in plan.requests:
+            if reserve(request.input_tokens, request.max_tokens):
+                yield request
+            else:
+                with lock:
+                    run.skipped += 1
+
+    def run_request(request: ScheduledRequest) -> str | None:
+        max_tokens = request.max_tokens
+        attempts = 0
+        last: str | None = None
+
+        def attempt(prompt: str, **kwargs) -> str | None:
+            nonlocal max_tokens, attempts, last
+            # The first attempt was reserved on admission
+            if attempts > 0:
+                if last is not None and is_invalid_json(last):
+                    max_tokens = min(MAX_MAX_TOKENS, 2 * max_tokens)
+                if not reserve(request.input_tokens, max_tokens):
+                    raise _OverBudget
+            attempts += 1
+            result = None
+            try:
+                result = infer_func(prompt, max_tokens=max_tokens, **kwargs)
+                return result
+            finally:
+                last = result
+                # Failed attempts are charged for their prompt
+                output_tokens = count_tokens(result or "", provider)
+                with lock:
+                    reserved.tokens -= request.input_tokens + max_tokens
+                    reserved.cost -= plan.cost(request.input_tokens, max_tokens)
+                    run.attempts += 1
+                    run.tokens += request.input_tokens + output_tokens
+                    run.cost += plan.cost(request.input_tokens, output_tokens)
+
+        try:
+            return with_retry(attempt, policy)(request.prompt, **infer_kwargs)
+        except _OverBudget:
+            return last
+
+    submitted: list[ScheduledRequest] = []
+
+    def track(requests: Iterator[ScheduledRequest]) -> Iterator[ScheduledRequest]:
+        for request in requests:
+            submitted.append(request)
+            yield request
+
+    jobs = track(admitted())
+    for k, result in iter_inference_parallel(jobs, run_request, max_workers):  # type: ignore
+        run.results[submitted[k].index] = result
+
+    return run
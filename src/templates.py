@@ -39,3 +39,53 @@ def render_template(template_name: str, **kwargs: Any) -> str:
     """Loads and renders a template with the given context."""
     template = load_template(template_name)
     return template.render(**kwargs)
+
+
+class CachedPrompt(str):
+    """A rendered prompt whose first `prefix_len` characters are the same for every input.
+
+    It behaves as a plain string everywhere; provider wrappers use the split to send the
+    static prefix through their prompt-caching facility.
+    """
+
+    prefix_len: int
+
+    def __new__(cls, text: str, prefix_len: int = 0) -> "CachedPrompt":
+        prompt = super().__new__(cls, text)
+        prompt.prefix_len = prefix_len
+        return prompt
+
+    @property
+    def prefix(self) -> str:
+        return str(self[: self.prefix_len])
+
+    @property
+    def suffix(self) -> str:
+        return str(self[self.prefix_len :])
+
+
+_PREFIX_SENTINEL = "\x00CASELAW_PROMPT_SPLIT\x00"
+
+
+def render_template_parts(
+    template_name: str, variable: str = "court_opinion", **kwargs: Any
+) -> CachedPrompt:
+    """Renders a template and marks everything before `variable` as the cacheable prefix.
+
+    Templates whose variable part is not a single substitution (e.g. a loop over
+    documents) mark the end of the prefix explicitly with `{{ prefix_end }}`, which
+    renders empty otherwise. The prefix only stays static across calls if the other
+    template variables do.
+    """
+    template = load_template(template_name)
+    marked = template.render(**{**kwargs, "prefix_end": _PREFIX_SENTINEL})
+    prefix_len = marked.find(_PREFIX_SENTINEL)
+    if prefix_len >= 0:
+        return CachedPrompt(marked.replace(_PREFIX_SENTINEL, ""), prefix_len)
+
+    rendered = template.render(**kwargs)
+    marked = template.render(**{**kwargs, variable: _PREFIX_SENTINEL})
+    prefix_len = marked.find(_PREFIX_SENTINEL)
+    if prefix_len < 0 or not rendered.startswith(marked[:prefix_len]):
+        prefix_len = 0
+    return CachedPrompt(rendered, prefix_len)
@@ -1,22 +1,135 @@
-import concurrent.futures
+import hashlib
+import json
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Iterable
 
-from .apis.anthropic import claude_count_tokens
+try:
+    import tiktoken
+except ImportError:  # optional, exact counts for OpenAI models
+    tiktoken = None
 
 
-def count_tokens_in_text(text, chunk_size=5_000_000):
-    """Count tokens in a text by chunking and parallel processing."""
-    # Split text into chunks
-    chunks = [text[i : i + chunk_size] for i in range(0, len(text), chunk_size)]
+@dataclass(frozen=True)
+class TokenizerProfile:
+    """Offline token counting settings of one provider.
 
-    # Process chunks in parallel
-    with concurrent.futures.ThreadPoolExecutor() as executor:
-        token_counts = list(executor.map(claude_count_tokens, chunks))
+    `chars_per_token` is the estimator used when no local tokenizer is available.
+    The defaults are approximations for Czech legal text; refine them with
+    `calibrate_profile` against the provider's exact counts.
+    """
 
-    return sum(token_counts)
+    name: str
+    chars_per_token: float
+    tiktoken_encoding: str | None = None
 
 
-def analyze_corpus_tokens(texts):
+TOKENIZER_PROFILES: dict[str, TokenizerProfile] = {
+    "claude": TokenizerProfile("claude", chars_per_token=2.6),
+    "openai": TokenizerProfile("openai", chars_per_token=3.2, tiktoken_encoding="o200k_base"),
+    "gemini": TokenizerProfile("gemini", chars_per_token=3.4),
+    "fireworks": TokenizerProfile("fireworks", chars_per_token=3.0),
+}
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class TokenCounter:
+    """Offline token counter with per-document counts cached by text hash.
+
+    Args:
+        profile: Provider profile (see `TOKENIZER_PROFILES`)
+        cache_path: Optional JSON file the cache is loaded from and saved to
+    """
+
+    def __init__(self, profile: TokenizerProfile, cache_path: Path | str | None = None):
+        self.profile = profile
+        self.cache_path = Path(cache_path) if cache_path is not None else None
+        self._cache: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._encoding = None
+        if tiktoken is not None and profile.tiktoken_encoding is not None:
+            self._encoding = tiktoken.get_encoding(profile.tiktoken_encoding)
+        if self.cache_path is not None and self.cache_path.exists():
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                self._cache = json.load(f)
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def _count(self, text: str) -> int:
+        if self._encoding is not None:
+            return len(self._encoding.encode(text, disallowed_special=()))
+        return round(len(text) / self.profile.chars_per_token)
+
+    def count(self, text: str) -> int:
+        key = text_hash(text)
+        with self._lock:
+            cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        tokens = self._count(text)
+        with self._lock:
+            self._cache[key] = tokens
+        return tokens
+
+    def save(self) -> None:
+        if self.cache_path is None:
+            raise ValueError("The counter has no cache_path.")
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.cache_path, "w", encoding="utf-8") as f:
+            json.dump(self._cache, f)
+
+
+_counters: dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def get_token_counter(provider: str = "claude") -> TokenCounter:
+    """Returns the process-wide counter of a provider."""
+    with _counters_lock:
+        if provider not in _counters:
+            _counters[provider] = TokenCounter(TOKENIZER_PROFILES[provider])
+        return _counters[provider]
+
+
+def count_tokens(text: str, provider: str = "claude") -> int:
+    """Counts tokens offline (exactly where a local tokenizer exists, estimated otherwise)."""
+    return get_token_counter(provider).count(text)
+
+
+def count_tokens_in_text(text: str, provider: str = "claude") -> int:
+    """Count tokens in a text without any network calls."""
+    return count_tokens(text, provider)
+
+
+def calibrate_profile(
+    profile: TokenizerProfile,
+    sample_texts: Iterable[str],
+    exact_count: Callable[[str], int],
+) -> TokenizerProfile:
+    """Fits `chars_per_token` on a sample using an exact counter such as
+    `src.apis.anthropic.claude_count_tokens`."""
+    chars, tokens = 0, 0
+    for text in sample_texts:
+        chars += len(text)
+        tokens += exact_count(text)
+    if tokens == 0:
+        raise ValueError("The sample contains no tokens.")
+    return replace(profile, chars_per_token=chars / tokens)
+
+
+def analyze_corpus_tokens(texts: Iterable[str], provider: str = "claude") -> tuple[int, int]:
     """Analyze token and character counts for a corpus of texts."""
-    total_text = " ".join(texts)
-    print(f"Total characters: {len(total_text):,}")
-    print(f"Total tokens: {count_tokens_in_text(total_text):,}")
+    counter = get_token_counter(provider)
+    total_chars, total_tokens = 0, 0
+    for text in texts:
+        total_chars += len(text)
+        total_tokens += counter.count(text)
+    print(f"Total characters: {total_chars:,}")
+    print(f"Total tokens: {total_tokens:,}")
+    return total_chars, total_tokens
@@ -0,0 +1,194 @@
+import itertools
+import math
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Sequence
+
+import pandas as pd
+
+from .apis.common import is_invalid_json, iter_inference_parallel
+from .apis.retry import RetryPolicy, with_retry
+from .filter_references import missing_sections, process_raw_result
+from .templates import render_template_parts
+
+
+@dataclass(frozen=True)
+class Variant:
+    """A prompt template and model combination competing in a tournament."""
+
+    name: str
+    template_name: str
+    infer_func: Callable[..., str | None]
+    infer_kwargs: dict[str, Any] = field(default_factory=dict)
+
+
+def score_output(raw: str | None, annotated: Iterable[int], text: str) -> bool:
+    """Whether an extraction finds every annotated section that occurs in the opinion."""
+    if is_invalid_json(raw):
+        return False
+    try:
+        inferred = process_raw_result(raw)  # type: ignore
+    except (AttributeError, TypeError):
+        return False
+    return not missing_sections(annotated, inferred, text)
+
+
+class PairedSPRT:
+    """Wald's sequential probability ratio test on the discordant pairs of two variants.
+
+    Among opinions where exactly one of the variants succeeds, H0 says each variant wins
+    with probability 1/2 and H1 says the better one wins with probability 1/2 + `delta`.
+    The test runs in both directions and concludes with a winner, or with a negligible
+    difference once both directions accept H0.
+
+    Args:
+        delta: Smallest win-probability advantage worth detecting
+        alpha: False positive rate per direction
+        beta: False negative rate per direction
+    """
+
+    def __init__(self, delta: float = 0.2, alpha: float = 0.05, beta: float = 0.2):
+        self.upper = math.log((1 - beta) / alpha)
+        self.lower = math.log(beta / (1 - alpha))
+        self._win = math.log((0.5 + delta) / 0.5)
+        self._loss = math.log((0.5 - delta) / 0.5)
+        self.llr = [0.0, 0.0]  # evidence for "first is better", "second is better"
+        self.accepted_h0 = [False, False]
+        self.wins = [0, 0]
+
+    def update(self, first_ok: bool, second_ok: bool) -> None:
+        if first_ok == second_ok:
+            return
+        winner = 0 if first_ok else 1
+        self.wins[winner] += 1
+        for side in (0, 1):
+            if self.accepted_h0[side]:
+                continue
+            self.llr[side] += self._win if side == winner else self._loss
+            if self.llr[side] <= self.lower:
+                self.accepted_h0[side] = True
+
+    @property
+    def better(self) -> int | None:
+        """0 or 1 once that variant is significantly better, otherwise None."""
+        for side in (0, 1):
+            if self.llr[side] >= self.upper:
+                return side
+        return None
+
+    @property
+    def negligible(self) -> bool:
+        return all(self.accepted_h0)
+
+
+@dataclass
+class TournamentResult:
+    status: str  # "winner", "negligible" or "inconclusive"
+    winner: str | None
+    scores: pd.DataFrame
+    requests: int
+    opinions: int
+    eliminated: dict[str, str] = field(default_factory=dict)
+
+
+def run_tournament(
+    texts: Sequence[str],
+    annotations: Sequence[Iterable[int]],
+    variants: Sequence[Variant],
+    batch_size: int = 10,
+    max_workers: int = 10,
+    delta: float = 0.2,
+    alpha: float = 0.05,
+    beta: float = 0.2,
+    retry_policy: RetryPolicy | None = None,
+) -> TournamentResult:
+    """Compare prompt/model variants on the same opinions, stopping as early as possible
+
+    Opinions are taken in batches; within a batch the requests of all remaining
+    variants are interleaved over the same opinions. After every batch each pair of
+    remaining variants is tested with `PairedSPRT`; a variant is eliminated as soon as
+    another one is significantly better, and the tournament ends when one variant is
+    left, all remaining differences are negligible, or the opinions run out.
+
+    Args:
+        texts: Opinion texts, ideally in random order
+        annotations: Annotated civil code sections of each opinion
+        variants: Competing variants (at least two)
+        batch_size: Number of opinions evaluated between stopping checks
+        max_workers: Maximum number of parallel workers
+        delta, alpha, beta: Settings of the sequential test (see `PairedSPRT`)
+        retry_policy: Per-request retry settings
+
+    Returns:
+        Outcome, per-variant success rates and the number of requests spent
+    """
+    if len(variants) < 2:
+        raise ValueError("A tournament needs at least two variants.")
+    if len(annotations) != len(texts):
+        raise ValueError("Annotations must match the texts.")
+
+    retry_policy = retry_policy or RetryPolicy()
+    infers = {v.name: with_retry(v.infer_func, retry_policy) for v in variants}
+    by_name = {v.name: v for v in variants}
+    alive = [v.name for v in variants]
+    tests = {
+        pair: PairedSPRT(delta, alpha, beta) for pair in itertools.combinations(alive, 2)
+    }
+    successes = {name: [] for name in alive}
+    eliminated: dict[str, str] = {}
+    requests = 0
+    opinions = 0
+    status = "inconclusive"
+
+    def run_job(job: tuple[str, int]) -> str | None:
+        name, i = job
+        variant = by_name[name]
+        prompt = render_template_parts(variant.template_name, court_opinion=texts[i])
+        return infers[name](prompt, **variant.infer_kwargs)
+
+    for start in range(0, len(texts), batch_size):
+        batch = range(start, min(start + batch_size, len(texts)))
+        # Interleaved: every opinion of the batch is requested from all variants together
+        jobs = [(name, i) for i in batch for name in alive]
+        outcomes: dict[tuple[str, int], bool] = {}
+        for k, raw in iter_inference_parallel(jobs, run_job, max_workers):  # type: ignore
+            name, i = jobs[k]
+            outcomes[(name, i)] = score_output(raw, annotations[i], texts[i])
+        requests += len(jobs)
+        opinions += len(batch)
+
+        for i in batch:
+            for name in alive:
+                successes[name].append(outcomes[(name, i)])
+            for (a, b), test in tests.items():
+                if a in alive and b in alive:
+                    test.update(outcomes[(a, i)], outcomes[(b, i)])
+
+        for (a, b), test in tests.items():
+            if a not in alive or b not in alive or test.better is None:
+                continue
+            winner, loser = (a, b) if test.better == 0 else (b, a)
+            eliminated[loser] = winner
+        alive = [name for name in alive if name not in eliminated]
+
+        if len(alive) == 1:
+            status = "winner"
+            break
+        remaining = [t for (a, b), t in tests.items() if a in alive and b in alive]
+        if all(t.negligible for t in remaining):
+            status = "negligible"
+            break
+
+    scores = pd.DataFrame(
+        [
+            {
+                "variant": name,
+                "opinions": len(ok),
+                "successes": sum(ok),
+                "success_rate": sum(ok) / len(ok) if ok else None,
+                "eliminated_by": eliminated.get(name),
+            }
+            for name, ok in successes.items()
+        ]
+    )
+    winner = alive[0] if status == "winner" else None
+    return TournamentResult(status, winner, scores, requests, opinions, eliminated)
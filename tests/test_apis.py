@@ -1,13 +1,35 @@
+import json
 import os
+from functools import partial
 
 import pytest
 from dotenv import load_dotenv
 
-from src.apis.anthropic import claude_infer
-from src.apis.common import get_api_key
-from src.apis.fireworks import fireworks_infer
-from src.apis.google import gemini_infer
-from src.apis.openai import openai_infer
+from src.apis.anthropic import (
+    claude_complete,
+    claude_infer,
+    claude_infer_async,
+    claude_infer_stream,
+)
+from src.apis.common import get_api_key, run_inference_async
+from src.apis.fireworks import (
+    fireworks_complete,
+    fireworks_infer,
+    fireworks_infer_async,
+    fireworks_infer_stream,
+)
+from src.apis.google import (
+    gemini_complete,
+    gemini_infer,
+    gemini_infer_async,
+    gemini_infer_stream,
+)
+from src.apis.openai import (
+    openai_complete,
+    openai_infer,
+    openai_infer_async,
+    openai_infer_stream,
+)
 from src.constants import (
     ANTHROPIC_API_KEY,
     FIREWORKS_API_KEY,
@@ -32,6 +54,10 @@ def load_env():
         openai_infer,
         gemini_infer,
         fireworks_infer,
+        claude_infer_stream,
+        openai_infer_stream,
+        gemini_infer_stream,
+        fireworks_infer_stream,
     ],
 )
 def test_all_apis(infer_func):
@@ -46,6 +72,66 @@ def test_all_apis(infer_func):
         pytest.fail(f"API {infer_func.__name__} failed with error: {str(e)}")
 
 
+@pytest.mark.parametrize(
+    "infer_func",
+    [
+        claude_infer_async,
+        openai_infer_async,
+        gemini_infer_async,
+        fireworks_infer_async,
+    ],
+)
+def test_all_async_apis(infer_func):
+    prompts = [f"This is a test no. {i}. Write just `hello` and nothing else." for i in range(3)]
+    try:
+        responses = run_inference_async(prompts, infer_func, max_tokens=TEST_MAX_TOKENS)
+
+        assert len(responses) == len(prompts)
+        for response in responses:
+            assert isinstance(response, str)
+            assert "hello" in response, "Response should contain 'hello'"
+    except Exception as e:
+        pytest.fail(f"API {infer_func.__name__} failed with error: {str(e)}")
+
+
+@pytest.mark.parametrize(
+    "infer_func",
+    [
+        claude_infer,
+        partial(openai_infer, mini=True),
+        gemini_infer,
+        fireworks_infer,
+    ],
+)
+def test_all_apis_json_mode(infer_func):
+    prompt = 'This is a test. Return the JSON list ["hello"] and nothing else.'
+    try:
+        response = infer_func(prompt, max_tokens=TEST_MAX_TOKENS, json_mode=True)
+
+        assert json.loads(response) == ["hello"], "Response should be the JSON list"
+    except Exception as e:
+        pytest.fail(f"API {infer_func} failed with error: {str(e)}")
+
+
+@pytest.mark.parametrize(
+    "complete_func",
+    [
+        claude_complete,
+        openai_complete,
+        gemini_complete,
+        fireworks_complete,
+    ],
+)
+def test_all_apis_truncation(complete_func):
+    prompt = "Count from 1 to 1000, separating the numbers by commas."
+    try:
+        completion = complete_func(prompt, max_tokens=10)
+
+        assert completion.truncated, "A 10-token answer should be reported as truncated"
+    except Exception as e:
+        pytest.fail(f"API {complete_func.__name__} failed with error: {str(e)}")
+
+
 @pytest.mark.parametrize(
     "env_var",
     [
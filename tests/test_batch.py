@@ -0,0 +1,81 @@
+import json
+
+from src.apis.batch import BatchJobStore, chunk_requests, run_inference_batch
+
+
+class LocalBatchBackend:
+    """Local stand-in for a provider batch endpoint.
+
+    Jobs complete after `polls_until_done` status checks. Prompts listed in `flaky`
+    return invalid JSON the first time they are processed.
+    """
+
+    name = "local"
+    max_requests = 2
+    max_bytes = 10_000_000
+
+    def __init__(self, polls_until_done: int = 1, flaky: set[str] | None = None):
+        self.polls_until_done = polls_until_done
+        self.flaky = set(flaky or ())
+        self.jobs: dict[str, list[tuple[str, str]]] = {}
+        self.polls: dict[str, int] = {}
+
+    def submit(self, requests):
+        job_id = f"job-{len(self.jobs)}"
+        self.jobs[job_id] = list(requests)
+        self.polls[job_id] = 0
+        return job_id
+
+    def is_done(self, job_id):
+        self.polls[job_id] += 1
+        return self.polls[job_id] >= self.polls_until_done
+
+    def results(self, job_id):
+        out = {}
+        for custom_id, text in self.jobs[job_id]:
+            if text in self.flaky:
+                self.flaky.discard(text)
+                out[custom_id] = '["unterminated'
+            else:
+                out[custom_id] = json.dumps([text.upper()])
+        return out
+
+
+def test_chunk_requests_respects_limits():
+    requests = [(str(i), "x" * 10) for i in range(5)]
+    assert [len(c) for c in chunk_requests(requests, max_requests=2, max_bytes=10**6)] == [2, 2, 1]
+    assert [len(c) for c in chunk_requests(requests, max_requests=10, max_bytes=2100)] == [2, 2, 1]
+
+
+def test_results_in_input_order(tmp_path):
+    backend = LocalBatchBackend(polls_until_done=3)
+    texts = ["a", "b", "c", "d", "e"]
+
+    results = run_inference_batch(texts, backend, poll_interval=0, job_dir=tmp_path)
+
+    assert results == [json.dumps([t.upper()]) for t in texts]
+    assert len(backend.jobs) == 3
+
+
+def test_invalid_items_are_resubmitted(tmp_path):
+    backend = LocalBatchBackend(flaky={"b", "d"})
+    texts = ["a", "b", "c", "d"]
+
+    results = run_inference_batch(texts, backend, poll_interval=0, job_dir=tmp_path)
+
+    assert results == [json.dumps([t.upper()]) for t in texts]
+    resubmitted = [text for job in list(backend.jobs.values())[2:] for _, text in job]
+    assert resubmitted == ["b", "d"]
+
+
+def test_run_resumes_from_persisted_jobs(tmp_path):
+    backend = LocalBatchBackend()
+    texts = ["a", "b", "c"]
+    run_inference_batch(texts, backend, poll_interval=0, job_dir=tmp_path, run_id="run")
+
+    store = BatchJobStore.load(tmp_path / "run.json")
+    assert [job.job_id for job in store.jobs] == ["job-0", "job-1"]
+
+    results = run_inference_batch(texts, backend, poll_interval=0, job_dir=tmp_path, run_id="run")
+    assert results == [json.dumps([t.upper()]) for t in texts]
+    assert len(backend.jobs) == 2, "Resumed run should not submit new jobs"
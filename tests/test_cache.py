@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from src.apis.cache import InferenceCache, make_cache_key
+from src.apis.common import run_inference_parallel, run_inference_parallel_with_retry
+
+
+def fake_infer(text: str, *, model: str = "fake-1", temperature: float = 1.0, api_key=None):
+    return f'["{text}"]'
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = InferenceCache(tmp_path / "cache.sqlite")
+    yield cache
+    cache.close()
+
+
+def test_cache_key_depends_on_params():
+    base = make_cache_key("text", fake_infer)
+    assert base == make_cache_key("text", fake_infer, model="fake-1")
+    assert base == make_cache_key("text", fake_infer, api_key="secret")
+    assert base != make_cache_key("other", fake_infer)
+    assert base != make_cache_key("text", fake_infer, model="fake-2")
+    assert base != make_cache_key("text", fake_infer, temperature=0.5)
+
+
+def test_get_put_and_counters(cache):
+    assert cache.get("key") is None
+    cache.put("key", "[]")
+    assert cache.get("key") == "[]"
+    assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+
+def test_bypass_skips_lookups(tmp_path):
+    cache = InferenceCache(tmp_path / "cache.sqlite", bypass=True)
+    cache.put("key", "[]")
+    assert cache.get("key") is None
+    assert len(cache) == 1
+
+
+def test_age_eviction(tmp_path):
+    cache = InferenceCache(tmp_path / "cache.sqlite", max_age=0.01)
+    cache.put("key", "[]")
+    time.sleep(0.02)
+    assert cache.get("key") is None
+    assert len(cache) == 0
+
+
+def test_size_eviction_drops_least_recently_used(tmp_path):
+    cache = InferenceCache(tmp_path / "cache.sqlite", max_bytes=10)
+    cache.put("a", "12345")
+    time.sleep(0.01)
+    cache.put("b", "12345")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.put("c", "12345")
+    assert cache.get("a") == "12345"
+    assert cache.get("b") is None
+    assert cache.get("c") == "12345"
+
+
+def test_run_inference_parallel_uses_cache(cache):
+    calls = []
+
+    def counting_infer(text: str, **kwargs):
+        calls.append(text)
+        return fake_infer(text, **kwargs)
+
+    texts = ["a", "b", "c"]
+    first = run_inference_parallel(texts, counting_infer, cache=cache)
+    second = run_inference_parallel(texts + ["d"], counting_infer, cache=cache)
+
+    assert first == ['["a"]', '["b"]', '["c"]']
+    assert second == first + ['["d"]']
+    assert sorted(calls) == ["a", "b", "c", "d"]
+
+
+def test_invalid_results_are_not_cached(cache):
+    def broken_infer(text: str):
+        return "[not json"
+
+    run_inference_parallel_with_retry(["a"], broken_infer, retries=1, cache=cache)
+    assert len(cache) == 0
@@ -0,0 +1,57 @@
+import json
+
+from src.cascade import CascadeTier, run_cascade, validate_output
+
+OPINIONS = [
+    "Podle § 2910 o. z. odpovídá škůdce za škodu.",
+    "Podle § 1746 odst. 2 o. z. a § 2055 o. z. je smlouva platná.",
+    "Soud se zabýval výkladem § 580 zákona č. 89/2012 Sb.",
+]
+
+
+def test_validate_output():
+    opinion = OPINIONS[1]
+    good = json.dumps(["§ 1746 odst. 2 o. z.", "§ 2055 o. z."], ensure_ascii=False)
+    assert validate_output(good, opinion) is None
+    assert validate_output("[", opinion) == "invalid_json"
+    assert validate_output('["§ 1746 odst. 2 o. z."]', opinion) == "parser_mismatch"
+    assert validate_output(good, opinion, annotated=[1746, 2055]) is None
+    assert validate_output(good, opinion + " § 3 o. z.", annotated=[3]) is not None
+
+
+def test_run_cascade_escalates_failures():
+    def cheap(text: str, **kwargs) -> str:
+        # Misses the second section of the longer opinion
+        if "§ 2055" in text:
+            return '["§ 1746 odst. 2 o. z."]'
+        if "§ 580" in text:
+            return "not json"
+        return '["§ 2910 o. z."]'
+
+    def strong(text: str, **kwargs) -> str:
+        if "§ 580" in text:
+            return '["§ 580 zákona č. 89/2012 Sb."]'
+        return '["§ 1746 odst. 2 o. z.", "§ 2055 o. z."]'
+
+    tiers = [
+        CascadeTier("cheap", cheap, "gemini-2.0-flash", "gemini"),
+        CascadeTier("strong", strong, "claude-3-7-sonnet-20250219", "claude"),
+    ]
+    result = run_cascade(OPINIONS, tiers, retries=0)
+
+    assert result.tiers == ["cheap", "strong", "strong"]
+    assert [r.resolved for r in result.report] == [1, 2]
+    assert result.report[0].failures == {"parser_mismatch": 1, "invalid_json": 1}
+    assert result.report[1].submitted == 2
+    assert 0 < result.cost < result.baseline_cost
+    assert "Unresolved documents: 0" in result.summary()
+
+
+def test_run_cascade_unresolved_keeps_last_output():
+    def lazy(text: str, **kwargs) -> str:
+        return "[]"
+
+    tiers = [CascadeTier("lazy", lazy, "gemini-2.0-flash", "gemini")]
+    result = run_cascade(OPINIONS[:1], tiers, retries=0)
+    assert result.tiers == [None]
+    assert result.results == ["[]"]
@@ -0,0 +1,67 @@
+import itertools
+import json
+
+from src.chunking import merge_reference_lists, run_chunked_extraction, split_into_chunks
+from src.token_count import count_tokens, get_token_counter
+
+PARAGRAPHS = [f"Odstavec {i}. " + "Soud věc posoudil. " * 20 for i in range(30)]
+OPINION = "\n\n".join(PARAGRAPHS)
+
+
+def test_split_into_chunks_is_bounded_and_overlapping():
+    chunks = split_into_chunks(OPINION, max_tokens=400, overlap_tokens=150)
+    assert len(chunks) > 1
+    assert all(count_tokens(c, "gemini") <= 400 for c in chunks)
+    for previous, current in itertools.pairwise(chunks):
+        assert current.split("\n\n")[0] in previous
+    assert all(p.strip() in "\n\n".join(chunks) for p in PARAGRAPHS)
+
+
+def test_split_into_chunks_short_text():
+    assert split_into_chunks("Krátké rozhodnutí.") == ["Krátké rozhodnutí."]
+
+
+def test_split_into_chunks_oversized_paragraph():
+    chunks = split_into_chunks("x" * 10_000, max_tokens=500, overlap_tokens=0)
+    assert "".join(chunks) == "x" * 10_000
+    assert all(count_tokens(c, "gemini") <= 500 for c in chunks)
+
+
+def test_split_oversized_paragraph_is_linear(monkeypatch):
+    text = " ".join(f"Věta číslo {i} o skutkovém stavu." for i in range(2000))
+    counter = get_token_counter("gemini")
+    counted = []
+    count = counter._count
+    monkeypatch.setattr(counter, "_count", lambda t: counted.append(len(t)) or count(t))
+    chunks = split_into_chunks(text, max_tokens=500, overlap_tokens=0)
+    assert all(count_tokens(c, "gemini") <= 500 for c in chunks)
+    assert " ".join(chunks) == text
+    assert sum(counted) < 4 * len(text)
+
+
+def test_merge_reference_lists():
+    merged = merge_reference_lists([["§ 1 o. z.", "§ 2 o. z."], ["§  1 o. z.", "§ 3 o. z."]])
+    assert merged == ["§ 1 o. z.", "§ 2 o. z.", "§ 3 o. z."]
+
+
+def test_run_chunked_extraction():
+    def fake_infer(text: str, **kwargs) -> str:
+        found = [f"Odstavec {i}" for i in range(30) if f"Odstavec {i}." in text]
+        return json.dumps(found)
+
+    results = run_chunked_extraction(
+        [OPINION, "Odstavec 7. Krátké."], fake_infer, max_chunk_tokens=400, overlap_tokens=150
+    )
+    assert json.loads(results[0]) == [f"Odstavec {i}" for i in range(30)]
+    assert json.loads(results[1]) == ["Odstavec 7"]
+    assert run_chunked_extraction(["", " \n "], fake_infer) == ["[]", "[]"]
+
+
+def test_run_chunked_extraction_failed_chunk():
+    def fake_infer(text: str, **kwargs) -> str:
+        return "[" if "Odstavec 29." in text else "[]"
+
+    results = run_chunked_extraction(
+        [OPINION], fake_infer, max_chunk_tokens=400, overlap_tokens=0, retries=0
+    )
+    assert results == [None]
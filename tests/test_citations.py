@@ -0,0 +1,53 @@
+import pytest
+
+from src.citations import CIVIL_CODE, extract_civil_code_sections, parse_citations
+
+
+@pytest.mark.parametrize(
+    "text,expected",
+    [
+        ("Podle § 153a odst. 3 o. s. ř.", ["§ 153a odst. 3 99/1963 Sb."]),
+        ("dle § 2959 zákona č. 89/2012 Sb., občanský zákoník", ["§ 2959 89/2012 Sb."]),
+        ("§ 17 a § 2000 odst. 1 o. z.", ["§ 17 89/2012 Sb.", "§ 2000 odst. 1 89/2012 Sb."]),
+        ("srov. § 1991 a násl. o. z.", ["§ 1991 a násl. 89/2012 Sb."]),
+        ("§ 3028 odst. 3 věta první o.z.", ["§ 3028 odst. 3 89/2012 Sb."]),
+        ("§ 1885 (o. z.)", ["§ 1885 89/2012 Sb."]),
+        ("(§ 1555 o. z.)", ["§ 1555 89/2012 Sb."]),
+        ("§ 1 odst. 1 písm. a) a b) NOZ", ["§ 1 odst. 1 písm. a) a b) 89/2012 Sb."]),
+        ("§ 580 a § 588 obč. zák.", ["§ 580 40/1964 Sb.", "§ 588 40/1964 Sb."]),
+        ("čl. 36 odst. 1 Listiny", ["čl. 36 odst. 1 2/1993 Sb."]),
+        ("§ 12 zákona o obchodních korporacích", ["§ 12 zákona o obchodních korporacích"]),
+        ("ustanovení § 2 bez uvedení předpisu", ["§ 2"]),
+    ],
+)
+def test_parse_citations(text, expected):
+    assert [c.label for c in parse_citations(text).citations] == expected
+
+
+def test_ranges_are_expanded():
+    result = parse_citations("§ 2910 až 2913 občanského zákoníku")
+    assert result.sections() == [2910, 2911, 2912, 2913]
+
+
+def test_same_act_refers_to_previous_act():
+    result = parse_citations("§ 237 o. s. ř. a dále § 241a odst. 1 téhož zákona")
+    assert [c.act for c in result.citations] == ["99/1963 Sb.", "99/1963 Sb."]
+
+
+def test_hard_spaces():
+    assert parse_citations("§\xa02910 o.\xa0z.").sections() == [2910]
+
+
+def test_extract_civil_code_sections_and_confidence():
+    text = "Podle § 2910 o. z. a § 243c o. s. ř. a opět § 2910 a § 2951 o. z."
+    assert extract_civil_code_sections(text) == ([2910, 2951], True)
+
+    sections, confident = extract_civil_code_sections("§ 2910 o. z. a také § 2913.")
+    assert sections == [2910]
+    assert not confident
+
+
+def test_sections_of_other_acts():
+    result = parse_citations("§ 2910 o. z. a § 243c o. s. ř.")
+    assert result.sections(CIVIL_CODE) == [2910]
+    assert result.sections("99/1963 Sb.") == [243]
@@ -0,0 +1,37 @@
+import threading
+import time
+
+from src.apis.common import iter_inference_parallel, run_inference_parallel
+
+
+def echo_infer(text: str, delay: float = 0.0) -> str:
+    time.sleep(delay)
+    return f'["{text}"]'
+
+
+def test_run_inference_parallel_preserves_order():
+    texts = [str(i) for i in range(30)]
+    assert run_inference_parallel(texts, echo_infer, delay=0.001) == [f'["{t}"]' for t in texts]
+
+
+def test_iter_inference_parallel_bounds_in_flight_texts():
+    pulled = 0
+    in_flight_max = 0
+    lock = threading.Lock()
+    yielded = 0
+
+    def lazy_texts():
+        nonlocal pulled, in_flight_max
+        for i in range(100):
+            with lock:
+                pulled += 1
+                in_flight_max = max(in_flight_max, pulled - yielded)
+            yield str(i)
+
+    results = {}
+    for idx, result in iter_inference_parallel(lazy_texts(), echo_infer, max_workers=4):
+        yielded += 1
+        results[idx] = result
+
+    assert results == {i: f'["{i}"]' for i in range(100)}
+    assert in_flight_max <= 2 * 4 + 1
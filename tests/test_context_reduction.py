@@ -0,0 +1,48 @@
+from src.context_reduction import (
+    GAP_MARKER,
+    citation_spans,
+    reduce_opinion,
+    render_reduced_template,
+    strip_boilerplate,
+)
+
+FILLER = "Soud se věcí zabýval a dospěl k závěru, že dovolání není důvodné. " * 30
+OPINION = (
+    "Nejvyšší soud rozhodl v senátu ve věci žalobce A. proti žalovanému B. takto:\n"
+    "I. Dovolání se odmítá.\n\nOdůvodnění:\n"
+    + FILLER
+    + "Podle § 2910 o. z. odpovídá škůdce za škodu. "
+    + FILLER
+    + "Srov. § 243c odst. 3 o. s. ř. "
+    + FILLER
+    + "\nPoučení: Proti tomuto usnesení není opravný prostředek přípustný.\n\n"
+    + "V Brně dne 1. 2. 2024\n\nJUDr. Jan Novák\npředseda senátu"
+)
+
+
+def test_strip_boilerplate():
+    body = strip_boilerplate(OPINION)
+    assert body.startswith("I. Dovolání se odmítá.")
+    assert "Poučení" not in body
+    assert "předseda senátu" not in body
+
+
+def test_citation_spans_are_merged():
+    text = "a " * 100 + "§ 1 o. z. a § 2 o. z." + " b" * 100
+    assert len(citation_spans(text, before=20, after=20)) == 1
+
+
+def test_reduce_opinion_keeps_citations():
+    reduced = reduce_opinion(OPINION, before=100, after=50)
+    assert "§ 2910 o. z." in reduced.text
+    assert "§ 243c odst. 3 o. s. ř." in reduced.text
+    assert reduced.spans == 2
+    assert reduced.text.count(GAP_MARKER) == 1
+    assert reduced.ratio < 0.2
+
+
+def test_render_reduced_template():
+    prompts, reduced = render_reduced_template("extract_acts_03.jinja2", [OPINION])
+    assert len(prompts) == len(reduced) == 1
+    assert reduced[0].text in prompts[0]
+    assert "Poučení" not in prompts[0].split("<court_opinion>")[1]
@@ -0,0 +1,63 @@
+import json
+
+from src.apis.common import is_invalid_json
+from src.apis.completion import Completion
+from src.continuation import complete_with_continuation, with_continuation
+from src.filter_references import process_raw_result
+
+REFERENCES = [f"§ {i} o. z." for i in range(1, 10)]
+FULL = json.dumps(REFERENCES, ensure_ascii=False)
+
+
+def test_not_truncated_is_returned_as_is():
+    def complete(text: str, **kwargs) -> Completion:
+        return Completion(FULL, "end_turn")
+
+    assert complete_with_continuation(complete, "prompt") == FULL
+
+
+def test_prefill_continuation():
+    prefills = []
+
+    def complete(text: str, prefill: str | None = None, max_tokens: int = 30) -> Completion:
+        start = len(prefill) if prefill else 0
+        prefills.append(prefill)
+        piece = FULL[start : start + max_tokens]
+        truncated = start + max_tokens < len(FULL)
+        return Completion(piece, "max_tokens" if truncated else "end_turn", prefill)
+
+    infer = with_continuation(complete, max_continuations=5, prefill=True)
+    assert json.loads(infer("prompt")) == REFERENCES
+    assert len(prefills) > 2
+    assert all(p is None or FULL.startswith(p) for p in prefills)
+
+
+def test_follow_up_continuation():
+    prompts = []
+
+    def complete(text: str, **kwargs) -> Completion:
+        prompts.append(text)
+        if len(prompts) == 1:
+            return Completion('["§ 1 o. z.", "§ 2 o. z.", "§ 3 o', "length")
+        return Completion('["§ 2 o. z.", "§ 3 o. z.", "§ 4 o. z."]', "stop")
+
+    result = complete_with_continuation(complete, "Extract references.")
+    assert json.loads(result) == ["§ 1 o. z.", "§ 2 o. z.", "§ 3 o. z.", "§ 4 o. z."]
+    assert prompts[1].startswith("Extract references.")
+    assert '"§ 2 o. z."' in prompts[1]
+
+
+def test_continuations_run_out():
+    def complete(text: str, **kwargs) -> Completion:
+        return Completion('["§ 1 o. z.", "§ 2 o', "length")
+
+    for prefill in (False, True):
+        result = complete_with_continuation(complete, "prompt", 2, prefill=prefill)
+        assert is_invalid_json(result)
+        assert process_raw_result(result) == [1]
+
+
+def test_completion_truncated():
+    assert Completion("x", "MAX_TOKENS").truncated
+    assert not Completion("x", "STOP").truncated
+    assert Completion("]", "end_turn", prefill="[").full_text == "[]"
@@ -0,0 +1,88 @@
+import math
+
+import pandas as pd
+
+from src.apis.telemetry import InferenceRecord
+from src.evaluation import evaluate_sections, length_buckets, quality_summary, request_metrics
+from src.filter_references import missing_sections
+from src.token_count import text_hash
+
+
+def test_evaluate_sections_counts():
+    annotated = [[1, 2, 3], [5], None, [7, 7]]
+    inferred = [[1, 2, 9], None, [4], [7]]
+    result = evaluate_sections(annotated, inferred)
+    counts = result[["tp", "fp", "fn"]].values.tolist()
+    assert counts == [[2, 1, 1], [0, 0, 1], [0, 1, 0], [1, 0, 0]]
+    assert result.precision[0] == 2 / 3
+    assert result.recall[1] == 0
+    assert math.isnan(result.recall[2])
+    assert result.complete.tolist() == [False, False, True, True]
+
+
+def test_evaluate_sections_matches_missing_sections():
+    annotated = [[2, 55, 123], [10, 11]]
+    inferred = [[2], [10]]
+    texts = ["podle § 2 a § 123 o. z.", "§ 10"]
+    result = evaluate_sections(annotated, inferred, texts)
+    assert result.fn.tolist() == [1, 0]
+    pairs = zip(annotated, inferred, texts, strict=True)
+    expected = [not missing_sections(a, i, t) for a, i, t in pairs]
+    assert result.complete.tolist() == expected
+
+
+def test_quality_summary_is_micro_averaged():
+    per_doc = evaluate_sections([[1, 2], [3], [4]], [[1, 2], [], [4, 5]])
+    per_doc["court"] = ["a", "a", "b"]
+    overall = quality_summary(per_doc)
+    assert overall.loc["all", "tp"] == 3
+    assert overall.loc["all", "precision"] == 3 / 4
+    assert overall.loc["all", "recall"] == 3 / 4
+    by_court = quality_summary(per_doc, by="court")
+    assert by_court.loc["a", "recall"] == 2 / 3
+    assert by_court.loc["b", "complete_rate"] == 1.0
+
+
+def test_length_buckets():
+    buckets = length_buckets(["x" * 100, "x" * 10_000, None])
+    assert buckets.tolist() == ["<5k", "5k-15k", "<5k"]
+
+
+def _record(prompt: str, latency: float, **kwargs) -> InferenceRecord:
+    return InferenceRecord(
+        "gemini", "gemini-2.0-flash", text_hash(prompt), 0.0, latency=latency, **kwargs
+    )
+
+
+def test_request_metrics_joins_telemetry():
+    prompts = ["prompt a", "prompt b"]
+    records = [
+        _record("prompt a", 1.0, input_tokens=1_000_000, output_tokens=0, outcome="error"),
+        _record("prompt a", 2.0, input_tokens=1_000_000, output_tokens=1_000_000, attempt=2),
+        _record("other", 5.0),
+    ]
+    metrics = request_metrics(records, prompts)
+    assert len(metrics) == 1
+    row = metrics.iloc[0]
+    assert (row.document, row.calls, row.errors, row.latency) == (0, 2, 1, 3.0)
+    assert math.isclose(row.cost_usd, 0.10 + 0.10 + 0.40)
+
+    per_doc = evaluate_sections([[1], [2]], [[1], [2]]).merge(metrics, on="document")
+    summary = quality_summary(per_doc, by="model")
+    assert summary.loc["gemini-2.0-flash", "mean_latency"] == 3.0
+    assert summary.loc["gemini-2.0-flash", "f1_per_second"] == 1 / 3
+    assert request_metrics(pd.DataFrame(), prompts).empty
+
+
+def test_request_metrics_per_document():
+    records = [
+        _record("prompt a", 1.0, input_tokens=1_000_000, output_tokens=0),
+        InferenceRecord("claude", "claude-3-5-haiku", text_hash("prompt a"), 0.0, latency=2.0),
+    ]
+    assert len(request_metrics(records, ["prompt a"])) == 2
+
+    metrics = request_metrics(records, ["prompt a"], per_model=False)
+    assert metrics.model.tolist() == ["claude-3-5-haiku+gemini-2.0-flash"]
+    assert (metrics.calls[0], metrics.latency[0]) == (2, 3.0)
+    per_doc = evaluate_sections([[1]], [[1]]).merge(metrics, on="document", how="left")
+    assert quality_summary(per_doc).loc["all", "documents"] == 1
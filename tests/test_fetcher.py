@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.apis.retry import RetryPolicy
+from src.fetcher import HostLimit, HttpCache, fetch_all
+
+
+class _Site:
+    """Local test site: `/page` supports ETags, `/flaky` fails twice, `/slow` takes 0.1 s."""
+
+    def __init__(self):
+        self.url = ""
+        self.hits: Counter = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+
+@pytest.fixture
+def site():
+    state = _Site()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _reply(self, status: int, body: str = "", headers=None):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_GET(self):
+            with state.lock:
+                state.hits[self.path] += 1
+                hits = state.hits[self.path]
+                state.in_flight += 1
+                state.max_in_flight = max(state.max_in_flight, state.in_flight)
+            try:
+                if self.path == "/page":
+                    if self.headers.get("If-None-Match") == '"v1"':
+                        self._reply(304)
+                    else:
+                        self._reply(200, "rozhodnutí", {"ETag": '"v1"'})
+                elif self.path == "/flaky":
+                    if hits <= 2:
+                        self._reply(503, headers={"Retry-After": "0"})
+                    else:
+                        self._reply(200, "ok")
+                elif self.path.startswith("/slow"):
+                    time.sleep(0.1)
+                    self._reply(200, "slow")
+                else:
+                    self._reply(404)
+            finally:
+                with state.lock:
+                    state.in_flight -= 1
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    state.url = f"http://127.0.0.1:{server.server_address[1]}"
+    yield state
+    server.shutdown()
+    server.server_close()
+
+
+def test_conditional_requests(site, tmp_path):
+    cache = HttpCache(tmp_path / "http_cache.sqlite")
+    (first,) = fetch_all([f"{site.url}/page"], progress=False, cache=cache)
+    assert (first.status, first.text, first.from_cache) == (200, "rozhodnutí", False)
+    assert len(cache) == 1
+
+    (second,) = fetch_all([f"{site.url}/page"], progress=False, cache=cache)
+    assert (second.status, second.text, second.from_cache) == (304, "rozhodnutí", True)
+    assert site.hits["/page"] == 2
+
+
+def test_retries_and_permanent_errors(site):
+    policy = RetryPolicy(max_attempts=3, base_delay=0.01)
+    flaky, missing = fetch_all(
+        [f"{site.url}/flaky", f"{site.url}/missing"], progress=False, retry_policy=policy
+    )
+    assert flaky.ok and flaky.text == "ok"
+    assert site.hits["/flaky"] == 3
+    assert not missing.ok and missing.status == 404
+    assert site.hits["/missing"] == 1
+
+
+def test_host_limits(site):
+    urls = [f"{site.url}/slow?{i}" for i in range(8)]
+    limit = HostLimit(max_concurrency=2, min_interval=0.0)
+    results = fetch_all(urls, progress=False, default_limit=limit)
+    assert all(r.ok for r in results)
+    assert site.max_in_flight == 2
+
+    spacing = HostLimit(max_concurrency=8, min_interval=0.05)
+    start = time.monotonic()
+    fetch_all(urls, progress=False, default_limit=spacing)
+    # 8 starts spaced by 0.05 s
+    assert time.monotonic() - start >= 0.35
@@ -0,0 +1,70 @@
+from src.apis.cache import make_cache_key
+from src.apis.common import run_inference_parallel_with_retry
+from src.apis.journal import RunJournal
+
+
+def test_journal_keeps_latest_valid_result(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    with RunJournal(path) as journal:
+        journal.record("a", "[1]")
+        journal.record("b", "[broken")
+        journal.record("a", "[2]")
+        journal.record("a", None)
+
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"id": "c", "resu')  # line cut short by a crash
+
+    with RunJournal(path) as journal:
+        assert journal.completed() == {"a": "[2]"}
+        journal.record("c", "[3]")
+    assert RunJournal(path).completed() == {"a": "[2]", "c": "[3]"}
+    assert RunJournal(path, resume=False).completed() == {}
+
+
+def test_resume_only_requests_missing_documents(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    calls = []
+
+    def fake_infer(text: str) -> str:
+        calls.append(text)
+        return f'["{text}"]'
+
+    with RunJournal(path) as journal:
+        journal.record("doc-1", '["one"]', make_cache_key("one", fake_infer))
+
+    with RunJournal(path) as journal:
+        results = run_inference_parallel_with_retry(
+            ["one", "two", "three"], fake_infer, journal=journal, ids=["doc-1", "doc-2", "doc-3"]
+        )
+
+    assert results == ['["one"]', '["two"]', '["three"]']
+    assert sorted(calls) == ["three", "two"]
+    assert RunJournal(path).completed().keys() == {"doc-1", "doc-2", "doc-3"}
+
+
+def test_resume_skips_results_of_a_different_prompt(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    calls = []
+
+    def fake_infer(text: str, temperature: float = 0.0) -> str:
+        calls.append(text)
+        return f'["{text}"]'
+
+    with RunJournal(path) as journal:
+        run_inference_parallel_with_retry(["one"], fake_infer, journal=journal, ids=["doc-1"])
+        run_inference_parallel_with_retry(["one"], fake_infer, journal=journal, ids=["doc-1"])
+        assert calls == ["one"]
+
+        run_inference_parallel_with_retry(["uno"], fake_infer, journal=journal, ids=["doc-1"])
+        run_inference_parallel_with_retry(
+            ["uno"], fake_infer, journal=journal, ids=["doc-1"], temperature=0.5
+        )
+    assert calls == ["one", "uno", "uno"]
+
+
+def test_journal_restores_tuple_ids(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    with RunJournal(path) as journal:
+        journal.record(("doc", 0), "[1]")
+        journal.record(("doc", (1, 2)), "[2]")
+    assert RunJournal(path).completed() == {("doc", 0): "[1]", ("doc", (1, 2)): "[2]"}
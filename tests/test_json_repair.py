@@ -0,0 +1,79 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from src.apis import anthropic
+from src.apis.anthropic import JSON_PREFILL, claude_infer_async, claude_messages
+from src.apis.json_repair import repair_json_list, unwrap_references
+from src.apis.retry import RetryPolicy, with_retry
+from src.filter_references import process_raw_result
+
+
+def test_repair_valid_and_wrapped():
+    assert repair_json_list('["§ 1 o. z."]') == '["§ 1 o. z."]'
+    assert repair_json_list('{"references": ["§ 1 o. z."]}') == '["§ 1 o. z."]'
+
+
+def test_repair_prose_and_trailing_comma():
+    raw = 'Here is the list:\n```json\n["§ 1 o. z.", "§ 2 o. z.",\n]\n```\nDone.'
+    assert json.loads(repair_json_list(raw)) == ["§ 1 o. z.", "§ 2 o. z."]
+
+
+def test_repair_truncated_with_duplicated_tail():
+    raw = '["§ 1 o. z.", "§ 2 o. z.", "§ 1 o. z.", "§ 2 o. z.", "§ 1 o'
+    assert json.loads(repair_json_list(raw)) == ["§ 1 o. z.", "§ 2 o. z."]
+
+
+def test_repair_gives_up():
+    assert repair_json_list(None) is None
+    assert repair_json_list("I cannot help with that.") is None
+    assert repair_json_list('["§ 1 o') is None
+
+
+def test_unwrap_references():
+    assert unwrap_references('{"references": ["a"]}') == '["a"]'
+    assert unwrap_references("broken") == "broken"
+    assert unwrap_references(None) is None
+
+
+def test_retry_repairs_before_retrying():
+    calls = []
+
+    def fenced(text: str, **kwargs) -> str:
+        calls.append(text)
+        return '```json\n["§ 1 o. z.", "§ 2 o. z.",]\n```'
+
+    infer = with_retry(fenced, RetryPolicy(max_attempts=3, base_delay=0))
+    assert infer("prompt") == '["§ 1 o. z.", "§ 2 o. z."]'
+    assert len(calls) == 1
+
+    infer = with_retry(fenced, RetryPolicy(max_attempts=2, base_delay=0, repair_json=False))
+    assert infer("prompt") == fenced("prompt")
+    assert len(calls) == 4
+
+
+def test_retry_does_not_close_truncated_output():
+    outputs = iter(['["§ 1 o. z.", "§ 2 o', '["§ 1 o. z.", "§ 2 o. z."]'])
+    infer = with_retry(lambda text, **kwargs: next(outputs), RetryPolicy(base_delay=0))
+    assert infer("prompt") == '["§ 1 o. z.", "§ 2 o. z."]'
+    assert repair_json_list('["§ 1 o. z.", "§ 2 o', close_truncated=False) is None
+
+
+def test_process_raw_result_repairs():
+    assert sorted(process_raw_result('["§ 2910 o. z.", "§ 2951 o. z.",]')) == [2910, 2951]
+
+
+def test_claude_json_prefill():
+    messages = claude_messages("Prompt", JSON_PREFILL)
+    assert messages[-1] == {"role": "assistant", "content": "["}
+
+
+def test_claude_async_empty_content(monkeypatch):
+    async def create(**kwargs):
+        usage = SimpleNamespace(input_tokens=10, output_tokens=0)
+        return SimpleNamespace(content=[], usage=usage, stop_reason="end_turn")
+
+    client = SimpleNamespace(messages=SimpleNamespace(create=create))
+    monkeypatch.setattr(anthropic, "get_claude_async_client", lambda api_key: client)
+    assert asyncio.run(claude_infer_async("Prompt", api_key="key")) == ""
+    assert asyncio.run(claude_infer_async("Prompt", json_mode=True, api_key="key")) == "["
@@ -0,0 +1,96 @@
+import json
+import time
+
+import pytest
+import requests
+
+from src.apis.common import is_invalid_json, run_inference_parallel_with_retry
+from src.apis.fireworks import fireworks_complete, fireworks_infer, fireworks_infer_stream
+from src.apis.mock_server import MockBehavior, MockLLMServer
+from src.apis.retry import RetryPolicy
+
+
+@pytest.fixture
+def mock_server(monkeypatch, request):
+    behavior = getattr(request, "param", None) or MockBehavior(latency=0.01, seed=0)
+    with MockLLMServer(behavior) as server:
+        for name, value in server.environ().items():
+            monkeypatch.setenv(name, value)
+        yield server
+
+
+def test_fireworks_against_mock(mock_server):
+    result = fireworks_infer("Opinion text", json_mode=True)
+    assert json.loads(result) == [f"§ {100 + i} o. z." for i in range(5)]
+    assert fireworks_infer_stream("Opinion text") == result
+    assert mock_server.counts["requests"] == 2
+
+
+@pytest.mark.parametrize(
+    "mock_server",
+    [MockBehavior(latency=0.01, error_rate=0.3, retry_after=0.01, seed=1)],
+    indirect=True,
+)
+def test_injected_errors_are_retried(mock_server):
+    policy = RetryPolicy(max_attempts=10, base_delay=0.01)
+    results = run_inference_parallel_with_retry(
+        [f"Opinion {i}" for i in range(30)], fireworks_infer, max_workers=8, retry_policy=policy
+    )
+    assert not any(is_invalid_json(r) for r in results)
+    assert mock_server.counts["errors"] > 0
+    assert mock_server.counts["requests"] == 30 + mock_server.counts["errors"]
+
+
+@pytest.mark.parametrize(
+    "mock_server", [MockBehavior(latency=0.0, truncation_rate=1.0, seed=0)], indirect=True
+)
+def test_injected_truncation(mock_server):
+    completion = fireworks_complete("Opinion text")
+    assert completion.truncated
+    assert is_invalid_json(completion.text)
+
+
+@pytest.mark.parametrize(
+    "mock_server", [MockBehavior(latency=0.0, malformed_rate=1.0, seed=0)], indirect=True
+)
+def test_injected_malformed_output(mock_server):
+    assert is_invalid_json(fireworks_infer("Opinion text"))
+    assert mock_server.counts["malformed"] == 1
+
+
+@pytest.mark.parametrize("mock_server", [MockBehavior(latency=0.2)], indirect=True)
+def test_parallel_requests_overlap(mock_server):
+    start = time.monotonic()
+    run_inference_parallel_with_retry(
+        [f"Opinion {i}" for i in range(16)], fireworks_infer, max_workers=16
+    )
+    # Sequentially this would take 3.2 s
+    assert time.monotonic() - start < 1.5
+
+
+def test_openai_against_mock(mock_server):
+    pytest.importorskip("openai")
+    from src.apis.openai import openai_infer
+
+    # A new key per test, as the SDK clients are cached per key
+    result = openai_infer("Opinion text", mini=True, json_mode=True, api_key=mock_server.url)
+    assert json.loads(result) == [f"§ {100 + i} o. z." for i in range(5)]
+
+
+def test_anthropic_and_gemini_shapes(mock_server):
+    messages = [{"role": "user", "content": "Opinion"}, {"role": "assistant", "content": "["}]
+    response = requests.post(f"{mock_server.url}/v1/messages", json={"messages": messages})
+    body = response.json()
+    assert body["stop_reason"] == "end_turn"
+    # The answer continues the prefill
+    assert json.loads("[" + body["content"][0]["text"])[0] == "§ 100 o. z."
+
+    contents = [{"role": "user", "parts": [{"text": "Opinion"}]}]
+    response = requests.post(
+        f"{mock_server.url}/v1beta/models/gemini-2.0-flash:generateContent",
+        json={"contents": contents},
+    )
+    body = response.json()
+    assert body["candidates"][0]["finishReason"] == "STOP"
+    assert json.loads(body["candidates"][0]["content"]["parts"][0]["text"])
+    assert body["usageMetadata"]["promptTokenCount"] > 0
@@ -0,0 +1,56 @@
+import json
+import re
+
+from src.packing import pack_documents, render_packed_prompt, run_packed_inference, unpack_result
+from src.token_count import count_tokens
+
+FILLER = "Soud věc posoudil. "
+SHORT = [f"Rozhodnutí {i}. Podle § {i} o. z. " + FILLER * (5 * i) for i in range(1, 9)]
+LONG = "Dlouhé rozhodnutí. Podle § 999 o. z. " + FILLER * 2000
+
+
+def test_pack_documents():
+    texts = SHORT + [LONG]
+    packs, singles = pack_documents(texts, max_pack_tokens=600, max_docs=3, short_tokens=500)
+    assert singles[-1] == len(texts) - 1
+    packed = [i for pack in packs for i in pack]
+    assert sorted(packed + singles) == list(range(len(texts)))
+    for pack in packs:
+        assert 2 <= len(pack) <= 3
+        assert sum(count_tokens(texts[i], "gemini") for i in pack) <= 600
+
+
+def test_render_packed_prompt():
+    prompt = render_packed_prompt(SHORT[:2])
+    assert '<court_opinion id="1">' in prompt and '<court_opinion id="2">' in prompt
+    assert prompt.prefix == render_packed_prompt(SHORT[2:5]).prefix
+    assert prompt.prefix.endswith("## Input Court Opinions:\n")
+    assert prompt.suffix.startswith('\n<court_opinion id="1">')
+
+
+def test_unpack_result():
+    raw = '```json\n{"1": ["§ 1 o. z."], "2": "nonsense"}\n```'
+    assert unpack_result(raw, 3) == ['["§ 1 o. z."]', None, None]
+    assert unpack_result("[]", 2) == [None, None]
+    assert unpack_result(None, 1) == [None]
+
+
+def test_run_packed_inference():
+    calls = []
+
+    def fake_infer(text: str, **kwargs) -> str:
+        calls.append(text)
+        opinions = re.findall(r'<court_opinion id="(\d+)">\s*Rozhodnutí (\d+)\.', text)
+        if opinions:
+            # Drop the last document of every pack to exercise the fallback
+            return json.dumps({doc_id: [f"§ {n} o. z."] for doc_id, n in opinions[:-1]})
+        numbers = re.findall(r"Podle (§ \d+ o\. z\.)", text)
+        return json.dumps(numbers[:1], ensure_ascii=False)
+
+    texts = SHORT + [LONG]
+    results = run_packed_inference(
+        texts, fake_infer, max_pack_tokens=600, max_docs=4, short_tokens=500
+    )
+    expected = [[f"§ {i} o. z."] for i in range(1, 9)] + [["§ 999 o. z."]]
+    assert [json.loads(r) for r in results] == expected
+    assert len(calls) < len(texts) + 3
@@ -0,0 +1,55 @@
+import pytest
+
+from src.apis.anthropic import claude_messages
+from src.apis.prompt_cache import PromptCacheStats, split_prompt
+from src.templates import CachedPrompt, render_template_parts
+
+
+def test_split_prompt():
+    prompt = CachedPrompt("Instructions. Opinion", prefix_len=len("Instructions. "))
+    assert split_prompt(prompt) == ("Instructions. ", "Opinion")
+    assert split_prompt("Plain prompt") == ("", "Plain prompt")
+
+
+def test_extraction_template_prefix_is_static():
+    first = render_template_parts("extract_acts_03.jinja2", court_opinion="První rozhodnutí.")
+    second = render_template_parts("extract_acts_03.jinja2", court_opinion="Druhé rozhodnutí.")
+    assert first.prefix == second.prefix
+    assert len(first.prefix) > 1000
+    assert first.suffix.startswith("První rozhodnutí.")
+
+
+def test_claude_messages_mark_prefix():
+    content = claude_messages(CachedPrompt("Prefix. Opinion", prefix_len=8))[0]["content"]
+    assert content[0]["text"] == "Prefix. "
+    assert content[0]["cache_control"] == {"type": "ephemeral"}
+    assert content[1] == {"type": "text", "text": "Opinion"}
+    assert claude_messages("Plain")[0]["content"] == "Plain"
+
+
+def test_prompt_cache_stats():
+    stats = PromptCacheStats()
+    stats.record("claude", 1000, 800, 0)
+    stats.record("claude", 1000, 0, 800)
+    stats.record("gemini", None, None)
+    summary = stats.summary()
+    assert summary["claude"]["requests"] == 2
+    assert summary["claude"]["hit_ratio"] == 0.4
+    assert summary["gemini"]["input_tokens"] == 0
+    stats.reset()
+    assert stats.summary() == {}
+
+
+def test_gemini_request_sends_whole_prompt():
+    pytest.importorskip("google.genai")
+    from src.apis import google
+
+    contents, config = google._gemini_request(
+        CachedPrompt("Instructions. Opinion", prefix_len=len("Instructions. ")),
+        top_k=40,
+        top_p=0.95,
+        max_tokens=100,
+        temperature=1.0,
+    )
+    assert contents[0].parts[0].text == "Instructions. Opinion"
+    assert config.cached_content is None
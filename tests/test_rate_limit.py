@@ -0,0 +1,124 @@
+import time
+
+import pytest
+
+from src.apis.errors import is_rate_limit_error, parse_rate_limit_headers
+from src.apis.rate_limit import (
+    AdaptiveRateLimiter,
+    TokenBucket,
+    get_rate_limiter,
+    rate_limited,
+)
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeHTTPError(Exception):
+    def __init__(self, status_code: int, headers: dict[str, str] | None = None):
+        super().__init__(f"HTTP {status_code}")
+        self.response = FakeResponse(status_code, headers)
+
+
+@pytest.mark.parametrize(
+    "exc,expected",
+    [
+        (FakeHTTPError(429), True),
+        (FakeHTTPError(529), True),
+        (FakeHTTPError(400), False),
+        (ValueError("boom"), False),
+    ],
+)
+def test_is_rate_limit_error(exc, expected):
+    assert is_rate_limit_error(exc) == expected
+
+
+def test_parse_rate_limit_headers():
+    info = parse_rate_limit_headers(
+        {
+            "Retry-After": "2",
+            "x-ratelimit-remaining-requests": "10",
+            "x-ratelimit-remaining-tokens": "5000",
+        }
+    )
+    assert info.retry_after == 2
+    assert info.remaining_requests == 10
+    assert info.remaining_tokens == 5000
+
+    info = parse_rate_limit_headers({"x-ratelimit-reset-requests": "1m30s"})
+    assert info.retry_after == 90
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(per_minute=60)
+    now = bucket.updated
+    assert bucket.wait_time(60, now) == 0
+    bucket.take(60)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+
+
+def test_requests_per_minute_budget():
+    limiter = AdaptiveRateLimiter(rpm=2, initial_concurrency=10)
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() == 0
+    assert limiter.try_acquire() > 0
+
+
+def test_tokens_per_minute_budget():
+    limiter = AdaptiveRateLimiter(tpm=100, initial_concurrency=10)
+    assert limiter.try_acquire(tokens=80) == 0
+    assert limiter.try_acquire(tokens=80) > 0
+
+
+def test_aimd_concurrency():
+    limiter = AdaptiveRateLimiter(initial_concurrency=4, max_concurrency=8)
+    for _ in range(4):
+        limiter.release(limiter.acquire())
+    assert limiter.concurrency == 5
+
+    first, second = limiter.acquire(), limiter.acquire()
+    limiter.release(first, FakeHTTPError(429, {"retry-after": "0.01"}))
+    assert limiter.concurrency == 2.5
+    assert limiter.throttled == 1
+
+    # Requests started before the decrease do not halve the window again
+    limiter.release(second, FakeHTTPError(429, {"retry-after": "0.01"}))
+    assert limiter.concurrency == 2.5
+    assert limiter.in_flight == 0
+
+
+def test_get_rate_limiter_resolves_aliases():
+    limiter = get_rate_limiter("anthropic")
+    assert limiter is get_rate_limiter("claude")
+    assert limiter.provider == "claude"
+    assert limiter.requests is not None
+
+
+def test_rate_limited_retries_throttled_calls():
+    calls = []
+
+    def flaky_infer(text: str) -> str:
+        calls.append(text)
+        if len(calls) < 3:
+            raise FakeHTTPError(429, {"retry-after": "0.01"})
+        return "[]"
+
+    limiter = AdaptiveRateLimiter()
+    start = time.monotonic()
+    assert rate_limited(flaky_infer, limiter)("text") == "[]"
+    assert len(calls) == 3
+    assert limiter.in_flight == 0
+    assert time.monotonic() - start >= 0.02
+
+
+def test_rate_limited_raises_other_errors():
+    def broken_infer(text: str) -> str:
+        raise FakeHTTPError(401)
+
+    limiter = AdaptiveRateLimiter()
+    with pytest.raises(FakeHTTPError):
+        rate_limited(broken_infer, limiter)("text")
+    assert limiter.in_flight == 0
@@ -5,6 +5,7 @@ from src.filter_references import (
     extract_section_numbers,
     filter_civil_code_references,
     is_civil_code_reference,
+    process_raw_result,
     process_raw_results,
 )
 
@@ -87,3 +88,8 @@ def test_process_raw_results():
     ]
     expected = [[123], [456]]
     assert process_raw_results(raw_results) == expected
+
+
+def test_process_raw_result():
+    raw_result = '```json\n["§ 2 o. z.", "§ 3 o. s. ř."]\n```'
+    assert process_raw_result(raw_result) == [2]
@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from src.apis.registry import (
+    available_providers,
+    get_infer_func,
+    register_provider,
+    resolve_provider,
+    unregister_provider,
+)
+
+SDK_MODULES = ("anthropic", "openai", "google.genai")
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def _run(code: str):
+    """Runs `code` in a fresh interpreter and parses the JSON it prints last."""
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_aliases():
+    assert resolve_provider("anthropic").name == "claude"
+    assert resolve_provider("Google").name == "gemini"
+    assert {"claude", "gemini", "openai", "fireworks"} <= set(available_providers())
+    with pytest.raises(KeyError):
+        resolve_provider("nonexistent")
+    with pytest.raises(ValueError):
+        get_infer_func("gemini", "infer_sideways")
+
+
+@pytest.fixture
+def echo_provider():
+    register_provider("echo", aliases=("parrot",), infer=lambda text, **kwargs: text)
+    yield "echo"
+    unregister_provider("echo")
+
+
+def test_register_provider(echo_provider):
+    assert get_infer_func("parrot")("hello") == "hello"
+    with pytest.raises(KeyError):
+        get_infer_func(echo_provider, "complete")
+    with pytest.raises(ValueError):
+        register_provider("empty")
+
+
+def test_unregister_provider():
+    register_provider("echo", aliases=("parrot",), infer=lambda text, **kwargs: text)
+    unregister_provider("parrot")
+    assert "echo" not in available_providers()
+    for name in ("echo", "parrot"):
+        with pytest.raises(KeyError):
+            resolve_provider(name)
+
+
+def test_registry_import_does_not_load_sdks():
+    loaded = _run(
+        "import json, sys; import src.apis.registry; "
+        f"print(json.dumps([m for m in {SDK_MODULES!r} if m in sys.modules]))"
+    )
+    assert loaded == []
+
+
+def test_only_the_resolved_provider_is_imported():
+    loaded = _run(
+        "import json, sys; from src.apis.registry import get_infer_func; "
+        "f = get_infer_func('fireworks', 'complete'); "
+        f"print(json.dumps([f.__name__, [m for m in {SDK_MODULES!r} if m in sys.modules]]))"
+    )
+    assert loaded == ["fireworks_complete", []]
+
+
+@pytest.mark.skipif(
+    not os.environ.get("RUN_BENCHMARKS"), reason="wall-clock benchmark, set RUN_BENCHMARKS=1"
+)
+def test_import_time_benchmark():
+    pytest.importorskip("anthropic")
+    timing = "import json, time; start = time.perf_counter(); import {}; "
+    timing += "print(json.dumps(time.perf_counter() - start))"
+    lazy = _run(timing.format("src.apis.registry"))
+    eager = _run(timing.format("src.apis.anthropic"))
+    assert lazy < eager
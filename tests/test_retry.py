@@ -0,0 +1,126 @@
+import asyncio
+import time
+
+import pytest
+
+from src.apis.common import run_inference_parallel, run_inference_parallel_with_retry
+from src.apis.errors import is_retryable_error
+from src.apis.retry import RetryPolicy, with_retry, with_retry_async
+
+FAST = RetryPolicy(max_attempts=4, base_delay=0.001, max_delay=0.01)
+
+
+class FakeStatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APITimeoutError(Exception):
+    pass
+
+
+@pytest.mark.parametrize(
+    "exc,expected",
+    [
+        (FakeStatusError(429), True),
+        (FakeStatusError(500), True),
+        (FakeStatusError(529), True),
+        (FakeStatusError(400), False),
+        (FakeStatusError(401), False),
+        (TimeoutError(), True),
+        (APITimeoutError(), True),
+        (ValueError(), False),
+    ],
+)
+def test_is_retryable_error(exc, expected):
+    assert is_retryable_error(exc) == expected
+
+
+def test_backoff_grows_and_is_capped():
+    policy = RetryPolicy(base_delay=1, max_delay=5)
+    for attempt, bound in [(1, 1), (2, 2), (3, 4), (6, 5)]:
+        assert all(0 <= policy.backoff(attempt) <= bound for _ in range(50))
+
+
+def make_flaky(outcomes):
+    outcomes = list(outcomes)
+    calls = []
+
+    def infer(text: str) -> str | None:
+        calls.append(text)
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    return infer, calls
+
+
+def test_retries_errors_and_invalid_json():
+    infer, calls = make_flaky([FakeStatusError(503), "[broken", "[1]"])
+    assert with_retry(infer, FAST)("text") == "[1]"
+    assert len(calls) == 3
+
+
+def test_permanent_error_is_raised_immediately():
+    infer, calls = make_flaky([FakeStatusError(401)])
+    with pytest.raises(FakeStatusError):
+        with_retry(infer, FAST)("text")
+    assert len(calls) == 1
+
+
+def test_gives_up_after_max_attempts():
+    infer, calls = make_flaky(["[bad"] * 4)
+    assert with_retry(infer, FAST)("text") == "[bad"
+    assert len(calls) == 4
+
+
+def test_deadline_stops_retries():
+    infer, calls = make_flaky([FakeStatusError(500)] * 10)
+    policy = RetryPolicy(max_attempts=10, base_delay=0.05, max_delay=0.05, deadline=0)
+    start = time.monotonic()
+    assert with_retry(infer, policy)("text") is None
+    assert len(calls) == 1
+    assert time.monotonic() - start < 0.05
+
+
+def test_deadline_cancels_hung_async_call():
+    calls = []
+
+    async def hung(text: str) -> str:
+        calls.append(text)
+        await asyncio.sleep(10)
+        return "[]"
+
+    policy = RetryPolicy(max_attempts=3, base_delay=0.05, deadline=0.1)
+    start = time.monotonic()
+    assert asyncio.run(with_retry_async(hung, policy)("text")) is None
+    assert len(calls) == 1
+    assert time.monotonic() - start < 1
+
+
+def test_failed_items_do_not_wait_for_the_batch():
+    attempts: dict[str, int] = {}
+
+    def infer(text: str) -> str:
+        attempts[text] = attempts.get(text, 0) + 1
+        if text == "slow":
+            time.sleep(0.2)
+        if text == "flaky" and attempts[text] == 1:
+            return "[broken"
+        return f'["{text}"]'
+
+    completed = []
+    results = run_inference_parallel(
+        ["slow", "flaky"], with_retry(infer, FAST), on_result=lambda i, r: completed.append(r)
+    )
+    assert results == ['["slow"]', '["flaky"]']
+    assert attempts == {"slow": 1, "flaky": 2}
+    assert completed == ['["flaky"]', '["slow"]'], "The retried item finishes before the slow one"
+
+
+def test_run_inference_parallel_with_retry_uses_policy():
+    infer, calls = make_flaky(["[bad", "[bad", "[1]"])
+    assert run_inference_parallel_with_retry(["text"], infer, retry_policy=FAST) == ["[1]"]
+    assert len(calls) == 3
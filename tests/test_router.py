@@ -0,0 +1,68 @@
+import time
+
+import pytest
+
+from src.apis.router import HedgedRouter, ProviderHealth
+
+
+def _sleepy(delay: float, result: str = "[]"):
+    def infer(text: str, **kwargs) -> str:
+        time.sleep(delay)
+        return result
+
+    return infer
+
+
+def _failing(text: str, **kwargs) -> str:
+    raise ConnectionError("provider down")
+
+
+def test_hedge_takes_first_valid_result():
+    providers = [("slow", _sleepy(1.0, '["slow"]')), ("fast", _sleepy(0.01, '["fast"]'))]
+    router = HedgedRouter(providers, hedge_delay=0.05)
+    start = time.monotonic()
+    assert router("prompt") == '["fast"]'
+    assert time.monotonic() - start < 0.5
+    assert router.hedged == 1
+    assert router.stats()["slow"]["abandoned"] == 1
+    assert router.stats()["fast"]["abandoned"] == 0
+    router.close()
+
+
+def test_failover_on_error_and_invalid_result():
+    router = HedgedRouter([("down", _failing), ("bad", _sleepy(0, "nonsense")), ("ok", _sleepy(0))])
+    assert router("prompt") == "[]"
+    assert router.failovers == 2
+    router.close()
+
+
+def test_all_providers_fail():
+    router = HedgedRouter([("down", _failing)], max_attempts=2)
+    with pytest.raises(ConnectionError):
+        router("prompt")
+    router.close()
+
+
+def test_circuit_breaker_skips_unhealthy_provider():
+    calls = []
+
+    def flaky(text: str, **kwargs) -> str:
+        calls.append(text)
+        raise ConnectionError("provider down")
+
+    router = HedgedRouter([("flaky", flaky), ("ok", _sleepy(0))], min_samples=3, cooldown=60)
+    for _ in range(5):
+        assert router("prompt") == "[]"
+    assert len(calls) == 3
+    assert router.stats()["flaky"]["available"] is False
+    router.close()
+
+
+def test_provider_health_percentile():
+    health = ProviderHealth(min_samples=5)
+    assert health.percentile(0.95) is None
+    for latency in range(1, 21):
+        health.record(float(latency), ok=True)
+    assert health.percentile(0.95) == 20.0
+    assert health.percentile(0.5) == 11.0
+    assert health.error_rate == 0.0
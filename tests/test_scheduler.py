@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from src.apis.retry import RetryPolicy
+from src.scheduler import (
+    MIN_MAX_TOKENS,
+    adaptive_max_tokens,
+    estimate_output_tokens,
+    plan_run,
+    run_scheduled,
+)
+
+SHORT = "Soud rozhodl podle § 1 o. z."
+LONG = " ".join(f"Podle § {i} o. z. soud rozhodl." for i in range(300))
+MEDIUM = " ".join(f"Podle § {i} o. z. soud rozhodl." for i in range(40))
+
+
+def test_output_estimate_grows_with_citations():
+    assert estimate_output_tokens(LONG) > estimate_output_tokens(MEDIUM)
+    assert estimate_output_tokens(MEDIUM) > estimate_output_tokens(SHORT)
+    assert adaptive_max_tokens(estimate_output_tokens(SHORT)) == MIN_MAX_TOKENS
+    assert adaptive_max_tokens(estimate_output_tokens(LONG)) > MIN_MAX_TOKENS
+
+
+def test_plan_is_longest_first():
+    plan = plan_run([SHORT, LONG, MEDIUM], model="gemini-2.0-flash")
+    assert [r.index for r in plan.requests] == [1, 2, 0]
+    assert "3 requests" in plan.summary()
+    assert plan.cost(plan.input_tokens, plan.expected_output_tokens) > 0
+
+
+def test_run_scheduled_uses_adaptive_max_tokens():
+    seen = {}
+
+    def fake_infer(text: str, max_tokens: int, **kwargs) -> str:
+        seen[max_tokens] = text
+        return json.dumps([f"§ {max_tokens}"])
+
+    plan = plan_run([SHORT, LONG, MEDIUM], model="gemini-2.0-flash")
+    results = run_scheduled(plan, fake_infer).results
+    for request in plan.requests:
+        assert results[request.index] == json.dumps([f"§ {request.max_tokens}"])
+    assert len(seen) == 3
+
+
+def test_run_scheduled_enforces_budget():
+    plan = plan_run([SHORT, LONG, MEDIUM, SHORT], model="gemini-2.0-flash")
+    budget = plan.requests[0].input_tokens + plan.requests[0].max_tokens
+
+    def full_infer(text: str, max_tokens: int, **kwargs) -> str:
+        # Uses up the whole output budget, so the first request leaves nothing for the others
+        return json.dumps(["x" * int(max_tokens * 3.4)])
+
+    run = run_scheduled(plan, full_infer, max_total_tokens=budget)
+    assert run.results[1] is not None
+    assert run.results.count(None) == run.skipped == 3
+
+
+def test_run_scheduled_charges_retries():
+    calls = []
+
+    def flaky_infer(text: str, **kwargs) -> str:
+        calls.append(text)
+        return "[]" if len(calls) > 1 else "not json"
+
+    plan = plan_run([SHORT], model="gemini-2.0-flash")
+    run = run_scheduled(plan, flaky_infer, retry_policy=RetryPolicy(base_delay=0.0))
+    assert run.results == ["[]"]
+    assert run.attempts == 2
+    assert run.tokens > 2 * plan.input_tokens
+    assert run.cost > 0
+
+
+def test_run_scheduled_grows_max_tokens_after_truncation():
+    seen = []
+
+    def truncating_infer(text: str, max_tokens: int, **kwargs) -> str:
+        seen.append(max_tokens)
+        return '["§ 1 o. z.", "§ 2' if len(seen) < 3 else '["§ 1 o. z.", "§ 2 o. z."]'
+
+    plan = plan_run([SHORT], model="gemini-2.0-flash")
+    policy = RetryPolicy(base_delay=0.0)
+    run = run_scheduled(plan, truncating_infer, retry_policy=policy)
+    assert run.results == ['["§ 1 o. z.", "§ 2 o. z."]']
+    assert seen == [MIN_MAX_TOKENS, 2 * MIN_MAX_TOKENS, 4 * MIN_MAX_TOKENS]
+
+    seen.clear()
+    budget = plan.input_tokens * 2 + 3 * MIN_MAX_TOKENS
+    run = run_scheduled(plan, truncating_infer, max_total_tokens=budget, retry_policy=policy)
+    assert seen == [MIN_MAX_TOKENS, 2 * MIN_MAX_TOKENS]
+    assert run.results == ['["§ 1 o. z.", "§ 2']
+
+
+def test_max_cost_needs_prices():
+    plan = plan_run([SHORT])
+    with pytest.raises(ValueError):
+        run_scheduled(plan, lambda text, **kwargs: "[]", max_cost=1.0)
+    assert run_scheduled(plan, lambda text, **kwargs: "[]").cost == 0
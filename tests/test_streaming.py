@@ -0,0 +1,88 @@
+import json
+
+import pytest
+
+from src.apis.fireworks import _parse_fireworks_event
+from src.apis.streaming import RepetitionDetector, close_json_prefix, consume_stream
+
+REFERENCES = [f"§ {i} o. z." for i in range(200)]
+
+
+def _stream(text: str, size: int = 7):
+    for i in range(0, len(text), size):
+        yield text[i : i + size]
+
+
+def test_detector_accepts_long_unique_list():
+    detector = RepetitionDetector()
+    assert not detector.feed(json.dumps(REFERENCES, ensure_ascii=False))
+
+
+def test_detector_accepts_full_statute_names():
+    references = [f"§ {i} odst. 1 zákona č. 89/2012 Sb., občanský zákoník" for i in range(50)]
+    text = json.dumps(references, ensure_ascii=False)
+    detector = RepetitionDetector()
+    assert not any(detector.feed(chunk) for chunk in _stream(text))
+    assert consume_stream(_stream(text)) == text
+
+
+def test_detector_repeated_ngram_within_entry():
+    detector = RepetitionDetector()
+    text = '["§ 1 o. z.", "podle zákona ' + "a podle téhož zákona a podle něj " * 10
+    assert any(detector.feed(chunk) for chunk in _stream(text))
+    assert detector.reason and detector.reason.startswith("n-gram")
+
+
+def test_detector_repeated_entry():
+    detector = RepetitionDetector()
+    text = '["§ 1 o. z.", ' + '"§ 2 o. z.", ' * 10
+    assert any(detector.feed(chunk) for chunk in _stream(text))
+    assert detector.reason and "§ 2 o. z." in detector.reason
+
+
+def test_detector_repeated_ngram():
+    detector = RepetitionDetector(ngram_size=4, max_ngram_repeats=3)
+    assert any(detector.feed(chunk) for chunk in _stream("Soud rozhodl takto a znovu " * 20))
+    assert detector.reason and detector.reason.startswith("n-gram")
+
+
+def test_close_json_prefix():
+    truncated = '```json\n["§ 1 o. z.", "§ 2 o. z.", "§ 1 o. z.", "§ 3 o'
+    assert json.loads(close_json_prefix(truncated)) == ["§ 1 o. z.", "§ 2 o. z."]
+    assert close_json_prefix("[]") == "[]"
+    assert close_json_prefix("no list") is None
+
+
+def test_consume_stream_aborts_and_closes():
+    closed = []
+
+    def chunks():
+        try:
+            yield '["§ 1 o. z.", '
+            while True:
+                yield '"§ 2 o. z.", '
+        finally:
+            closed.append(True)
+
+    assert json.loads(consume_stream(chunks())) == ["§ 1 o. z.", "§ 2 o. z."]
+    assert closed == [True]
+    assert consume_stream(chunks(), on_repetition="retry") is None
+
+
+def test_consume_stream_nothing_salvaged():
+    text = '["podle zákona ' + "a podle téhož zákona a podle něj " * 10
+    assert consume_stream(_stream(text)) is None
+
+
+def test_consume_stream_complete():
+    text = json.dumps(REFERENCES, ensure_ascii=False)
+    assert consume_stream(_stream(text)) == text
+    with pytest.raises(ValueError):
+        consume_stream(_stream(text), on_repetition="ignore")
+
+
+def test_parse_fireworks_event():
+    event = b'data: {"choices": [{"delta": {"content": "[\\"\\u00a7 1\\""}}]}'
+    assert _parse_fireworks_event(event) == '["\xa7 1"'
+    assert _parse_fireworks_event(b"data: [DONE]") is None
+    assert _parse_fireworks_event(b"") is None
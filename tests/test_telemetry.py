@@ -0,0 +1,111 @@
+import pytest
+
+from src.apis.retry import RetryPolicy, with_retry
+from src.apis.telemetry import (
+    InferenceRecord,
+    JsonlSink,
+    MemorySink,
+    load_records,
+    summarize_records,
+    telemetry,
+    track_inference,
+)
+from src.token_count import text_hash
+
+
+def _fake_infer(text: str, **kwargs) -> str:
+    with track_inference("fake", "fake-model", text) as tracker:
+        tracker.usage(100, 10, 40)
+        tracker.finish("stop")
+        return "[]"
+
+
+def test_records_successful_call():
+    sink = MemorySink()
+    with telemetry.recording(sink):
+        _fake_infer("prompt")
+    (record,) = sink.records
+    assert record.provider == "fake"
+    assert record.prompt_hash == text_hash("prompt")
+    assert (record.input_tokens, record.output_tokens, record.cached_tokens) == (100, 10, 40)
+    assert record.finish_reason == "stop"
+    assert record.outcome == "ok"
+    assert record.attempt == 1
+    assert record.latency >= 0
+
+
+def test_no_records_without_sinks():
+    sink = MemorySink()
+    with telemetry.recording(sink):
+        pass
+    _fake_infer("prompt")
+    assert sink.records == []
+
+
+def test_records_errors_and_aborted_streams():
+    def failing(text: str) -> None:
+        with track_inference("fake", "fake-model", text):
+            raise ValueError("bad request")
+
+    def stream(text: str):
+        with track_inference("fake", "fake-model", text) as tracker:
+            for chunk in ["[", '"a"', "]"]:
+                tracker.first_token()
+                yield chunk
+
+    sink = MemorySink()
+    with telemetry.recording(sink):
+        with pytest.raises(ValueError):
+            failing("prompt")
+        chunks = stream("prompt")
+        next(chunks)
+        chunks.close()
+    error, aborted = sink.records
+    assert (error.outcome, error.error) == ("error", "ValueError")
+    assert aborted.outcome == "aborted"
+    assert aborted.time_to_first_token is not None
+
+
+def test_attempt_number_from_retries():
+    calls = []
+
+    def flaky(text: str, **kwargs) -> str:
+        calls.append(1)
+        with track_inference("fake", "fake-model", text):
+            return "not json" if len(calls) < 3 else "[]"
+
+    sink = MemorySink()
+    policy = RetryPolicy(max_attempts=3, base_delay=0, repair_json=False)
+    with telemetry.recording(sink):
+        assert with_retry(flaky, policy)("prompt") == "[]"
+    assert [r.attempt for r in sink.records] == [1, 2, 3]
+    assert sink.summary()["all"]["retries"] == 2
+
+
+def test_summary_percentiles_and_rates():
+    records = [
+        InferenceRecord("a", "m", "h", started_at=0.0, latency=float(i), output_tokens=10)
+        for i in range(1, 101)
+    ]
+    records.append(
+        InferenceRecord("b", "m", "h", started_at=0.0, latency=1.0, outcome="error")
+    )
+    summary = summarize_records(records)
+    assert set(summary) == {"a/m", "b/m", "all"}
+    assert summary["a/m"]["p50"] == 51.0
+    assert summary["a/m"]["p99"] == 100.0
+    assert summary["a/m"]["requests_per_s"] == 1.0
+    assert summary["a/m"]["output_tokens_per_s"] == 10.0
+    assert summary["b/m"]["p50"] is None
+    assert summary["all"]["errors"] == 1
+    assert summarize_records([]) == {}
+
+
+def test_jsonl_sink_round_trip(tmp_path):
+    path = tmp_path / "telemetry.jsonl"
+    with JsonlSink(path) as sink, telemetry.recording(sink):
+        _fake_infer("one")
+        _fake_infer("two")
+    records = load_records(path)
+    assert [r.prompt_hash for r in records] == [text_hash("one"), text_hash("two")]
+    assert records[0].finish_reason == "stop"
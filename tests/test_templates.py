@@ -1,6 +1,12 @@
 import pytest  # noqa: F401
 
-from src.templates import get_template_env, get_templates_dir, load_template, render_template
+from src.templates import (
+    get_template_env,
+    get_templates_dir,
+    load_template,
+    render_template,
+    render_template_parts,
+)
 
 
 def test_get_templates_dir():
@@ -42,3 +48,16 @@ def test_render_template():
     assert f"Hello, {name}!" in rendered
     assert "item1: value1" in rendered
     assert "item2: value2" in rendered
+
+
+def test_render_template_parts():
+    """Test splitting a rendered template into a static prefix and a variable suffix."""
+    data = {"item1": "value1"}
+    prompt = render_template_parts("test_template.jinja2", variable="name", name="World", data=data)
+
+    assert prompt == render_template("test_template.jinja2", name="World", data=data)
+    assert prompt.prefix == "Hello, "
+    assert prompt.suffix.startswith("World!")
+
+    other = render_template_parts("test_template.jinja2", variable="name", name="Court", data=data)
+    assert other.prefix == prompt.prefix
@@ -0,0 +1,50 @@
+import pytest
+
+from src.token_count import (
+    TOKENIZER_PROFILES,
+    TokenCounter,
+    TokenizerProfile,
+    analyze_corpus_tokens,
+    calibrate_profile,
+    count_tokens,
+)
+
+PROFILE = TokenizerProfile("test", chars_per_token=4.0)
+
+
+def test_estimator_uses_chars_per_token():
+    counter = TokenCounter(PROFILE)
+    assert counter.count("x" * 400) == 100
+
+
+def test_counts_are_cached_by_text_hash(tmp_path):
+    counter = TokenCounter(PROFILE, cache_path=tmp_path / "counts.json")
+    calls = []
+    original = counter._count
+    counter._count = lambda text: calls.append(text) or original(text)  # type: ignore
+
+    assert counter.count("abcd" * 10) == counter.count("abcd" * 10) == 10
+    assert len(calls) == 1
+
+    counter.save()
+    reloaded = TokenCounter(PROFILE, cache_path=tmp_path / "counts.json")
+    reloaded._count = lambda text: pytest.fail("count should come from the cache")  # type: ignore
+    assert reloaded.count("abcd" * 10) == 10
+
+
+def test_calibrate_profile():
+    calibrated = calibrate_profile(PROFILE, ["a" * 30, "b" * 30], lambda text: len(text) // 3)
+    assert calibrated.chars_per_token == 3.0
+    assert calibrated.name == "test"
+
+
+@pytest.mark.parametrize("provider", sorted(TOKENIZER_PROFILES))
+def test_count_tokens_for_every_provider(provider):
+    assert count_tokens("Podle § 2910 o. z. odpovídá škůdce za škodu.", provider) > 0
+
+
+def test_analyze_corpus_tokens_streams_documents(capsys):
+    chars, tokens = analyze_corpus_tokens((text for text in ["abc", "defgh"]), provider="gemini")
+    assert chars == 8
+    assert tokens > 0
+    assert "Total characters: 8" in capsys.readouterr().out
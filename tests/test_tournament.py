@@ -0,0 +1,66 @@
+import re
+
+import pytest
+
+from src.apis.retry import RetryPolicy
+from src.tournament import PairedSPRT, Variant, run_tournament, score_output
+
+TEXTS = [f"Rozhodnutí {i}. Podle § {i + 100} o. z. soud rozhodl." for i in range(200)]
+ANNOTATIONS = [[i + 100] for i in range(200)]
+NO_RETRY = RetryPolicy(max_attempts=1)
+
+
+def _extractor(succeeds):
+    def infer(text: str, **kwargs) -> str:
+        i = int(re.search(r"Rozhodnutí (\d+)\.", text).group(1))
+        return f'["§ {i + 100} o. z."]' if succeeds(i) else "[]"
+
+    return infer
+
+
+def test_score_output():
+    assert score_output('["§ 100 o. z."]', [100], TEXTS[0])
+    assert not score_output("[]", [100], TEXTS[0])
+    assert not score_output("broken", [100], TEXTS[0])
+    # Annotated sections that do not occur in the text are not held against the output
+    assert score_output("[]", [5000], TEXTS[0])
+
+
+def test_sprt_directions():
+    test = PairedSPRT(delta=0.2)
+    for _ in range(20):
+        test.update(True, False)
+    assert test.better == 0
+    test = PairedSPRT(delta=0.2)
+    for k in range(60):
+        test.update(k % 2 == 0, k % 2 == 1)
+    assert test.better is None and test.negligible
+
+
+def test_tournament_stops_early_with_winner():
+    variants = [
+        Variant("weak", "extract_acts_03.jinja2", _extractor(lambda i: i % 3 == 0)),
+        Variant("strong", "extract_acts_03.jinja2", _extractor(lambda i: True)),
+        Variant("worse", "extract_acts_03.jinja2", _extractor(lambda i: False)),
+    ]
+    result = run_tournament(TEXTS, ANNOTATIONS, variants, retry_policy=NO_RETRY)
+    assert result.status == "winner"
+    assert result.winner == "strong"
+    assert result.opinions < len(TEXTS)
+    assert set(result.eliminated) == {"weak", "worse"}
+    assert result.scores.set_index("variant").loc["strong", "success_rate"] == 1.0
+
+
+def test_tournament_negligible_difference():
+    variants = [
+        Variant("a", "extract_acts_03.jinja2", _extractor(lambda i: i % 2 == 0)),
+        Variant("b", "extract_acts_03.jinja2", _extractor(lambda i: i % 2 == 1)),
+    ]
+    result = run_tournament(TEXTS, ANNOTATIONS, variants, retry_policy=NO_RETRY)
+    assert result.status == "negligible"
+    assert result.winner is None
+
+
+def test_tournament_needs_two_variants():
+    with pytest.raises(ValueError):
+        run_tournament(TEXTS, ANNOTATIONS, [Variant("a", "extract_acts_03.jinja2", print)])